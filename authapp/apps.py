@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AuthappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authapp'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from authapp import authentication
+        from authapp.models import User
+        post_save.connect(authentication.revoke_user, sender=User)
+        post_delete.connect(authentication.forget_user, sender=User)
@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, router
+from django.utils.crypto import salted_hmac
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, BasicAuthentication, get_authorization_header
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from authapp.models import TokenRevocation
+
+# Claims TokenSerializer.get_token embeds, copied onto the stateless user.
+USER_CLAIMS = ('username', 'first_name', 'last_name', 'email', 'roles', 'is_active')
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU of per-process entries.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TokenCache(LRUCache):
+    """
+    LRU of validated tokens, keyed by the raw token. The raw token carries
+    the jti, so each key is one issued token, and a forged token never
+    matches an entry.
+    """
+
+    def discard_user(self, user_id):
+        with self.lock:
+            stale = [
+                raw_token for raw_token, token in self.entries.items()
+                if token.get(api_settings.USER_ID_CLAIM) == user_id
+            ]
+            for raw_token in stale:
+                del self.entries[raw_token]
+
+
+tokens = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+# HMAC of verified Basic credentials -> (user id, password hash, expiry).
+credentials = LRUCache(settings.AUTH_BASIC_CACHE_SIZE)
+
+
+class Revocations:
+    """
+    Per-process copy of the TokenRevocation rows, read again at most every
+    AUTH_REVOCATION_REFRESH seconds, so checking a token reads nothing.
+    Only revocations younger than the access token lifetime are kept: the
+    tokens older ones cover have expired.
+    """
+
+    def __init__(self):
+        self.revoked = dict()
+        self.read_at = None
+        self.lock = threading.Lock()
+
+    def revoked_at(self, user_id):
+        """
+        When the tokens of `user_id` were last revoked, or None. Raises
+        DatabaseError when a due refresh fails.
+        """
+        with self.lock:
+            if self.read_at is None or time.monotonic() - self.read_at >= settings.AUTH_REVOCATION_REFRESH:
+                self.refresh()
+            return self.revoked.get(user_id)
+
+    def refresh(self):
+        cutoff = int(time.time() - api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        # From the primary, so replica lag never widens the window.
+        rows = TokenRevocation.objects.using(router.db_for_write(TokenRevocation)).filter(revoked_at__gte=cutoff)
+        self.revoked = dict(rows.values_list('user_id', 'revoked_at'))
+        self.read_at = time.monotonic()
+
+    def put(self, user_ids, revoked_at):
+        with self.lock:
+            for user_id in user_ids:
+                self.revoked[user_id] = max(revoked_at, self.revoked.get(user_id, revoked_at))
+
+    def clear(self):
+        with self.lock:
+            self.revoked.clear()
+            self.read_at = None
+
+
+revocations = Revocations()
+
+
+def revoke(user_ids):
+    """
+    Stop trusting the claims of tokens issued so far to `user_ids`: those
+    tokens authenticate against the database (which rejects inactive and
+    deleted users) until they expire. The revocation applies to this process
+    at once and, through the database, to every other worker within
+    AUTH_REVOCATION_REFRESH seconds. Call after changing users without
+    `save()`.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    now = int(time.time())
+    TokenRevocation.objects.bulk_create(
+        [TokenRevocation(user_id=user_id, revoked_at=now) for user_id in user_ids], ignore_conflicts=True,
+    )
+    TokenRevocation.objects.filter(user_id__in=user_ids).update(revoked_at=now)
+    revocations.put(user_ids, now)
+    for user_id in user_ids:
+        tokens.discard_user(user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps validated tokens in an LRU and, with
+    AUTH_STATELESS_USER, builds the request user from the token claims
+    instead of loading it, checked against the per-process revocations.
+    Tokens without the claims, or issued before the user was last changed
+    or deleted, load the user from the database as usual.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = tokens.get(raw_token)
+        if token is not None and token['exp'] > time.time():
+            return token
+        token = super().get_validated_token(raw_token)
+        tokens.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if not settings.AUTH_STATELESS_USER or not self.is_trusted(validated_token):
+            return super().get_user(validated_token)
+        return self.user_from_claims(validated_token)
+
+    def is_trusted(self, validated_token):
+        """
+        Whether the claims of `validated_token` still describe its user.
+        Tokens claiming an inactive user are rejected, and so is every token
+        when the revocations cannot be read.
+        """
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            return False
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return False
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        try:
+            revoked = revocations.revoked_at(validated_token[api_settings.USER_ID_CLAIM])
+        except DatabaseError:
+            raise AuthenticationFailed(_('Token could not be checked'), code='token_not_checked')
+        return revoked is None or validated_token.get('iat', 0) > revoked
+
+    def user_from_claims(self, validated_token):
+        """
+        User instance holding the claimed fields; any other field is
+        deferred and loads from the database on first access.
+        """
+        field_names = (api_settings.USER_ID_FIELD,) + USER_CLAIMS
+        values = [validated_token[api_settings.USER_ID_CLAIM]]
+        values += [validated_token[claim] for claim in USER_CLAIMS]
+        return self.user_model.from_db(router.db_for_read(self.user_model), field_names, values)
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication that remembers verified credentials for
+    AUTH_BASIC_CACHE_TTL seconds, keyed by an HMAC of the username and
+    password, so repeat requests load the user by id instead of hashing the
+    password again. An entry only matches while the user's password hash
+    is unchanged, and inactive users are always rejected.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = salted_hmac('authapp.authentication.basic', f'{userid}\0{password}').digest()
+        entry = credentials.get(key)
+        if entry is not None and entry[2] > time.monotonic():
+            user_id, password_hash, _ = entry
+            user = self.get_user(user_id)
+            if user is not None and user.password == password_hash and user.is_active:
+                return (user, None)
+        user, auth = super().authenticate_credentials(userid, password, request)
+        credentials.put(key, (user.pk, user.password, time.monotonic() + settings.AUTH_BASIC_CACHE_TTL))
+        return (user, auth)
+
+    def get_user(self, user_id):
+        return get_user_model()._default_manager.filter(pk=user_id).first()
+
+
+class SchemeAuthentication(BaseAuthentication):
+    """
+    Authenticate with the one class AUTH_SCHEMES maps the scheme of the
+    Authorization header to, rather than trying each class in turn.
+    Requests without the header fall back to AUTH_SESSION_AUTHENTICATION,
+    so only they read the session; unknown schemes stay anonymous.
+    """
+
+    def __init__(self):
+        self.schemes = {scheme.lower(): import_string(path)() for scheme, path in settings.AUTH_SCHEMES.items()}
+        session = settings.AUTH_SESSION_AUTHENTICATION
+        self.session = import_string(session)() if session else None
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split(None, 1)
+        if not header:
+            return self.session.authenticate(request) if self.session else None
+        authentication = self.schemes.get(header[0].decode('latin-1').lower())
+        if authentication is None:
+            return None
+        return authentication.authenticate(request)
+
+    def authenticate_header(self, request):
+        # The first scheme answers 401s, as the first class of a list would.
+        return next(iter(self.schemes.values())).authenticate_header(request)
+
+
+def revoke_user(sender, instance, created=False, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no token claims.
+    if created or (update_fields is not None and not set(USER_CLAIMS).intersection(update_fields)):
+        return
+    revoke([instance.pk])
+
+
+def forget_user(sender, instance, **kwargs):
+    # Tokens of a deleted user then fail the lookup of their user.
+    revoke([instance.pk])
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from authapp.serializers.user_management import unique_violation
+
+User = get_user_model()
+
+
+def provision_users(entries):
+    """
+    Create users from `entries`, pairs of request index and validated user
+    data, with one lookup for taken usernames and emails and batched
+    inserts of USER_BULK_BATCH_SIZE rows. Returns the number of users
+    created and the errors of the entries skipped.
+    """
+    for _, data in entries:
+        data['email'] = User.objects.normalize_email(data.get('email', ''))
+    usernames = [data['username'] for _, data in entries]
+    emails = [data['email'] for _, data in entries if data['email']]
+    existing = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+    taken = set()
+    for username, email in existing.values_list('username', 'email'):
+        taken.update({('username', username), ('email', email)})
+    users, errors = [], []
+    for index, data in entries:
+        keys = [('username', data['username'])]
+        if data['email']:
+            keys.append(('email', data['email']))
+        conflicts = {field: ['Already in use.'] for field, value in keys if (field, value) in taken}
+        if conflicts:
+            errors.append({'index': index, 'errors': conflicts})
+            continue
+        taken.update(keys)
+        password = data.pop('password', None)
+        user = User(**data)
+        if password is None:
+            user.set_unusable_password()
+        else:
+            user.set_password(password)
+        users.append(user)
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=settings.USER_BULK_BATCH_SIZE)
+    except IntegrityError as error:
+        # A user registered concurrently; nothing of this batch was kept.
+        detail = unique_violation(error)
+        if detail is None:
+            raise
+        raise ValidationError(detail)
+    return len(users), errors
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ServiceAccountPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with SERVICE_ACCOUNT_HASHER_ITERATIONS, for the passwords of
+    service accounts. Their secrets are generated, not chosen, so a lower
+    work factor keeps their frequent token requests cheap without making
+    them guessable.
+    """
+    algorithm = 'pbkdf2_sha256_service'
+
+    @property
+    def iterations(self):
+        return settings.SERVICE_ACCOUNT_HASHER_ITERATIONS
@@ -0,0 +1,100 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# User id -> time of its latest login not yet written.
+_pending = dict()
+_lock = threading.Lock()
+_flushed_at = time.monotonic()
+# Timer of the next flush, while logins are pending.
+_timer = None
+
+
+def record(user):
+    """
+    Remember that `user` logged in now. Logins are written in one statement
+    once LAST_LOGIN_FLUSH_INTERVAL seconds have passed since the last write:
+    by the next login, or by a timer when no login follows.
+    """
+    now = timezone.now()
+    user.last_login = now
+    with _lock:
+        _pending[user.pk] = now
+        due = time.monotonic() - _flushed_at >= settings.LAST_LOGIN_FLUSH_INTERVAL
+    if due:
+        flush()
+    else:
+        schedule()
+
+
+def schedule():
+    """
+    Flush in LAST_LOGIN_FLUSH_INTERVAL seconds, unless a flush is scheduled
+    already.
+    """
+    global _timer
+    with _lock:
+        if _timer is not None:
+            return
+        _timer = threading.Timer(settings.LAST_LOGIN_FLUSH_INTERVAL, _flush_scheduled)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _flush_scheduled():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        flush()
+    except Exception:
+        # The logins are pending again; the next attempt writes them.
+        logger.exception("Writing the buffered last logins failed.")
+        schedule()
+    finally:
+        # The timer thread's own connections.
+        connections.close_all()
+
+
+def flush():
+    """
+    Write the pending logins, returning how many users were updated. When
+    the write fails they stay pending.
+    """
+    global _flushed_at
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed_at = time.monotonic()
+    if not pending:
+        return 0
+    User = get_user_model()
+    users = [User(pk=user_id, last_login=last_login) for user_id, last_login in pending.items()]
+    try:
+        # bulk_update sends no signals: a login changes nothing cached.
+        User.objects.bulk_update(users, ['last_login'], batch_size=settings.LAST_LOGIN_FLUSH_BATCH_SIZE)
+    except DatabaseError:
+        with _lock:
+            # Logins recorded meanwhile are newer than those of the batch.
+            for user_id, last_login in pending.items():
+                _pending.setdefault(user_id, last_login)
+        raise
+    return len(users)
+
+
+def pending():
+    with _lock:
+        return dict(_pending)
+
+
+@atexit.register
+def _flush_at_exit():
+    if _pending:
+        flush()
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:17
+
+import authapp.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', authapp.models.UserManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Stop before creating the unique email index if users share an email:
+    which account keeps it is for an administrator to decide.
+    """
+    User = apps.get_model('authapp', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').order_by().values('email')
+        .annotate(users=Count('id')).filter(users__gt=1).values_list('email', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Users share these emails, give each a unique email before migrating: " + ", ".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0002_user_manager'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='confirm_password',
+        ),
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(('email', ''), _negated=True), fields=('email',), name='user_email_unique'),
+        ),
+    ]
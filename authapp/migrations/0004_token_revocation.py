@@ -0,0 +1,21 @@
+# Generated by Django 3.2.12 on 2026-10-18 20:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0003_email_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_revocation', serialize=False, to='authapp.user')),
+                ('revoked_at', models.BigIntegerField()),
+            ],
+        ),
+    ]
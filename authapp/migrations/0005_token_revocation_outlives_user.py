@@ -0,0 +1,20 @@
+# Generated by Django 3.2.12 on 2026-10-18 20:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authapp', '0004_token_revocation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tokenrevocation',
+            name='user',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='token_revocation', serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
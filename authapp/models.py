@@ -1,11 +1,68 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+
+# Role of accounts used by other services, whose passwords are hashed with
+# the cheaper ServiceAccountPBKDF2PasswordHasher.
+SERVICE_ACCOUNT_ROLE = 'service'
+
+
+class UserManager(BaseUserManager):
+
+    def _create_user(self, username, email, password, **extra_fields):
+        # Hash through set_password, which picks the user's hasher.
+        user = self.model(
+            username=self.model.normalize_username(username),
+            email=self.normalize_email(email),
+            **extra_fields
+        )
+        user.set_password(password)
+        user.save(using=self._db)
+        return user
 
 
 class User(AbstractUser):
     roles = models.CharField(max_length=100, null=False)
-    confirm_password = models.CharField(max_length=128, null=False)
     first_name = models.CharField(max_length=30, null=False)
     last_name = models.CharField(max_length=150, null=False)
 
-    REQUIRED_FIELDS = ['email', 'password', 'confirm_password', 'roles', 'first_name', 'last_name']
+    REQUIRED_FIELDS = ['email', 'password', 'roles', 'first_name', 'last_name']
+
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Email stays optional; addresses that are given must be unique.
+            models.UniqueConstraint(fields=['email'], condition=~models.Q(email=''), name='user_email_unique'),
+        ]
+
+    @property
+    def password_hasher(self):
+        if SERVICE_ACCOUNT_ROLE in self.roles.split(','):
+            return 'pbkdf2_sha256_service'
+        return 'default'
+
+    def set_password(self, raw_password):
+        self.password = make_password(raw_password, hasher=self.password_hasher)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        # Passwords are rehashed only when they move off the user's hasher.
+        return check_password(raw_password, self.password, setter, preferred=self.password_hasher)
+
+
+class TokenRevocation(models.Model):
+    """
+    Tokens issued to `user` up to `revoked_at` (Unix time) no longer vouch
+    for its claims. Kept apart from User, so saving a user loaded earlier
+    never writes an older value back, and kept past the user's deletion,
+    so its tokens stop authenticating on every worker.
+    """
+    user = models.OneToOneField(
+        User, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='token_revocation',
+    )
+    revoked_at = models.BigIntegerField()
@@ -1,2 +1,2 @@
-from authapp.serializers.user_management import UserSerializer
+from authapp.serializers.user_management import UserSerializer, UserBatchItemSerializer, UserBatchSerializer
 from authapp.serializers.jwt_token import TokenSerializer
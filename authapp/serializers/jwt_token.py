@@ -1,4 +1,6 @@
+from django.conf import settings
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from authapp import last_login
 
 
 class TokenSerializer(TokenObtainPairSerializer):
@@ -7,6 +9,7 @@ class TokenSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
 
         # Add custom claims
+        token['username'] = user.username
         token['first_name'] = user.first_name
         token['last_name'] = user.last_name
         token['email'] = user.email
@@ -15,3 +18,9 @@ class TokenSerializer(TokenObtainPairSerializer):
         # del token['user_id']
 
         return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if settings.LAST_LOGIN_BUFFERED:
+            last_login.record(self.user)
+        return data
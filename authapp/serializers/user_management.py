@@ -1,30 +1,113 @@
-from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from django.utils.crypto import constant_time_compare
+from rest_framework import serializers
 from rest_framework.serializers import ValidationError
-from django.contrib.auth.hashers import make_password, check_password
 
 User = get_user_model()
 
+# Role of self-registered users. Other roles, the service role among them
+# (which picks a cheaper password hasher), are only given by admins through
+# bulk provisioning.
+REGISTERED_ROLE = 'user'
+
+# Uniqueness of username and email is left to the database indexes, so
+# registration runs no lookup queries; see `unique_violation`.
+UNIQUE_FIELD_ERRORS = {
+    'username': "A user with that username already exists.",
+    'email': 'Email already in use.',
+}
+
+
+# Prefix of SQLite's unique violations, which end with the table's columns.
+SQLITE_UNIQUE_FAILED = 'UNIQUE constraint failed: '
+
+
+def violated_field(error):
+    """
+    The field of the unique index an IntegrityError was raised by. PostgreSQL
+    names the constraint; SQLite lists `table.column`. The message itself
+    can quote the offending value, so it is not searched.
+    """
+    table = User._meta.db_table
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        name = diag.constraint_name or ''
+        if name == 'user_email_unique':
+            return 'email'
+        # The constraint Django names after the `unique=True` column.
+        if name.startswith(f'{table}_username_'):
+            return 'username'
+        return None
+    message = str(error)
+    if message.startswith(SQLITE_UNIQUE_FAILED):
+        columns = message[len(SQLITE_UNIQUE_FAILED):].split(', ')
+        for field in UNIQUE_FIELD_ERRORS:
+            if columns == [f'{table}.{field}']:
+                return field
+    return None
+
+
+def unique_violation(error):
+    """
+    Field error for an IntegrityError raised by the username or email index,
+    or None for any other constraint.
+    """
+    field = violated_field(error)
+    if field is None:
+        return None
+    return {field: [UNIQUE_FIELD_ERRORS[field]]}
+
 
 class UserSerializer(serializers.ModelSerializer):
+    confirm_password = serializers.CharField(write_only=True)
 
     class Meta:
         model = User
         fields = ('id', 'email', 'first_name', 'last_name', 'password', 'confirm_password', 'roles', 'username')
         extra_kwargs = {
             'password': {'write_only': True, },
+            'roles': {'read_only': True},
+            'username': {'validators': [UnicodeUsernameValidator()]},
         }
 
     def validate(self, attrs):
-        user_mail_id = attrs.get('email', None)
-        print(attrs.get('password'), attrs.get('confirm_password'))
-        if check_password(attrs.get('password'), attrs.get('confirm_password')):
+        if not constant_time_compare(attrs['password'], attrs.pop('confirm_password')):
             raise ValidationError({"password": "Password fields didn't match."})
-        if user_mail_id:
-            user_mail_exist = User.objects.filter(email=user_mail_id).exists()
-            if user_mail_exist:
-                raise ValidationError({"email": 'Email already in use.'})
         return attrs
 
-    def validate_password(self, value):
-        return make_password(value)
+    def create(self, validated_data):
+        # create_user hashes the password, once, with the user's hasher.
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(roles=REGISTERED_ROLE, **validated_data)
+        except IntegrityError as error:
+            errors = unique_violation(error)
+            if errors is None:
+                raise
+            raise ValidationError(errors)
+
+
+class UserBatchItemSerializer(serializers.ModelSerializer):
+    """
+    One user of a bulk provisioning request. Users without a password get an
+    unusable one and sign in once it is set.
+    """
+
+    class Meta:
+        model = User
+        fields = ('email', 'first_name', 'last_name', 'password', 'roles', 'username')
+        extra_kwargs = {
+            'password': {'required': False},
+            'username': {'validators': [UnicodeUsernameValidator()]},
+        }
+
+
+class UserBatchSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.USER_BULK_MAX_ITEMS,
+    )
@@ -1,8 +1,9 @@
 from django.urls import re_path
-from authapp.viewsets import UserViewSet
+from authapp.viewsets import UserViewSet, UserBulkViewSet
 
 
 urlpatterns = [
     # re_path('^get-user/$', UserViewSet.as_view({'get': 'list'}), name='user'),
     re_path('^register-user/$', UserViewSet.as_view({'post': 'create'}), name='register'),
+    re_path('^provision-users/$', UserBulkViewSet.as_view({'post': 'create'}), name='provision-users'),
 ]
@@ -1 +1 @@
-from authapp.viewsets.user_management import UserViewSet, TokenView
+from authapp.viewsets.user_management import UserViewSet, UserBulkViewSet, TokenView
@@ -1,11 +1,12 @@
 from rest_framework.viewsets import ModelViewSet
+from authapp.bulk import provision_users
 from authapp.models import User
-from authapp.serializers import UserSerializer
+from authapp.serializers import UserSerializer, UserBatchItemSerializer, UserBatchSerializer
 from rest_framework.response import Response
-from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
 from rest_framework_simplejwt.views import TokenObtainPairView
 from authapp.serializers import TokenSerializer
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
 
 class UserViewSet(ModelViewSet):
@@ -22,6 +23,34 @@ class UserViewSet(ModelViewSet):
                 return Response(serializer.data, status=HTTP_201_CREATED)
 
 
+class UserBulkViewSet(ModelViewSet):
+    queryset = User.objects.all()
+    serializer_class = UserBatchSerializer
+    http_method_names = ('post',)
+    permission_classes = (IsAdminUser,)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Provision the users listed in `users` in one transaction. Invalid
+        entries, and entries whose username or email is taken, are reported
+        by index and skipped.
+        """
+        serializer = UserBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entries, errors = [], []
+        for index, item in enumerate(serializer.validated_data['users']):
+            item_serializer = UserBatchItemSerializer(data=item)
+            if item_serializer.is_valid():
+                entries.append((index, item_serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': item_serializer.errors})
+        created, conflicts = provision_users(entries)
+        res = dict()
+        res['created'] = created
+        res['errors'] = sorted(errors + conflicts, key=lambda error: error['index'])
+        return Response(res, status=HTTP_200_OK if created else HTTP_400_BAD_REQUEST)
+
+
 class TokenView(TokenObtainPairView):
     permission_classes = (AllowAny,)
     serializer_class = TokenSerializer
@@ -0,0 +1,10 @@
+"""
+Admin URLs, included lazily by server.urls. Registering the admin modules
+of the apps happens here rather than at startup (see SimpleAdminConfig in
+INSTALLED_APPS).
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
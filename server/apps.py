@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ServerConfig(AppConfig):
+    name = 'server'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from server import sqlite
+        connection_created.connect(sqlite.apply_pragmas)
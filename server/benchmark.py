@@ -0,0 +1,186 @@
+import statistics
+import time
+import tracemalloc
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from authapp import last_login
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+from snippetapp import counts
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+SEED_BATCH_SIZE = 5000
+
+# Metrics compared against a baseline, and whether a higher value is worse.
+COMPARED_METRICS = {
+    'p50': True,
+    'p95': True,
+    'p99': True,
+    'requests_per_second': False,
+    'queries': True,
+    'peak_memory_kb': True,
+}
+
+
+class Endpoint:
+    """
+    A request the suite measures: `path(seeded)` gives the URL and
+    `payload(seeded, index)` the body of the `index`th request, if any.
+    """
+
+    def __init__(self, name, method, path, payload=None, authenticated=True, status=200):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.authenticated = authenticated
+        self.status = status
+
+    def request(self, client, seeded, index):
+        path = self.path(seeded)
+        data = self.payload(seeded, index) if self.payload else None
+        return getattr(client, self.method)(path, data, content_type='application/json')
+
+
+ENDPOINTS = {
+    endpoint.name: endpoint for endpoint in (
+        Endpoint('snippet-list', 'get', lambda seeded: reverse('snippet-list')),
+        Endpoint('overview-list', 'get', lambda seeded: reverse('overview-list')),
+        Endpoint('tag-detail', 'get', lambda seeded: reverse('tag-detail', args=(seeded['tag_id'],))),
+        Endpoint(
+            'token', 'post', lambda seeded: reverse('token_obtain_pair'),
+            lambda seeded, index: {'username': seeded['username'], 'password': BENCHMARK_PASSWORD},
+            authenticated=False,
+        ),
+        Endpoint(
+            'register', 'post', lambda seeded: reverse('register'),
+            lambda seeded, index: {
+                'username': f'benchmark_register_{index}',
+                'email': f'benchmark_register_{index}@example.com',
+                'password': BENCHMARK_PASSWORD,
+                'confirm_password': BENCHMARK_PASSWORD,
+                'first_name': 'Benchmark',
+                'last_name': 'User',
+                'roles': 'user',
+            },
+            authenticated=False, status=201,
+        ),
+    )
+}
+
+
+def seed(users, tags, snippets):
+    """
+    Bulk insert `users` users, `tags` tags and `snippets` snippets spread
+    over them, and return what the endpoints need to address them.
+    """
+    password = make_password(BENCHMARK_PASSWORD)
+    User.objects.bulk_create(
+        (User(username=f'benchmark_{index}', email=f'benchmark_{index}@example.com', password=password)
+         for index in range(users)),
+        batch_size=SEED_BATCH_SIZE,
+    )
+    Tag.objects.bulk_create((Tag(title=f'Benchmark tag {index}') for index in range(tags)), batch_size=SEED_BATCH_SIZE)
+    # SQLite does not return the ids of bulk inserts.
+    user_ids = list(User.objects.order_by('-id').values_list('id', flat=True)[:users])
+    tag_ids = list(Tag.objects.order_by('-id').values_list('id', flat=True)[:tags])
+    Snippet.objects.bulk_create(
+        (Snippet(owner_id=user_ids[index % users], tag_id=tag_ids[index % tags], content=f'Benchmark snippet {index}.')
+         for index in range(snippets)),
+        batch_size=SEED_BATCH_SIZE,
+    )
+    counts.rebuild(Snippet)
+    user = User.objects.get(id=user_ids[0])
+    return {'username': user.username, 'tag_id': tag_ids[0], 'token': str(RefreshToken.for_user(user).access_token)}
+
+
+def percentile(quantiles, percent):
+    return round(quantiles[percent - 1] * 1000, 2)
+
+
+def measure(endpoint, seeded, requests):
+    """
+    Latency percentiles (ms) and throughput of `requests` sequential
+    requests to `endpoint`, the queries of one request and the peak memory
+    allocated while serving it.
+    """
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {seeded['token']}") if endpoint.authenticated else Client()
+    # Warm up, then count the queries and memory of a single request.
+    endpoint.request(client, seeded, -1)
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        tracemalloc.start()
+        response = endpoint.request(client, seeded, -2)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if response.status_code != endpoint.status:
+        raise AssertionError(f'{endpoint.name} answered {response.status_code}: {response.content[:200]!r}')
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for index in range(requests):
+        request_start = time.perf_counter()
+        errors += endpoint.request(client, seeded, index).status_code != endpoint.status
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'p50': percentile(quantiles, 50),
+        'p95': percentile(quantiles, 95),
+        'p99': percentile(quantiles, 99),
+        'requests_per_second': round(requests / elapsed, 1),
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'errors': errors,
+    }
+
+
+def run(users=1000, tags=100, snippets=10000, requests=50, endpoints=None, response_cache=False):
+    """
+    Seed the given volumes and measure each of `endpoints` (default: all).
+    Everything runs in a transaction that is rolled back, so the database
+    is left as it was.
+    """
+    if requests < 2:
+        raise ValueError('At least 2 requests per endpoint are needed for percentiles.')
+    results = {
+        'volumes': {'users': users, 'tags': tags, 'snippets': snippets},
+        'requests': requests,
+        'response_cache': response_cache,
+        'endpoints': {},
+    }
+    with override_settings(RESPONSE_CACHE_ENABLED=response_cache), transaction.atomic():
+        seeded = seed(users, tags, snippets)
+        for name in endpoints or ENDPOINTS:
+            results['endpoints'][name] = measure(ENDPOINTS[name], seeded, requests)
+        # Write the buffered logins of the seeded users before they are rolled back.
+        last_login.flush()
+        transaction.set_rollback(True)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Regressions of `results` against `baseline`, as messages: metrics more
+    than `tolerance` (a fraction) worse, and any extra query.
+    """
+    regressions = []
+    for name, metrics in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            if metric not in previous:
+                continue
+            allowed = 0 if metric == 'queries' else tolerance
+            if higher_is_worse:
+                regressed = metrics[metric] > previous[metric] * (1 + allowed)
+            else:
+                regressed = metrics[metric] < previous[metric] * (1 - allowed)
+            if regressed:
+                regressions.append(f'{name} {metric}: {previous[metric]} -> {metrics[metric]}')
+    return regressions
@@ -0,0 +1,184 @@
+import gzip
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Levels suited to compressing each response as it is served.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# API payloads. HTML is left alone: pages that reflect input next to a secret
+# (the admin's CSRF token) would leak it through their compressed size (BREACH).
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson')
+
+
+class GzipCompressor:
+    def __init__(self):
+        # wbits 31: a zlib stream with the gzip header and trailer.
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class Encoding:
+    """
+    A content coding: `compress` encodes a whole body, `compressor` makes
+    an incremental compressor for streamed bodies.
+    """
+
+    def __init__(self, compress, compressor):
+        self.compress = compress
+        self.compressor = compressor
+
+
+ENCODINGS = {'gzip': Encoding(lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0), GzipCompressor)}
+if brotli is not None:
+    ENCODINGS['br'] = Encoding(lambda data: brotli.compress(data, quality=BROTLI_QUALITY), BrotliCompressor)
+if zstandard is not None:
+    ENCODINGS['zstd'] = Encoding(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress, ZstdCompressor)
+
+
+def accepted_encodings(header):
+    """
+    The quality (q) of each coding listed in an Accept-Encoding header.
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate(header):
+    """
+    The available coding of COMPRESSION_ENCODINGS the client accepts with the
+    highest quality, the first listed on ties, or None.
+    """
+    accepted = accepted_encodings(header)
+    chosen, best = None, 0
+    for name in settings.COMPRESSION_ENCODINGS:
+        quality = accepted.get(name, accepted.get('*', 0))
+        if name in ENCODINGS and quality > best:
+            chosen, best = name, quality
+    return chosen
+
+
+def compress_stream(encoding, chunks):
+    """
+    Compress streamed chunks, flushing once COMPRESSION_STREAM_FLUSH_SIZE
+    bytes came in since the last flush, so the client receives data as the
+    stream goes without a flush per (small) chunk.
+    """
+    compressor = encoding.compressor()
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= settings.COMPRESSION_STREAM_FLUSH_SIZE:
+            data += compressor.flush()
+            pending = 0
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or '+json' in content_type
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses of COMPRESSION_MIN_SIZE bytes or more, and
+    streamed ones, with the best coding of COMPRESSION_ENCODINGS the client
+    accepts: brotli and zstd when their packages are installed, else gzip.
+    Strong ETags become weak, as the bytes no longer match the entity they
+    were computed for.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        name = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if name is None:
+            return response
+        encoding = ENCODINGS[name]
+        if response.streaming:
+            response.streaming_content = compress_stream(encoding, response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = encoding.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = name
+        return response
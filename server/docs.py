@@ -0,0 +1,192 @@
+"""
+Swagger UI of the API and its precomputed OpenAPI document, imported on
+their first request by server.urls.
+"""
+import hashlib
+import json
+import os
+import threading
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import URLPattern, get_resolver
+from django.utils.functional import Promise
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from server.lazy_urls import is_lazy
+
+info = openapi.Info(
+    title="Snippet API",
+    default_version="v1",
+    description="API endpoints available in snippet App.",
+)
+
+schema_view = get_schema_view(
+    info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+ui_view = schema_view.with_ui("swagger", cache_timeout=0)
+
+
+def describe_field(field):
+    """
+    The type and options of a serializer field, or the fields of a nested
+    serializer.
+    """
+    if isinstance(field, ListSerializer):
+        return ['many', describe_field(field.child)]
+    if isinstance(field, BaseSerializer):
+        return {name: describe_field(child) for name, child in field.fields.items()}
+    # Querysets and validators are left out: their repr would query the database.
+    options = {name: str(value) for name, value in field._kwargs.items() if isinstance(value, (str, int, float, Promise))}
+    child = getattr(field, 'child', None)
+    return [type(field).__name__, options, describe_field(child) if child is not None else None]
+
+
+def serializer_fields(callback):
+    """
+    The fields of the serializers a view declares: its `serializer_class`
+    and those of the viewset actions it routes to.
+    """
+    view = getattr(callback, 'cls', None)
+    if view is None:
+        return None
+    classes = [getattr(view, 'serializer_class', None)]
+    for action in (getattr(callback, 'actions', None) or {}).values():
+        classes.append(getattr(getattr(view, action, None), 'kwargs', {}).get('serializer_class'))
+    return [describe_field(serializer()) for serializer in classes if serializer is not None]
+
+
+def url_entries(patterns, prefix=''):
+    """
+    (route, view, name, serializer fields) of every URL pattern under
+    `patterns`, views as their dotted path (and actions, for viewsets).
+    Lazy URLconfs are listed by module rather than imported.
+    """
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLPattern):
+            view = getattr(pattern.callback, 'cls', pattern.callback)
+            name = getattr(view, 'view_path', None) or f'{view.__module__}.{view.__qualname__}'
+            actions = getattr(pattern.callback, 'actions', None)
+            view = f'{name}{sorted(actions.items()) if actions else ""}'
+            yield route, view, pattern.name, serializer_fields(pattern.callback)
+        elif is_lazy(pattern):
+            yield route, pattern.urlconf_name, pattern.namespace, None
+        else:
+            yield from url_entries(pattern.url_patterns, route)
+
+
+def urlconf_fingerprint():
+    """
+    Hash of the routes, views and serializer fields of the URLconf, which
+    changes when the schema has to be generated again.
+    """
+    entries = json.dumps(list(url_entries(get_resolver().url_patterns)), sort_keys=True)
+    return hashlib.sha256(entries.encode()).hexdigest()
+
+
+def generate_schema():
+    """
+    The OpenAPI document of the API as JSON. It is generated without a
+    request, so it holds no host and serves every one, and from the eager
+    URL patterns only, which leaves the admin unimported.
+    """
+    patterns = [pattern for pattern in get_resolver().url_patterns if not is_lazy(pattern)]
+    schema = OpenAPISchemaGenerator(info, patterns=patterns).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+class Schema:
+    """
+    A saved document: the URLconf fingerprint it was generated for, its
+    body, and an ETag every worker computes alike from the saved file.
+    """
+
+    def __init__(self, saved):
+        self.urlconf = saved['urlconf']
+        self.body = json.dumps(saved['schema']).encode()
+        self.etag = quote_etag(hashlib.sha256(self.body).hexdigest())
+
+
+def write_schema(path=None):
+    """
+    Generate the document and save it with the URLconf fingerprint to
+    API_SCHEMA_PATH.
+    """
+    path = path or settings.API_SCHEMA_PATH
+    saved = {'urlconf': urlconf_fingerprint(), 'schema': json.loads(generate_schema())}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(saved, file)
+    # Workers reading the file never see it half written.
+    os.replace(temporary, path)
+    return Schema(saved)
+
+
+def read_schema(path=None):
+    """
+    The saved document, or None when it is missing or unreadable.
+    """
+    try:
+        with open(path or settings.API_SCHEMA_PATH) as file:
+            return Schema(json.load(file))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_schema = None
+_lock = threading.Lock()
+
+
+def load_schema():
+    """
+    The document of this URLconf: loaded once per process from
+    API_SCHEMA_PATH, and generated again only when the file is missing or
+    was saved for other routes.
+    """
+    global _schema
+    with _lock:
+        if _schema is None:
+            fingerprint = urlconf_fingerprint()
+            schema = read_schema()
+            _schema = schema if schema is not None and schema.urlconf == fingerprint else write_schema()
+        return _schema
+
+
+def clear_schema():
+    global _schema
+    with _lock:
+        _schema = None
+
+
+def schema_json(request):
+    """
+    The precomputed document with a strong ETag; clients revalidate it and
+    get a 304 until the routes change.
+    """
+    schema = load_schema()
+    response = get_conditional_response(request, etag=schema.etag)
+    if response is None:
+        response = HttpResponse(schema.body, content_type='application/json')
+    response['ETag'] = schema.etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def swagger_ui(request, *args, **kwargs):
+    """
+    The Swagger UI page, which fetches the document from the same URL with
+    `?format=openapi`.
+    """
+    if request.GET.get('format') == 'openapi':
+        return schema_json(request)
+    return ui_view(request, *args, **kwargs)
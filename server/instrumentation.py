@@ -0,0 +1,191 @@
+import random
+import threading
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+# Upper bounds of the histogram buckets of each metric, besides +Inf.
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'request_duration_seconds': ("Wall time of the request through the middleware stack.", DURATION_BUCKETS),
+    'db_queries': ("Database queries run by the request.", COUNT_BUCKETS),
+    'db_duration_seconds': ("Time the request spent in database queries.", DURATION_BUCKETS),
+    'render_duration_seconds': ("Time spent rendering (serializing) the response body.", DURATION_BUCKETS),
+    'response_size_bytes': ("Size of the response body as sent; streamed responses are not counted.", SIZE_BUCKETS),
+    'middleware_duration_seconds': ("Time a middleware spent on the request itself.", DURATION_BUCKETS),
+}
+
+
+class Histogram:
+    """
+    Observations per bucket, their sum and count. `Registry.exposition`
+    accumulates the buckets as Prometheus expects.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Histograms of each metric in METRICS per (view, method), shared by the
+    threads of the process.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, values):
+        with self.lock:
+            for name, value in values.items():
+                key = (name, labels)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(METRICS[name][1])
+                histogram.observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def exposition(self, prefix='snippet'):
+        """
+        The histograms in the Prometheus text format.
+        """
+        with self.lock:
+            snapshot = {
+                key: (list(histogram.counts), histogram.sum, histogram.count)
+                for key, histogram in self.histograms.items()
+            }
+        lines = []
+        for name, (description, buckets) in METRICS.items():
+            metric = f'{prefix}_{name}'
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (key_name, labels), (counts, total, count) in sorted(snapshot.items()):
+                if key_name != name:
+                    continue
+                label_text = ','.join(f'{label}="{escape(value)}"' for label, value in labels)
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label_text}}} {total}')
+                lines.append(f'{metric}_count{{{label_text}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """
+    Execute wrapper counting the queries of a connection and timing them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def is_sampled():
+    rate = settings.INSTRUMENTATION_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+class InstrumentationMiddleware:
+    """
+    Time sampled requests (INSTRUMENTATION_SAMPLE_RATE) through the rest of
+    the stack, with their database queries and response rendering, record
+    them in `registry` and, with INSTRUMENTATION_SERVER_TIMING, report them
+    in a Server-Timing header. Requests that are not sampled only cost the
+    sampling check.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_sampled():
+            return self.get_response(request)
+        timer = QueryTimer()
+        request._render_duration = 0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        values = {
+            'request_duration_seconds': duration,
+            'db_queries': timer.count,
+            'db_duration_seconds': timer.duration,
+            'render_duration_seconds': request._render_duration,
+        }
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        match = request.resolver_match
+        labels = (('view', match.view_name if match else 'unmatched'), ('method', request.method))
+        registry.observe(labels, values)
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            response['Server-Timing'] = ', '.join((
+                f'db;desc="{timer.count} queries";dur={timer.duration * 1000:.2f}',
+                f'render;dur={request._render_duration * 1000:.2f}',
+                f'total;dur={duration * 1000:.2f}',
+            ))
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before the handler renders the response.
+        if hasattr(request, '_render_duration'):
+            start = time.perf_counter()
+
+            def rendered(response):
+                request._render_duration += time.perf_counter() - start
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """
+    The histograms of this process for Prometheus. Scrapers send
+    METRICS_TOKEN as a bearer token; without one the endpoint is only
+    served with DEBUG on.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), expected):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
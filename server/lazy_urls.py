@@ -0,0 +1,35 @@
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils.module_loading import import_string
+
+
+def lazy_include(route, urlconf_name, namespace=None):
+    """
+    Like `path(route, include(urlconf_name))`, but the URLconf module is only
+    imported once a request reaches `route` (or a URL is reversed), so the
+    modules behind it stay out of worker startup.
+    """
+    return URLResolver(RoutePattern(route, is_endpoint=False), urlconf_name, app_name=namespace, namespace=namespace)
+
+
+def is_lazy(pattern):
+    """
+    Whether `pattern` was made by `lazy_include`: walking its URL patterns
+    would import the URLconf behind it.
+    """
+    return isinstance(pattern, URLResolver) and isinstance(pattern.urlconf_name, str)
+
+
+class LazyView:
+    """
+    View imported from `view_path` on its first request.
+    """
+
+    def __init__(self, view_path):
+        self.view_path = view_path
+        self.view = None
+
+    def __call__(self, request, *args, **kwargs):
+        if self.view is None:
+            self.view = import_string(self.view_path)
+        return self.view(request, *args, **kwargs)
@@ -0,0 +1,139 @@
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+from server.instrumentation import registry
+
+
+def profile_for(path):
+    """
+    Name of the MIDDLEWARE_PROFILES entry serving `path`: the profile of the
+    first MIDDLEWARE_PROFILE_PATHS prefix it starts with, else the default.
+    """
+    for prefix, profile in settings.MIDDLEWARE_PROFILE_PATHS:
+        if path.startswith(prefix):
+            return profile
+    return settings.MIDDLEWARE_DEFAULT_PROFILE
+
+
+class Probe:
+    """
+    Records when the request enters and leaves the next layer of a timed
+    chain, in `request._middleware_probes[index]`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.index = None
+
+    def __call__(self, request):
+        times = request._middleware_probes[self.index] = [time.perf_counter(), None]
+        try:
+            return self.get_response(request)
+        finally:
+            times[1] = time.perf_counter()
+
+
+class Profile:
+    """
+    One middleware chain around `get_response`, with the view, template
+    response and exception hooks the handler would collect from it. With
+    `timed`, probes between the middleware time each of them.
+    """
+
+    def __init__(self, name, paths, get_response, timed=False):
+        self.name = name
+        self.paths = []
+        self.view_hooks = []
+        self.template_response_hooks = []
+        self.exception_hooks = []
+        handler = get_response
+        instances = []
+        for path in reversed(paths):
+            inner = Probe(handler) if timed else handler
+            try:
+                middleware = import_string(path)(inner)
+            except MiddlewareNotUsed:
+                continue
+            instances.append((path, middleware, inner))
+            # As the handler does, so an error answers through the outer middleware.
+            handler = convert_exception_to_response(middleware)
+        self.handler = handler
+        instances.reverse()
+        for index, (path, middleware, inner) in enumerate(instances):
+            self.paths.append(path)
+            if timed:
+                # Probe `index` sits just inside middleware `index`.
+                inner.index = index
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.append(middleware.process_view)
+            # The handler runs these two innermost first.
+            if hasattr(middleware, 'process_template_response'):
+                self.template_response_hooks.insert(0, middleware.process_template_response)
+            if hasattr(middleware, 'process_exception'):
+                self.exception_hooks.insert(0, middleware.process_exception)
+
+    def observe(self, request, start, end):
+        """
+        Record the time each middleware spent on `request` itself: from its
+        entry to the next layer's entry, and from that layer's exit to its own.
+        """
+        probes = request._middleware_probes
+        bounds = [(start, end)] + [probes.get(index) for index in range(len(self.paths))]
+        for index, path in enumerate(self.paths):
+            outer, inner = bounds[index], bounds[index + 1]
+            duration = outer[1] - outer[0]
+            if inner is not None:
+                duration -= inner[1] - inner[0]
+            registry.observe((('profile', self.name), ('middleware', path)), {'middleware_duration_seconds': duration})
+
+
+class ProfileMiddleware:
+    """
+    Run the MIDDLEWARE_PROFILES chain that MIDDLEWARE_PROFILE_PATHS picks for
+    the request path, so API routes can skip the middleware only browser
+    pages need. The chain's view, template response and exception hooks
+    run where this middleware sits in MIDDLEWARE. With
+    INSTRUMENTATION_MIDDLEWARE_TIMING, each middleware's own time goes to
+    the `middleware_duration_seconds` histograms.
+    """
+
+    def __init__(self, get_response):
+        timed = settings.INSTRUMENTATION_MIDDLEWARE_TIMING
+        self.timed = timed
+        self.profiles = {
+            name: Profile(name, paths, get_response, timed)
+            for name, paths in settings.MIDDLEWARE_PROFILES.items()
+        }
+
+    def __call__(self, request):
+        profile = self.profiles[profile_for(request.path_info)]
+        request._middleware_profile = profile
+        if not self.timed:
+            return profile.handler(request)
+        request._middleware_probes = {}
+        start = time.perf_counter()
+        try:
+            return profile.handler(request)
+        finally:
+            profile.observe(request, start, time.perf_counter())
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for hook in request._middleware_profile.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        for hook in request._middleware_profile.template_response_hooks:
+            response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        for hook in request._middleware_profile.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
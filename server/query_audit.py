@@ -0,0 +1,155 @@
+import logging
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import DatabaseError, connections
+from server import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Modules whose execute wrappers sit between the code and the query.
+WRAPPER_FILES = {__file__, instrumentation.__file__}
+
+# Placeholder lists of IN clauses, whose length varies with the values.
+_PLACEHOLDERS = re.compile(r'\((?:%s, )+%s\)')
+
+
+class QueryAuditError(Exception):
+    """
+    Raised when QUERY_AUDIT is 'raise' and a request repeats a query shape or
+    runs a slow query.
+    """
+
+
+def query_shape(sql):
+    return _PLACEHOLDERS.sub('(%s, ...)', sql)
+
+
+def origin():
+    """
+    The innermost frame of project code (not installed packages nor
+    execute wrappers) on the stack, as `path:line in function`.
+    """
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base) and 'site-packages' not in filename and filename not in WRAPPER_FILES:
+            return f'{os.path.relpath(filename, base)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class Query:
+    def __init__(self, alias, sql, params, many, duration, origin):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.duration = duration
+        self.origin = origin
+
+
+class QueryAudit:
+    """
+    Record the queries run on every connection of this thread inside the
+    block. `findings` reports the SELECT shapes run `repeat_limit` times or
+    more (the N+1 pattern) and the queries slower than `slow_ms`.
+    """
+
+    def __init__(self, repeat_limit=None, slow_ms=None):
+        self.repeat_limit = settings.QUERY_AUDIT_REPEAT_LIMIT if repeat_limit is None else repeat_limit
+        self.slow_ms = settings.QUERY_AUDIT_SLOW_MS if slow_ms is None else slow_ms
+        self.queries = []
+        self.stack = None
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries.append(Query(context['connection'].alias, sql, params, many, duration, origin()))
+
+    def repeated(self):
+        """
+        (count, query) of each SELECT shape run `repeat_limit` times or more,
+        the query being its first run.
+        """
+        shapes = defaultdict(list)
+        for query in self.queries:
+            if query.sql.lstrip()[:6].upper() == 'SELECT':
+                shapes[(query.alias, query_shape(query.sql), query.origin)].append(query)
+        return [(len(runs), runs[0]) for runs in shapes.values() if len(runs) >= self.repeat_limit]
+
+    def slow(self):
+        return [query for query in self.queries if query.duration >= self.slow_ms]
+
+    def findings(self):
+        findings = [
+            f'{count} queries of the same shape from {query.origin}: {query.sql}'
+            for count, query in self.repeated()
+        ]
+        for query in self.slow():
+            plan = explain(query)
+            findings.append(
+                f'{query.duration:.1f}ms query from {query.origin}: {query.sql}' + (f'\n{plan}' if plan else '')
+            )
+        return findings
+
+
+def explain(query):
+    """
+    The plan of a recorded SELECT, or '' when it cannot be explained.
+    """
+    if query.many or query.sql.lstrip()[:6].upper() != 'SELECT':
+        return ''
+    connection = connections[query.alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {query.sql}', query.params)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+    except DatabaseError:
+        return ''
+
+
+def report(findings, context):
+    """
+    Log `findings` or, when QUERY_AUDIT is 'raise', fail with them.
+    """
+    if not findings:
+        return
+    message = f'{context}:\n' + '\n'.join(findings)
+    if settings.QUERY_AUDIT == 'raise':
+        raise QueryAuditError(message)
+    logger.warning(message)
+
+
+class QueryAuditMiddleware:
+    """
+    Audit the queries of each request when QUERY_AUDIT is 'log' or 'raise'.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_AUDIT == 'off':
+            return self.get_response(request)
+        with QueryAudit() as audit:
+            response = self.get_response(request)
+        report(audit.findings(), f'{request.method} {request.get_full_path()}')
+        return response
@@ -0,0 +1,90 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_CACHE = 'replicas'
+
+# Database alias reads of the current request go to, when it may use a replica.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def pinned_key(user_id):
+    return f'pinned:{user_id}'
+
+
+def pin_primary(user):
+    """
+    Send the reads of `user` to the primary for DATABASE_REPLICA_LAG seconds,
+    so the user sees their own writes before the replicas catch up.
+    """
+    caches[REPLICA_CACHE].set(pinned_key(user.pk), time.time(), settings.DATABASE_REPLICA_LAG)
+
+
+def is_pinned(user):
+    pinned_at = caches[REPLICA_CACHE].get(pinned_key(user.pk))
+    # The entry expires with the pin, but not every backend drops it on time.
+    return pinned_at is not None and time.time() - pinned_at < settings.DATABASE_REPLICA_LAG
+
+
+def choose_replica(user=None):
+    """
+    A replica alias for the reads of `user`, or None when reads must stay on
+    the primary.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return None
+    if user is not None and user.is_authenticated and is_pinned(user):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def route_reads(alias):
+    """
+    Route the reads of the current context to `alias` (None: the primary)
+    until `restore_reads` is called with the returned token.
+    """
+    return _read_alias.set(alias)
+
+
+def restore_reads(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def reading_from(alias):
+    """
+    Route the reads made inside the block to `alias` (None: the primary).
+    """
+    token = route_reads(alias)
+    try:
+        yield
+    finally:
+        restore_reads(token)
+
+
+def read_alias():
+    return _read_alias.get()
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica chosen for the current request, if any, and
+    everything else to the primary. Replicas mirror the primary, so
+    relations between them are allowed and only the primary is migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -35,14 +35,18 @@ ALLOWED_HOSTS = ['*']
 
 # Application definition
 
+# Serve the Swagger UI at /docs/.
+API_DOCS = os.getenv("API_DOCS", "true" if DEBUG else "false") == "true"
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # The admin modules are registered when the admin URLs are first used.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    "drf_yasg",
+    'server',
     'snippetapp',
     'authapp',
     'rest_framework',
@@ -50,26 +54,71 @@ INSTALLED_APPS = [
     "corsheaders",
 ]
 
+if API_DOCS:
+    INSTALLED_APPS.append("drf_yasg")
+
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    "csp.middleware.CSPMiddleware",
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    "corsheaders.middleware.CorsMiddleware",
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'server.instrumentation.InstrumentationMiddleware',
+    'server.query_audit.QueryAuditMiddleware',
+    'server.middleware_profiles.ProfileMiddleware',
 ]
 
+# JSON responses of the 'api' profile of COMPRESSION_MIN_SIZE bytes or more
+# and streamed exports are compressed with the first of COMPRESSION_ENCODINGS
+# the client accepts and this install supports (br needs `brotli`, zstd needs
+# `zstandard`). Streams are flushed to the client every
+# COMPRESSION_STREAM_FLUSH_SIZE input bytes.
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_STREAM_FLUSH_SIZE = int(os.getenv("COMPRESSION_STREAM_FLUSH_SIZE", 16384))
+
+# Middleware chains ProfileMiddleware picks from by path. API clients send
+# tokens and read JSON, so API routes skip sessions, CSRF, messages, CSP and
+# frame options; the admin and everything else keep the full chain.
+MIDDLEWARE_PROFILES = {
+    'full': [
+        'django.middleware.security.SecurityMiddleware',
+        "csp.middleware.CSPMiddleware",
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        "corsheaders.middleware.CorsMiddleware",
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ],
+    'api': [
+        'server.compression.CompressionMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        "corsheaders.middleware.CorsMiddleware",
+    ],
+}
+MIDDLEWARE_PROFILE_PATHS = (
+    ('/app/', 'api'),
+    ('/token/', 'api'),
+    ('/auth/', 'api'),
+    ('/metrics', 'api'),
+)
+MIDDLEWARE_DEFAULT_PROFILE = 'full'
+
+# The admin's middleware runs from the 'full' profile, out of sight of the
+# admin checks for it.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'server.urls'
 AUTH_USER_MODEL = 'authapp.User'
 
+# Buffer the last_login writes of token logins in memory and write them in
+# batches every LAST_LOGIN_FLUSH_INTERVAL seconds, instead of once per login.
+LAST_LOGIN_BUFFERED = os.getenv("LAST_LOGIN_BUFFERED", "true") == "true"
+LAST_LOGIN_FLUSH_INTERVAL = int(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", 30))
+LAST_LOGIN_FLUSH_BATCH_SIZE = 500
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=25),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
     'ROTATE_REFRESH_TOKENS': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': not LAST_LOGIN_BUFFERED,
 }
 
 DEFAULT_RENDERER_CLASSES = ("rest_framework.renderers.JSONRenderer",)
@@ -77,12 +126,49 @@ DEFAULT_RENDERER_CLASSES = ("rest_framework.renderers.JSONRenderer",)
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': DEFAULT_RENDERER_CLASSES,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'authapp.authentication.SchemeAuthentication',
     ),
 }
 
+# Authentication class per Authorization scheme; each request runs only the
+# one its header names. Requests without the header use the session class.
+AUTH_SCHEMES = {
+    'Bearer': 'authapp.authentication.CachedJWTAuthentication',
+    'Basic': 'authapp.authentication.CachedBasicAuthentication',
+}
+AUTH_SESSION_AUTHENTICATION = 'rest_framework.authentication.SessionAuthentication'
+
+# Remember up to AUTH_BASIC_CACHE_SIZE verified Basic credentials per process
+# for AUTH_BASIC_CACHE_TTL seconds instead of hashing them on every request.
+AUTH_BASIC_CACHE_SIZE = int(os.getenv("AUTH_BASIC_CACHE_SIZE", 1000))
+AUTH_BASIC_CACHE_TTL = int(os.getenv("AUTH_BASIC_CACHE_TTL", 60))
+
+# Build the request user from the access token claims instead of loading it,
+# and keep up to AUTH_TOKEN_CACHE_SIZE validated tokens per process.
+AUTH_STATELESS_USER = os.getenv("AUTH_STATELESS_USER", "true") == "true"
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+# Token revocations made by other workers apply within AUTH_REVOCATION_REFRESH
+# seconds, when each process reads them again.
+AUTH_REVOCATION_REFRESH = int(os.getenv("AUTH_REVOCATION_REFRESH", 5))
+
+# Default page size of paginated endpoints, and the upper bound for `page_size`.
+PAGINATION_PAGE_SIZE = int(os.getenv("PAGE_SIZE", 100))
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", 1000))
+
+# Serve unfiltered totals from the database's planner estimate where available.
+APPROXIMATE_COUNTS = os.getenv("APPROXIMATE_COUNTS") == "true"
+
+# Most snippets accepted by one bulk request, and rows written per statement.
+SNIPPET_BULK_MAX_ITEMS = int(os.getenv("SNIPPET_BULK_MAX_ITEMS", 5000))
+SNIPPET_BULK_BATCH_SIZE = int(os.getenv("SNIPPET_BULK_BATCH_SIZE", 500))
+
+# Most users created by one provisioning request; each password costs one hash.
+USER_BULK_MAX_ITEMS = int(os.getenv("USER_BULK_MAX_ITEMS", 500))
+USER_BULK_BATCH_SIZE = 500
+
+# Rows read from the database per round trip by streaming exports.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -102,17 +188,161 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'server.wsgi.application'
 
+ASGI_APPLICATION = 'server.asgi.application'
+
+# Threads the async read endpoints run their queries and rendering on.
+ASYNC_VIEW_THREADS = int(os.getenv("ASYNC_VIEW_THREADS", 32))
+
+# Share of requests whose time, queries, rendering and size are recorded in
+# histograms served at /metrics (0 turns instrumentation off). Sampled
+# requests report their timings in a Server-Timing header too, unless
+# INSTRUMENTATION_SERVER_TIMING is off.
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", 0))
+INSTRUMENTATION_SERVER_TIMING = os.getenv("INSTRUMENTATION_SERVER_TIMING", "true") == "true"
+# Time each middleware of the profiles (see `python manage.py middleware_report`).
+INSTRUMENTATION_MIDDLEWARE_TIMING = os.getenv("INSTRUMENTATION_MIDDLEWARE_TIMING") == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Audit the queries of each request: report SELECTs of the same shape run
+# QUERY_AUDIT_REPEAT_LIMIT times or more from one line (N+1 lookups) and
+# queries slower than QUERY_AUDIT_SLOW_MS, with their plan. 'log' logs
+# them, 'raise' fails the request (as the test suite does), 'off' skips it.
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "log" if DEBUG else "off")
+QUERY_AUDIT_REPEAT_LIMIT = int(os.getenv("QUERY_AUDIT_REPEAT_LIMIT", 5))
+QUERY_AUDIT_SLOW_MS = float(os.getenv("QUERY_AUDIT_SLOW_MS", 100))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Each shared cache is an in-process LRU by default, or a directory shared by
+# every worker with <PREFIX>_CACHE_BACKEND=file (at <PREFIX>_CACHE_LOCATION).
+# Run several workers with the file backends:
+# `responses` holds cached API responses, and
+# `replicas` records users who recently wrote and read from the primary.
+
+
+def cache_backend(name, prefix, default='locmem'):
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': name,
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv(f"{prefix}_CACHE_LOCATION", BASE_DIR / 'cache' / name),
+        },
+    }
+    return backends[os.getenv(f"{prefix}_CACHE_BACKEND", default)]
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        **cache_backend('responses', 'RESPONSE'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000)),
+        },
+    },
+    # Shared by the workers whenever there are replicas to route reads to.
+    'replicas': {
+        **cache_backend('replicas', 'REPLICA', 'file' if os.getenv("DATABASE_REPLICAS") else 'locmem'),
+        # Pins expire after DATABASE_REPLICA_LAG; culling one early would send
+        # its user's reads to a replica before their writes reach it, so the
+        # cull removes len // CULL_FREQUENCY = no entries.
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("REPLICA_CACHE_MAX_ENTRIES", 1000000)),
+            'CULL_FREQUENCY': 1000000,
+        },
+    },
+}
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "true") == "true"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# SQLite by default; DATABASE_ENGINE=postgresql with DATABASE_NAME, _USER,
+# _PASSWORD, _HOST and _PORT for production. DATABASE_CONN_MAX_AGE keeps
+# connections open between requests. DATABASE_POOLER=pgbouncer suits a
+# PgBouncer pool in transaction mode, which cannot hold server-side cursors.
+
+DATABASE_ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "sqlite")
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DATABASE_ENGINES[DATABASE_ENGINE],
+        'NAME': os.getenv("DATABASE_NAME", BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv("DATABASE_USER", ""),
+        'PASSWORD': os.getenv("DATABASE_PASSWORD", ""),
+        'HOST': os.getenv("DATABASE_HOST", ""),
+        'PORT': os.getenv("DATABASE_PORT", ""),
+        'CONN_MAX_AGE': int(os.getenv("DATABASE_CONN_MAX_AGE", 0)),
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv("DATABASE_POOLER") == "pgbouncer",
     }
 }
 
+# Read replicas, comma separated: hosts with PostgreSQL, database files with
+# SQLite (a copy of the primary standing in for a replica locally). Reads of
+# the snippet endpoints go to a replica, except for users who wrote within
+# the last DATABASE_REPLICA_LAG seconds, who read their writes from the primary.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv("DATABASE_REPLICAS", "").split(","))):
+    alias = f'replica_{index}'
+    location = {'NAME': replica} if DATABASE_ENGINE == 'sqlite' else {'HOST': replica}
+    DATABASES[alias] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_REPLICA_LAG = float(os.getenv("DATABASE_REPLICA_LAG", 5))
+
+DATABASE_ROUTERS = ['server.routers.ReplicaRouter']
+
+# Pragmas applied to each new SQLite connection. SQLITE_PROFILE=performance
+# lets readers run alongside a writer (WAL), syncs at checkpoints instead
+# of every commit, maps 256 MiB of the file, caches 64 MiB of pages and
+# waits up to 5s for the write lock. It trades durability: a power loss can
+# undo the last commits, so the default profile applies none.
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'busy_timeout': 5000,
+    },
+}
+
+SQLITE_PRAGMAS = SQLITE_PROFILES[os.getenv("SQLITE_PROFILE", "default")]
+
+# Run snippet writes on a single writer thread that commits the writes of
+# concurrent requests together, up to SQLITE_WRITE_QUEUE_BATCH at a time.
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE") == "true"
+SQLITE_WRITE_QUEUE_BATCH = int(os.getenv("SQLITE_WRITE_QUEUE_BATCH", 100))
+SQLITE_WRITE_QUEUE_WAIT = float(os.getenv("SQLITE_WRITE_QUEUE_WAIT", 0))
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+# Users with the `service` role hash with SERVICE_ACCOUNT_HASHER_ITERATIONS.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'authapp.hashers.ServiceAccountPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+SERVICE_ACCOUNT_HASHER_ITERATIONS = int(os.getenv("SERVICE_ACCOUNT_HASHER_ITERATIONS", 20000))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -206,4 +436,7 @@ SWAGGER_SETTINGS = {
         }
     },
     "USE_SESSION_AUTH": False,
-}
\ No newline at end of file
+}
+# The OpenAPI document served by /docs/, generated by `python manage.py
+# openapi_schema` or on the first request, and again when the routes change.
+API_SCHEMA_PATH = os.getenv("API_SCHEMA_PATH", BASE_DIR / 'cache' / 'openapi.json')
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Apply SQLITE_PRAGMAS to each new SQLite connection.
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
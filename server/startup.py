@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from django.conf import settings
+
+# What a worker does before its first response: load the application and
+# the URLconf.
+STARTUP_SCRIPT = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from server.{target} import application\n"
+    "from django.urls import resolve\n"
+    "resolve({path!r})\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def run_startup(target='wsgi', path='/app/snippet', importtime=False):
+    """
+    Start `server.<target>` in a fresh interpreter and resolve `path`.
+    Returns the startup time in seconds and, with `importtime`, the
+    interpreter's `-X importtime` report.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', STARTUP_SCRIPT.format(target=target, path=path)]
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.splitlines()[-1]), result.stderr
+
+
+def startup_times(target='wsgi', path='/app/snippet', runs=5):
+    return [run_startup(target, path)[0] for _ in range(runs)]
+
+
+def parse_importtime(report):
+    """
+    (module, own time in µs) of each module in an `-X importtime` report.
+    """
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(own)))
+    return modules
+
+
+def app_of(module, apps):
+    """
+    The entry of `apps` (module paths) that `module` belongs to, else its
+    top-level package.
+    """
+    for app in apps:
+        if module == app or module.startswith(f'{app}.'):
+            return app
+    return module.split('.')[0]
+
+
+def by_app(modules, apps=None):
+    """
+    Import time (µs) and module count per app, slowest first. `apps`
+    defaults to the INSTALLED_APPS packages, longest first so the admin is
+    told apart from the rest of django.contrib.
+    """
+    if apps is None:
+        apps = {app.split('.apps.')[0] for app in settings.INSTALLED_APPS} | {'django'}
+    apps = sorted(apps, key=len, reverse=True)
+    totals = defaultdict(lambda: [0, 0])
+    for module, own in modules:
+        total = totals[app_of(module, apps)]
+        total[0] += own
+        total[1] += 1
+    return sorted(((app, own, count) for app, (own, count) in totals.items()), key=lambda row: -row[1])
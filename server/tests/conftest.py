@@ -1,5 +1,7 @@
 import pytest
 from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
 from authapp.models import User
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -7,6 +9,9 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 @pytest.fixture
 def api_client():
+    # Start each test from cold response and replica caches.
+    for alias in ('responses', 'replicas'):
+        caches[alias].clear()
     user = User.objects.create_user(username='user_one', email='test@email.com', password='test123')
     client = APIClient()
     refresh = RefreshToken.for_user(user)
@@ -34,3 +39,29 @@ def django_db_setup():
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': settings.BASE_DIR / 'db.sqlite3',
     }
+
+
+@pytest.fixture(autouse=True)
+def query_audit(request):
+    """
+    Fail requests that repeat a query shape (N+1) or run a slow query.
+    Benchmarks, which seed large tables, are left alone.
+    """
+    if request.node.get_closest_marker('benchmark'):
+        yield
+        return
+    with override_settings(QUERY_AUDIT='raise'):
+        yield
+
+
+@pytest.fixture
+def api_schema(tmp_path):
+    """
+    Save the OpenAPI document to a temporary file, from a cold process cache.
+    """
+    from server import docs
+    path = tmp_path / 'openapi.json'
+    docs.clear_schema()
+    with override_settings(API_SCHEMA_PATH=path):
+        yield path
+    docs.clear_schema()
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def assert_query_budget(budget, using=DEFAULT_DB_ALIAS):
+    """
+    Fail if the wrapped block runs more than `budget` queries.
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    queries = "\n".join(query['sql'] for query in context.captured_queries)
+    assert executed <= budget, f"{executed} queries exceeded the budget of {budget}:\n{queries}"
+
+
+def assert_list_budget(client, url, seed, budget, row_counts=(1, 30)):
+    """
+    Seed each row count in turn and fetch `url`, failing if any response
+    needs more than `budget` queries. A fixed budget across row counts
+    catches per-row (N+1) lookups.
+    """
+    seeded = 0
+    for row_count in row_counts:
+        seed(row_count - seeded)
+        seeded = row_count
+        with assert_query_budget(budget):
+            response = client.get(url)
+        assert response.status_code == 200
@@ -0,0 +1,272 @@
+import base64
+import os
+import time
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from server.tests.helpers import assert_query_budget
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.authentication import SessionAuthentication
+from authapp import last_login
+from authapp.authentication import credentials, revocations, revoke, tokens
+from authapp.models import TokenRevocation, User
+from authapp.serializers import TokenSerializer
+from snippetapp.models import Snippet, Tag
+
+BENCHMARK_REQUESTS = int(os.environ.get('BENCHMARK_REQUESTS', 200))
+
+
+def basic(username, password):
+    return 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    """
+    Test cases for authenticating from token claims.
+    """
+
+    url = reverse("snippet-list")
+
+    @pytest.fixture
+    def user(self):
+        revocations.clear()
+        return User.objects.create_user(
+            username='user_claims', email='claims@email.com', password='test123',
+            first_name='Claims', last_name='User', roles='user',
+        )
+
+    @pytest.fixture
+    def client(self, api_client, user):
+        client = APIClient()
+        token = TokenSerializer.get_token(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_no_authentication_query(self, client):
+        client.get(self.url)
+        # The revocations were read by the first request; the response is cached.
+        with assert_query_budget(0):
+            response = client.get(self.url)
+        assert response.status_code == 200
+
+    def test_token_is_cached(self, client, monkeypatch):
+        client.get(self.url)
+        monkeypatch.setattr(
+            'rest_framework_simplejwt.authentication.JWTAuthentication.get_validated_token',
+            lambda *args: pytest.fail('Token validated again.'),
+        )
+        assert client.get(self.url).status_code == 200
+
+    def test_writes_as_claimed_user(self, client, user):
+        response = client.post(self.url, {'tag': {'title': 'Claims'}, 'content': 'Written from claims.'}, format='json')
+        assert response.status_code == 201
+        assert response.json()['owner'] == 'user_claims'
+        snippet = Snippet.objects.get(content='Written from claims.')
+        assert snippet.owner_id == user.id
+        assert snippet.tag == Tag.objects.get(title='Claims')
+
+    def test_deactivated_user_rejected(self, client, user):
+        assert client.get(self.url).status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get(self.url).status_code == 401
+
+    def test_changed_user_loaded(self, client, user):
+        client.get(self.url)
+        User.objects.filter(id=user.id).update(username='user_renamed')
+        user.refresh_from_db()
+        user.save()
+        response = client.post(self.url, {'tag': {'title': 'Claims'}, 'content': 'Written after rename.'}, format='json')
+        assert response.json()['owner'] == 'user_renamed'
+
+    def test_revocation_reaches_every_worker(self, client, user):
+        client.get(self.url)
+        User.objects.filter(id=user.id).update(username='user_renamed')
+        revoke([user.id])
+        # Another worker: its caches know nothing of the revocation.
+        tokens.clear()
+        revocations.clear()
+        response = client.post(self.url, {'tag': {'title': 'Claims'}, 'content': 'Written after rename.'}, format='json')
+        assert response.json()['owner'] == 'user_renamed'
+
+    def test_revocation_applies_after_refresh(self, client, user):
+        client.get(self.url)
+        User.objects.filter(id=user.id).update(username='user_renamed')
+        # Revoked by another worker after this one read the revocations.
+        TokenRevocation.objects.create(user=user, revoked_at=int(time.time()))
+        response = client.post(self.url, {'tag': {'title': 'Claims'}, 'content': 'Written before refresh.'}, format='json')
+        assert response.json()['owner'] == 'user_claims'
+        with override_settings(AUTH_REVOCATION_REFRESH=0):
+            response = client.post(self.url, {'tag': {'title': 'Claims'}, 'content': 'Written after refresh.'}, format='json')
+        assert response.json()['owner'] == 'user_renamed'
+
+    def test_deactivation_without_save_rejected(self, client, user):
+        client.get(self.url)
+        User.objects.filter(id=user.id).update(is_active=False)
+        revoke([user.id])
+        assert client.get(self.url).status_code == 401
+
+    def test_deleted_user_rejected(self, client, user):
+        client.get(self.url)
+        user.delete()
+        assert client.get(self.url).status_code == 401
+        # The revocation outlives the user, so other workers reject it too.
+        tokens.clear()
+        revocations.clear()
+        assert client.get(self.url).status_code == 401
+
+    def test_unreadable_revocation_rejected(self, client, monkeypatch):
+        client.get(self.url)
+        revocations.clear()
+
+        def fail(*args, **kwargs):
+            raise DatabaseError('unavailable')
+        monkeypatch.setattr('django.db.models.query.QuerySet._fetch_all', fail)
+        assert client.get(self.url).status_code == 401
+
+    def test_login_keeps_claims_trusted(self, client, user):
+        client.get(self.url)
+        api_client = APIClient()
+        response = api_client.post(reverse('token_obtain_pair'), {'username': 'user_claims', 'password': 'test123'})
+        assert response.status_code == 200
+        with assert_query_budget(0):
+            assert client.get(self.url).status_code == 200
+        # Write the buffered login inside the test transaction.
+        last_login.flush()
+
+    def test_token_without_claims(self, api_client):
+        # Tokens not issued through TokenSerializer load the user: the user and tag queries.
+        with assert_query_budget(2):
+            assert api_client.get(reverse("tag-list")).status_code == 200
+
+    @override_settings(AUTH_STATELESS_USER=False)
+    def test_stateless_user_disabled(self, client):
+        client.get(self.url)
+        with assert_query_budget(1):
+            assert client.get(self.url).status_code == 200
+
+    def test_lru_bounded(self, user, monkeypatch):
+        monkeypatch.setattr(tokens, 'size', 2)
+        tokens.clear()
+        for _ in range(3):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {TokenSerializer.get_token(user).access_token}')
+            client.get(self.url)
+        assert len(tokens.entries) == 2
+
+
+@pytest.mark.django_db
+class TestSchemeAuthentication:
+    """
+    Test cases for picking the authentication class from the Authorization scheme.
+    """
+
+    url = reverse("snippet-list")
+
+    @pytest.fixture
+    def user(self):
+        credentials.clear()
+        return User.objects.create_user(username='user_basic', email='basic@email.com', password='test123')
+
+    @pytest.fixture
+    def hashes(self, monkeypatch):
+        checked = []
+        check_password = User.check_password
+
+        def counting(user, raw_password):
+            checked.append(user.username)
+            return check_password(user, raw_password)
+        monkeypatch.setattr(User, 'check_password', counting)
+        return checked
+
+    @pytest.fixture
+    def no_session(self, monkeypatch):
+        monkeypatch.setattr(SessionAuthentication, 'authenticate', lambda *args: pytest.fail('Session read.'))
+
+    def test_basic_cached(self, user, hashes):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        assert client.get(self.url).status_code == 200
+        assert client.get(self.url).status_code == 200
+        assert hashes == ['user_basic']
+
+    def test_basic_wrong_password_not_cached(self, user, hashes):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        client.get(self.url)
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'wrong'))
+        assert client.get(self.url).status_code == 401
+        assert client.get(self.url).status_code == 401
+        assert len(hashes) == 3
+
+    def test_basic_password_change(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        assert client.get(self.url).status_code == 200
+        user.set_password('changed')
+        user.save()
+        assert client.get(self.url).status_code == 401
+
+    def test_basic_deactivated(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        assert client.get(self.url).status_code == 200
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        assert client.get(self.url).status_code == 401
+
+    def test_basic_cache_expires(self, user, hashes, settings):
+        settings.AUTH_BASIC_CACHE_TTL = 0
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        client.get(self.url)
+        client.get(self.url)
+        assert len(hashes) == 2
+
+    def test_bearer_skips_session(self, api_client, no_session):
+        assert api_client.get(self.url).status_code == 200
+
+    def test_basic_skips_session(self, user, no_session):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        assert client.get(self.url).status_code == 200
+
+    def test_session(self, user, settings):
+        # Only routes served by the full middleware profile load sessions.
+        settings.MIDDLEWARE_PROFILE_PATHS = ()
+        client = APIClient()
+        client.login(username='user_basic', password='test123')
+        assert client.get(self.url).status_code == 200
+
+    def test_api_profile_ignores_session(self, user):
+        client = APIClient()
+        client.login(username='user_basic', password='test123')
+        assert client.get(self.url).status_code == 401
+
+    def test_unknown_scheme(self, user):
+        client = APIClient()
+        client.login(username='user_basic', password='test123')
+        client.credentials(HTTP_AUTHORIZATION='Digest username="user_basic"')
+        response = client.get(self.url)
+        assert response.status_code == 401
+        assert response['WWW-Authenticate'].startswith('Bearer')
+
+    @pytest.mark.benchmark
+    def test_scheme_cost(self, api_client, user, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        settings.MIDDLEWARE_PROFILE_PATHS = ()
+        session = APIClient()
+        session.login(username='user_basic', password='test123')
+        clients = {'bearer': api_client, 'session': session}
+        for name in ('basic uncached', 'basic cached'):
+            clients[name] = APIClient()
+            clients[name].credentials(HTTP_AUTHORIZATION=basic('user_basic', 'test123'))
+        for name, client in clients.items():
+            settings.AUTH_BASIC_CACHE_TTL = 0 if name == 'basic uncached' else 60
+            client.get(self.url)
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_REQUESTS):
+                assert client.get(self.url).status_code == 200
+            print(f'{name}: {(time.perf_counter() - start) / BENCHMARK_REQUESTS * 1000:.2f}ms per request')
@@ -0,0 +1,79 @@
+import json
+import os
+import pytest
+from server.tests.conftest import django_db_setup  # noqa
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from authapp.models import User
+from server import benchmark
+from snippetapp.models import Snippet
+
+BENCHMARK_VOLUMES = [int(volume) for volume in os.environ.get('BENCHMARK_VOLUMES', '1000,100,10000').split(',')]
+BENCHMARK_REQUESTS = int(os.environ.get('BENCHMARK_REQUESTS', 50))
+BENCHMARK_BASELINE = os.environ.get('BENCHMARK_BASELINE')
+
+
+def results(**metrics):
+    return {'endpoints': {'snippet-list': {
+        'p50': 5, 'p95': 10, 'p99': 20, 'requests_per_second': 100, 'queries': 2, 'peak_memory_kb': 100, **metrics,
+    }}}
+
+
+class TestCompare:
+    """
+    Test cases for comparing benchmark results with a baseline.
+    """
+
+    def test_within_tolerance(self):
+        assert benchmark.compare(results(p95=11.9, requests_per_second=81), results()) == []
+
+    def test_slower(self):
+        assert benchmark.compare(results(p95=12.1), results()) == ['snippet-list p95: 10 -> 12.1']
+
+    def test_lower_throughput(self):
+        assert benchmark.compare(results(requests_per_second=79), results()) == ['snippet-list requests_per_second: 100 -> 79']
+
+    def test_extra_query(self):
+        assert benchmark.compare(results(queries=3), results()) == ['snippet-list queries: 2 -> 3']
+
+    def test_new_endpoint(self):
+        assert benchmark.compare(results(), {'endpoints': {}}) == []
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+    """
+    Test cases for the benchmark suite.
+    """
+
+    def test_run(self):
+        users, snippets = User.objects.count(), Snippet.objects.count()
+        run = benchmark.run(users=3, tags=2, snippets=10, requests=2)
+        assert list(run['endpoints']) == list(benchmark.ENDPOINTS)
+        for metrics in run['endpoints'].values():
+            assert metrics['errors'] == 0
+            assert metrics['queries'] > 0
+            assert metrics['p50'] <= metrics['p95'] <= metrics['p99']
+        assert (User.objects.count(), Snippet.objects.count()) == (users, snippets)
+
+    def test_command_baseline(self, tmp_path):
+        output = tmp_path / 'results.json'
+        options = {'users': 3, 'tags': 2, 'snippets': 10, 'requests': 2, 'endpoints': ['snippet-list']}
+        call_command('benchmark', output=str(output), **options)
+        baseline = json.loads(output.read_text())
+        baseline['endpoints']['snippet-list']['queries'] -= 1
+        output.write_text(json.dumps(baseline))
+        with pytest.raises(CommandError, match='snippet-list queries'):
+            call_command('benchmark', baseline=str(output), **options)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_endpoints(tmp_path):
+    users, tags, snippets = BENCHMARK_VOLUMES
+    run = benchmark.run(users=users, tags=tags, snippets=snippets, requests=BENCHMARK_REQUESTS)
+    print(json.dumps(run, indent=2))
+    (tmp_path / 'results.json').write_text(json.dumps(run))
+    if BENCHMARK_BASELINE:
+        with open(BENCHMARK_BASELINE) as baseline:
+            assert benchmark.compare(run, json.load(baseline)) == []
@@ -0,0 +1,129 @@
+import gzip
+import json
+import os
+import time
+import zlib
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from server.compression import ENCODINGS, accepted_encodings, is_compressible, negotiate
+from snippetapp.models import Snippet, Tag
+from authapp.models import User
+
+BENCHMARK_REQUESTS = int(os.environ.get('BENCHMARK_REQUESTS', 200))
+
+
+@pytest.fixture
+def snippets(api_client):
+    tag = Tag.objects.create(title='Compressed')
+    owner = User.objects.get(username='user_one')
+    return Snippet.objects.bulk_create(
+        Snippet(tag=tag, owner=owner, content=f'Snippet {index}: ' + 'print("hello") ' * 40) for index in range(20)
+    )
+
+
+class TestNegotiation:
+    """
+    Test cases for picking the content coding of a response.
+    """
+
+    def test_accepted_encodings(self):
+        assert accepted_encodings('gzip, br;q=0.5, zstd; q=0 ,*;q=bad') == {'gzip': 1, 'br': 0.5, 'zstd': 0, '*': 0}
+
+    @override_settings(COMPRESSION_ENCODINGS=['br', 'zstd', 'gzip'])
+    def test_negotiate(self):
+        assert negotiate('') is None
+        assert negotiate('identity') is None
+        assert negotiate('gzip;q=0') is None
+        assert negotiate('deflate, gzip;q=0.2') == 'gzip'
+        assert negotiate('*') == next(name for name in ('br', 'zstd', 'gzip') if name in ENCODINGS)
+
+    @override_settings(COMPRESSION_ENCODINGS=['gzip'])
+    def test_only_configured_encodings(self):
+        assert negotiate('br, zstd, gzip;q=0.1') == 'gzip'
+
+    def test_compressible(self):
+        assert is_compressible(HttpResponse(content_type='application/json'))
+        assert is_compressible(HttpResponse(content_type='application/problem+json'))
+        assert not is_compressible(HttpResponse(content_type='text/html; charset=utf-8'))
+
+
+@pytest.mark.django_db
+class TestCompression:
+    """
+    Test cases for compressing responses.
+    """
+
+    url = reverse("snippet-list")
+
+    def test_gzip(self, api_client, snippets):
+        plain = api_client.get(self.url)
+        response = api_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert len(response.content) < len(plain.content) / 4
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] == f"W/{plain['ETag']}"
+
+    @pytest.mark.parametrize('name, decompress', [
+        ('br', lambda data: pytest.importorskip('brotli').decompress(data)),
+        ('zstd', lambda data: pytest.importorskip('zstandard').ZstdDecompressor().decompressobj().decompress(data)),
+    ])
+    def test_optional_encodings(self, api_client, snippets, name, decompress):
+        if name not in ENCODINGS:
+            pytest.skip(f"{name} is not installed.")
+        plain = api_client.get(self.url)
+        response = api_client.get(self.url, HTTP_ACCEPT_ENCODING=f'gzip;q=0.9, {name}')
+        assert response['Content-Encoding'] == name
+        assert decompress(response.content) == plain.content
+
+    def test_small_responses_are_sent_as_is(self, api_client, snippets):
+        with override_settings(COMPRESSION_MIN_SIZE=1 << 20):
+            response = api_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response
+        assert 'Accept-Encoding' in response['Vary']
+        assert response.json()['data']
+
+    def test_not_accepted(self, api_client, snippets):
+        response = api_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert 'Content-Encoding' not in response
+
+    def test_html_is_sent_as_is(self, client):
+        response = client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == 200
+        assert len(response.content) >= 1024
+        assert 'Content-Encoding' not in response
+
+    def test_not_modified(self, api_client, snippets):
+        etag = api_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = api_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_stream(self, api_client, snippets):
+        url = reverse("overview-export") + f"?output=ndjson&tag={snippets[0].tag_id}"
+        plain = b''.join(api_client.get(url).streaming_content)
+        with override_settings(COMPRESSION_STREAM_FLUSH_SIZE=2048):
+            response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            chunks = list(response.streaming_content)
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response
+        # Flushed along the way: each chunk but the last decompresses on arrival.
+        decompressor = zlib.decompressobj(31)
+        received = [decompressor.decompress(chunk) for chunk in chunks]
+        assert len([data for data in received if data]) > 1
+        assert b''.join(received) == plain
+        assert len(plain.splitlines()) == len(snippets)
+        assert json.loads(plain.splitlines()[0])['content'] == snippets[0].content
+
+    @pytest.mark.benchmark
+    def test_benchmark(self, api_client, snippets):
+        url = self.url + '?page_size=100'
+        for accept in ['identity'] + [name for name in ('gzip', 'br', 'zstd') if name in ENCODINGS]:
+            api_client.get(url, HTTP_ACCEPT_ENCODING=accept)
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_REQUESTS):
+                response = api_client.get(url, HTTP_ACCEPT_ENCODING=accept)
+            elapsed = (time.perf_counter() - start) / BENCHMARK_REQUESTS
+            print(f'{accept}: {len(response.content)} bytes, {elapsed * 1000:.3f}ms per request')
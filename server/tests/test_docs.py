@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import pytest
+from server.tests.conftest import api_schema, django_db_setup  # noqa
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import path
+from rest_framework.decorators import api_view
+from server import docs
+from server.urls import urlpatterns as server_urlpatterns
+from snippetapp.serializers.snippets import TagSerializer
+
+pytestmark = pytest.mark.skipif(not settings.API_DOCS, reason="The docs are served with API_DOCS.")
+
+
+@api_view()
+def extra(request):
+    pass
+
+
+# The server URLconf with one more route.
+urlpatterns = server_urlpatterns + [path('app/extra', extra)]
+
+
+class TestSchema:
+    """
+    Test cases for the precomputed OpenAPI document.
+    """
+
+    url = '/docs/?format=openapi'
+
+    def test_served_from_file(self, api_schema):
+        response = Client().get(self.url)
+        assert response.status_code == 200
+        assert '/app/snippet' in response.json()['paths']
+        assert response['ETag'] == docs.read_schema(api_schema).etag
+        assert 'no-cache' in response['Cache-Control']
+
+    def test_not_modified(self, api_schema):
+        etag = Client().get(self.url)['ETag']
+        response = Client().get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_generated_once(self, api_schema, monkeypatch):
+        call_command('openapi_schema', stdout=io.StringIO())
+
+        def generate():
+            raise AssertionError("The saved document is up to date.")
+        monkeypatch.setattr(docs, 'generate_schema', generate)
+        docs.clear_schema()
+        assert Client().get(self.url).status_code == 200
+
+    def test_regenerated_when_routes_change(self, api_schema):
+        etag = Client().get(self.url)['ETag']
+        with override_settings(ROOT_URLCONF=__name__):
+            with pytest.raises(CommandError):
+                call_command('openapi_schema', check=True)
+            docs.clear_schema()
+            response = Client().get(self.url)
+            assert '/app/extra' in response.json()['paths']
+            assert response['ETag'] != etag
+            call_command('openapi_schema', check=True, stdout=io.StringIO())
+
+    def test_regenerated_when_serializers_change(self, api_schema, monkeypatch):
+        call_command('openapi_schema', stdout=io.StringIO())
+        monkeypatch.setattr(TagSerializer.Meta, 'extra_kwargs', {'title': {'validators': [], 'help_text': 'Tag title.'}})
+        with pytest.raises(CommandError):
+            call_command('openapi_schema', check=True)
+        docs.clear_schema()
+        assert 'Tag title.' in Client().get(self.url).content.decode()
+
+    def test_admin_not_loaded(self, api_schema):
+        script = (
+            "import json, sys\n"
+            "from server.wsgi import application\n"
+            "from server import docs\n"
+            "docs.load_schema()\n"
+            "print(json.dumps([name in sys.modules for name in ('authapp.admin', 'server.admin_urls')]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env={**os.environ, 'API_SCHEMA_PATH': str(api_schema)},
+            capture_output=True, text=True, check=True,
+        )
+        assert json.loads(result.stdout) == [False, False]
+        assert api_schema.exists()
+
+    def test_same_etag_across_workers(self, api_schema):
+        written = docs.write_schema()
+        assert docs.read_schema().etag == written.etag
+        assert json.loads(written.body)['info']['title'] == 'Snippet API'
+
+    def test_ui(self, api_schema):
+        response = Client().get('/docs/')
+        assert response.status_code == 200
+        assert not api_schema.exists()
@@ -0,0 +1,130 @@
+import os
+import re
+import time
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.test import override_settings
+from django.urls import reverse
+from server import instrumentation
+from server.instrumentation import COUNT_BUCKETS, Histogram, registry
+from snippetapp.models import Snippet, Tag
+from authapp.models import User
+
+BENCHMARK_REQUESTS = int(os.environ.get('BENCHMARK_REQUESTS', 200))
+
+
+@pytest.fixture
+def instrumented():
+    registry.clear()
+    with override_settings(INSTRUMENTATION_SAMPLE_RATE=1):
+        yield registry
+    registry.clear()
+
+
+@pytest.fixture
+def snippets(api_client):
+    tag = Tag.objects.create(title='Instrumented')
+    owner = User.objects.get(username='user_one')
+    return [Snippet.objects.create(tag=tag, owner=owner, content=f'Snippet {index}') for index in range(3)]
+
+
+class TestHistogram:
+    """
+    Test cases for the in-process histograms.
+    """
+
+    def test_buckets(self):
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert (histogram.sum, histogram.count) == (14.5, 4)
+
+    def test_exposition(self, instrumented):
+        labels = (('view', 'snippet-list'), ('method', 'GET'))
+        registry.observe(labels, {'db_queries': 2})
+        registry.observe(labels, {'db_queries': 4})
+        text = registry.exposition()
+        assert '# TYPE snippet_db_queries histogram' in text
+        assert 'snippet_db_queries_bucket{view="snippet-list",method="GET",le="2"} 1' in text
+        assert 'snippet_db_queries_bucket{view="snippet-list",method="GET",le="5"} 2' in text
+        assert 'snippet_db_queries_bucket{view="snippet-list",method="GET",le="+Inf"} 2' in text
+        assert 'snippet_db_queries_count{view="snippet-list",method="GET"} 2' in text
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+    """
+    Test cases for the request instrumentation middleware.
+    """
+
+    url = reverse('snippet-list')
+
+    def test_server_timing(self, api_client, snippets, instrumented):
+        response = api_client.get(self.url)
+        assert response.status_code == 200
+        db, render, total = response['Server-Timing'].split(', ')
+        assert re.fullmatch(r'db;desc="\d+ queries";dur=[\d.]+', db)
+        assert render.startswith('render;dur=')
+        assert total.startswith('total;dur=')
+
+    def test_histograms(self, api_client, snippets, instrumented):
+        api_client.get(self.url)
+        response = api_client.get(self.url)
+        queries = int(re.search(r'(\d+) queries', response['Server-Timing']).group(1))
+        labels = (('view', 'snippet-list'), ('method', 'GET'))
+        assert registry.histograms[('request_duration_seconds', labels)].count == 2
+        assert registry.histograms[('db_queries', labels)].counts[COUNT_BUCKETS.index(queries)] >= 1
+        assert registry.histograms[('response_size_bytes', labels)].sum == 2 * len(response.content)
+        assert registry.histograms[('render_duration_seconds', labels)].sum > 0
+
+    def test_server_timing_off(self, api_client, snippets, instrumented, settings):
+        settings.INSTRUMENTATION_SERVER_TIMING = False
+        assert 'Server-Timing' not in api_client.get(self.url)
+        assert registry.histograms
+
+    def test_not_sampled(self, api_client, snippets):
+        registry.clear()
+        assert 'Server-Timing' not in api_client.get(self.url)
+        assert registry.histograms == {}
+
+    def test_metrics_token(self, api_client, api_client_without_token, snippets, instrumented, settings):
+        settings.METRICS_TOKEN = 'scrape'
+        api_client.get(self.url)
+        assert api_client_without_token.get(reverse('metrics')).status_code == 403
+        api_client_without_token.credentials(HTTP_AUTHORIZATION='Bearer scrape')
+        response = api_client_without_token.get(reverse('metrics'))
+        assert response.status_code == 200
+        assert 'snippet_request_duration_seconds_count{view="snippet-list",method="GET"} 1' in response.content.decode()
+
+    def test_metrics_without_token(self, api_client_without_token, settings):
+        assert api_client_without_token.get(reverse('metrics')).status_code == 403
+        settings.DEBUG = True
+        assert api_client_without_token.get(reverse('metrics')).status_code == 200
+
+    @pytest.mark.benchmark
+    def test_overhead(self, api_client, snippets, settings):
+        def timed():
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_REQUESTS):
+                api_client.get(self.url)
+            return (time.perf_counter() - start) / BENCHMARK_REQUESTS * 1000
+
+        def configure(middleware, rate):
+            settings.MIDDLEWARE = middleware
+            settings.INSTRUMENTATION_SAMPLE_RATE = rate
+            api_client.handler._middleware_chain = None
+
+        settings.RESPONSE_CACHE_ENABLED = False
+        full = settings.MIDDLEWARE
+        without = [name for name in full if name != 'server.instrumentation.InstrumentationMiddleware']
+        runs = {'without middleware': (without, 0), 'sampling off': (full, 0), 'every request': (full, 1)}
+        timings = {name: [] for name in runs}
+        # Interleave the runs so drift affects them alike, and keep the best.
+        for _ in range(5):
+            for name, (middleware, rate) in runs.items():
+                configure(middleware, rate)
+                timings[name].append(timed())
+        timings = {name: min(values) for name, values in timings.items()}
+        print(', '.join(f'{name} {timing:.3f}ms' for name, timing in timings.items()))
+        assert timings['sampling off'] < timings['without middleware'] * 1.05
@@ -0,0 +1,131 @@
+import os
+import time
+import pytest
+from types import SimpleNamespace
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from server.tests.helpers import assert_query_budget
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher
+from django.db import OperationalError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from authapp import last_login
+from authapp.models import User
+
+BENCHMARK_LOGINS = int(os.environ.get('BENCHMARK_LOGINS', '200'))
+
+
+@pytest.mark.django_db
+class TestLogin:
+    """
+    Test cases for token logins.
+    """
+
+    url = reverse("token_obtain_pair")
+
+    @pytest.fixture
+    def user(self):
+        yield User.objects.create_user(username='user_login', email='login@email.com', password='test123')
+        last_login.flush()
+        if last_login._timer is not None:
+            last_login._timer.cancel()
+            last_login._timer = None
+
+    @pytest.fixture
+    def service_account(self):
+        yield User.objects.create_user(
+            username='service_login', email='service@email.com', password='s3cret-service-key', roles='service',
+        )
+        last_login.flush()
+
+    def login(self, username='user_login', password='test123'):
+        response = APIClient().post(self.url, {'username': username, 'password': password})
+        assert response.status_code == 200
+        return response
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_last_login_buffered(self, user):
+        last_login.flush()
+        self.login()
+        user.refresh_from_db()
+        assert user.last_login is None
+        assert user.id in last_login.pending()
+        assert last_login.flush() == 1
+        user.refresh_from_db()
+        assert user.last_login is not None
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=0)
+    def test_last_login_flushed_on_interval(self, user):
+        self.login()
+        user.refresh_from_db()
+        assert user.last_login is not None
+        assert last_login.pending() == {}
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_last_login_flushed_by_timer(self, user, monkeypatch):
+        last_login.flush()
+        self.login()
+        timer = last_login._timer
+        assert timer.interval == 3600
+        timer.cancel()
+        # Run the timer's flush here, on the test's connection.
+        monkeypatch.setattr(last_login, 'connections', SimpleNamespace(close_all=lambda: None))
+        last_login._flush_scheduled()
+        user.refresh_from_db()
+        assert user.last_login is not None
+        assert last_login._timer is None
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_failed_flush_keeps_logins(self, user, monkeypatch):
+        last_login.flush()
+        self.login()
+        last_login._timer.cancel()
+
+        def locked(*args, **kwargs):
+            raise OperationalError('database is locked')
+        monkeypatch.setattr(User.objects, 'bulk_update', locked)
+        monkeypatch.setattr(last_login, 'connections', SimpleNamespace(close_all=lambda: None))
+        last_login._flush_scheduled()
+        assert user.id in last_login.pending()
+        # Retried later.
+        assert last_login._timer is not None
+        monkeypatch.undo()
+        assert last_login.flush() == 1
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_logins_batched(self, user, service_account):
+        last_login.flush()
+        self.login()
+        self.login('service_login', 's3cret-service-key')
+        with assert_query_budget(1):
+            assert last_login.flush() == 2
+
+    def test_service_account_hasher(self, user, service_account):
+        assert identify_hasher(service_account.password).algorithm == 'pbkdf2_sha256_service'
+        assert f'${settings.SERVICE_ACCOUNT_HASHER_ITERATIONS}$' in service_account.password
+        assert identify_hasher(user.password).algorithm == 'pbkdf2_sha256'
+        with assert_query_budget(0):
+            assert service_account.check_password('s3cret-service-key')
+
+    def test_service_account_rehashed_on_iterations(self, service_account):
+        with override_settings(SERVICE_ACCOUNT_HASHER_ITERATIONS=settings.SERVICE_ACCOUNT_HASHER_ITERATIONS + 1):
+            assert service_account.check_password('s3cret-service-key')
+            service_account.refresh_from_db()
+            assert f'${settings.SERVICE_ACCOUNT_HASHER_ITERATIONS}$' in service_account.password
+
+    @pytest.mark.benchmark
+    def test_token_throughput(self, user, service_account):
+        def throughput(username, password):
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_LOGINS):
+                self.login(username, password)
+            return BENCHMARK_LOGINS / (time.perf_counter() - start)
+
+        with override_settings(LAST_LOGIN_BUFFERED=False, SIMPLE_JWT={**settings.SIMPLE_JWT, 'UPDATE_LAST_LOGIN': True}):
+            before = throughput('user_login', 'test123')
+        with override_settings(LAST_LOGIN_BUFFERED=True, SIMPLE_JWT={**settings.SIMPLE_JWT, 'UPDATE_LAST_LOGIN': False}):
+            buffered = throughput('user_login', 'test123')
+            service = throughput('service_login', 's3cret-service-key')
+        print(f'/token/: {before:.0f}/s per-login write, {buffered:.0f}/s buffered, {service:.0f}/s service account')
+        assert service > before
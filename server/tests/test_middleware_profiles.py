@@ -0,0 +1,71 @@
+import io
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from server.instrumentation import registry
+from server.middleware_profiles import profile_for
+
+
+@pytest.mark.django_db
+class TestMiddlewareProfiles:
+    """
+    Test cases for the path-scoped middleware profiles.
+    """
+
+    url = reverse('snippet-list')
+
+    def test_profile_for(self):
+        assert profile_for('/app/snippet') == 'api'
+        assert profile_for('/token/') == 'api'
+        assert profile_for('/auth/register-user/') == 'api'
+        assert profile_for('/admin/login/') == 'full'
+        assert profile_for('/docs/') == 'full'
+
+    def test_api_profile(self, api_client):
+        response = api_client.get(self.url)
+        assert response.status_code == 200
+        assert response['X-Content-Type-Options'] == 'nosniff'
+        assert 'Content-Security-Policy' not in response
+        assert 'X-Frame-Options' not in response
+
+    def test_full_profile(self):
+        response = Client().get('/admin/login/')
+        assert response.status_code == 200
+        assert 'Content-Security-Policy' in response
+        assert response['X-Frame-Options'] == 'DENY'
+
+    def test_full_profile_view_hooks(self):
+        # CsrfViewMiddleware only checks the token in process_view.
+        client = Client(enforce_csrf_checks=True)
+        assert client.post('/admin/login/', {'username': 'x', 'password': 'y'}).status_code == 403
+
+    def test_cors_on_api(self, api_client, settings):
+        settings.CORS_ALLOWED_ORIGINS = ['https://example.com']
+        response = api_client.get(self.url, HTTP_ORIGIN='https://example.com')
+        assert response['Access-Control-Allow-Origin'] == 'https://example.com'
+
+    def test_middleware_timing(self, api_client, settings):
+        settings.INSTRUMENTATION_MIDDLEWARE_TIMING = True
+        registry.clear()
+        api_client.get(self.url)
+        timed = {
+            dict(labels)['middleware']: histogram.count
+            for (name, labels), histogram in registry.histograms.items()
+            if name == 'middleware_duration_seconds'
+        }
+        registry.clear()
+        assert timed == {
+            'server.compression.CompressionMiddleware': 1,
+            'django.middleware.security.SecurityMiddleware': 1,
+            'corsheaders.middleware.CorsMiddleware': 1,
+        }
+
+    def test_report(self):
+        output = io.StringIO()
+        call_command('middleware_report', requests=2, stdout=output)
+        lines = output.getvalue().splitlines()
+        assert lines[0].startswith('/app/snippet (api profile): ')
+        assert '/app/snippet (full profile): ' in output.getvalue()
+        assert any(line.startswith('  csp.middleware.CSPMiddleware: ') for line in lines)
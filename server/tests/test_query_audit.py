@@ -0,0 +1,78 @@
+import logging
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.urls import reverse
+from authapp.models import User
+from server.query_audit import QueryAudit, QueryAuditError, query_shape
+from snippetapp.models import Snippet, Tag
+from snippetapp.viewsets.snippets import SnippetViewSet
+
+
+@pytest.fixture
+def snippets(api_client):
+    owner = User.objects.get(username='user_one')
+    tags = [Tag.objects.create(title=f'Audited {index}') for index in range(6)]
+    return [Snippet.objects.create(tag=tag, owner=owner, content=f'Snippet {tag.title}') for tag in tags]
+
+
+@pytest.fixture
+def n_plus_one(monkeypatch):
+    # The serializer path without select_related looks up each tag and owner.
+    monkeypatch.setattr(SnippetViewSet, 'row_serializer_class', None)
+    monkeypatch.setattr(SnippetViewSet, 'select_related_fields', ())
+    monkeypatch.setattr(SnippetViewSet, 'only_fields', ())
+
+
+@pytest.mark.django_db
+class TestQueryAudit:
+    """
+    Test cases for the query audit.
+    """
+
+    url = reverse('snippet-list')
+
+    def test_repeated_shape(self, snippets):
+        with QueryAudit(repeat_limit=5, slow_ms=10 ** 6) as audit:
+            for snippet in Snippet.objects.all():
+                snippet.tag.title
+        (count, query), = audit.repeated()
+        assert count == len(snippets)
+        assert query.origin.startswith('server/tests/test_query_audit.py:')
+        assert query.origin.endswith('in test_repeated_shape')
+        assert 'snippetapp_tag' in query.sql
+
+    def test_below_limit(self, snippets):
+        with QueryAudit(repeat_limit=10, slow_ms=10 ** 6) as audit:
+            for snippet in Snippet.objects.all():
+                snippet.tag.title
+        assert audit.findings() == []
+
+    def test_in_lists_share_a_shape(self):
+        assert query_shape('WHERE "id" IN (%s, %s, %s)') == query_shape('WHERE "id" IN (%s, %s)')
+
+    def test_slow_query_plan(self, snippets):
+        with QueryAudit(repeat_limit=100, slow_ms=0) as audit:
+            list(Snippet.objects.filter(tag=snippets[0].tag))
+        finding, = audit.findings()
+        assert 'ms query from server/tests/test_query_audit.py:' in finding
+        assert 'snippetapp_snippet' in finding.split('\n')[1]
+
+    def test_request_fails(self, api_client, snippets, n_plus_one):
+        with pytest.raises(QueryAuditError, match='queries of the same shape'):
+            api_client.get(self.url)
+
+    def test_request_logged(self, api_client, snippets, n_plus_one, settings, caplog):
+        settings.QUERY_AUDIT = 'log'
+        with caplog.at_level(logging.WARNING, logger='server.query_audit'):
+            assert api_client.get(self.url).status_code == 200
+        record, = caplog.records
+        assert record.getMessage().startswith(f'GET {self.url}:\n')
+
+    def test_off(self, api_client, snippets, n_plus_one, settings, caplog):
+        settings.QUERY_AUDIT = 'off'
+        with caplog.at_level(logging.WARNING, logger='server.query_audit'):
+            assert api_client.get(self.url).status_code == 200
+        assert caplog.records == []
+
+    def test_planned_list_passes(self, api_client, snippets):
+        assert api_client.get(self.url).status_code == 200
@@ -0,0 +1,154 @@
+import pytest
+from types import SimpleNamespace
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from server.tests.helpers import assert_query_budget
+from django.contrib.auth.hashers import identify_hasher
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APIClient
+from authapp.models import User
+from authapp.serializers.user_management import unique_violation, violated_field
+
+
+@pytest.mark.django_db
+class TestRegistration:
+    """
+    Test cases for user registration.
+    """
+
+    url = reverse("register")
+
+    def data(self, **overrides):
+        data = {
+            "email": "register@gmail.com",
+            "password": "test1223",
+            "confirm_password": "test1223",
+            "roles": "user",
+            "first_name": "Test",
+            "last_name": "user one",
+            "username": "user_register"
+        }
+        data.update(overrides)
+        return data
+
+    def test_register_user(self, monkeypatch):
+        hashes = []
+        monkeypatch.setattr('authapp.models.make_password', lambda *args, **kwargs: hashes.append(args) or 'hashed')
+        # The insert, inside its savepoint; no lookups run.
+        with assert_query_budget(3):
+            response = APIClient().post(self.url, self.data())
+        assert response.status_code == 201
+        assert 'password' not in response.json()
+        assert 'confirm_password' not in response.json()
+        assert len(hashes) == 1
+
+    def test_register_hashes_password(self):
+        response = APIClient().post(self.url, self.data())
+        assert response.status_code == 201
+        user = User.objects.get(username='user_register')
+        assert identify_hasher(user.password).algorithm == 'pbkdf2_sha256'
+        assert user.check_password('test1223')
+
+    def test_roles_are_not_chosen_on_registration(self):
+        response = APIClient().post(self.url, self.data(roles='service'))
+        assert response.status_code == 201
+        assert response.json()['roles'] == 'user'
+        user = User.objects.get(username='user_register')
+        assert user.password_hasher == 'default'
+        assert identify_hasher(user.password).iterations > 20000
+
+    def test_passwords_must_match(self):
+        response = APIClient().post(self.url, self.data(confirm_password='test1224'))
+        assert response.status_code == 400
+        assert 'password' in response.json()
+
+    def test_duplicate_email(self):
+        assert APIClient().post(self.url, self.data()).status_code == 201
+        response = APIClient().post(self.url, self.data(username='user_register_two'))
+        assert response.status_code == 400
+        assert response.json() == {'email': ['Email already in use.']}
+
+    def test_duplicate_username(self):
+        assert APIClient().post(self.url, self.data()).status_code == 201
+        response = APIClient().post(self.url, self.data(email='other@gmail.com'))
+        assert response.status_code == 400
+        assert list(response.json()) == ['username']
+
+    def test_violated_field(self):
+        def error(message, constraint=None):
+            error = IntegrityError(message)
+            if constraint is not None:
+                error.__cause__ = Exception(message)
+                error.__cause__.diag = SimpleNamespace(constraint_name=constraint)
+            return error
+        # PostgreSQL quotes the offending value, which may mention the other field.
+        detail = 'duplicate key value violates unique constraint\nDETAIL:  Key (email)=(username@gmail.com) already exists.'
+        assert unique_violation(error(detail, 'user_email_unique')) == {'email': ['Email already in use.']}
+        assert violated_field(error('Key (username)=(email) already exists.', 'authapp_user_username_key')) == 'username'
+        assert violated_field(error('duplicate key value', 'other_constraint')) is None
+        assert violated_field(error('UNIQUE constraint failed: authapp_user.email')) == 'email'
+        assert violated_field(error('UNIQUE constraint failed: authapp_user.username')) == 'username'
+        assert violated_field(error('NOT NULL constraint failed: authapp_user.username')) is None
+
+    def test_blank_emails_allowed(self):
+        User.objects.create_user(username='no_email_one', password='test123')
+        User.objects.create_user(username='no_email_two', password='test123')
+        assert User.objects.filter(email='').count() == 2
+
+
+@pytest.mark.django_db
+class TestProvisioning:
+    """
+    Test cases for bulk user provisioning.
+    """
+
+    url = reverse("provision-users")
+
+    @pytest.fixture
+    def admin_client(self):
+        admin = User.objects.create_superuser(username='admin_user', email='admin@email.com', password='test123')
+        client = APIClient()
+        client.force_authenticate(admin)
+        return client
+
+    def user(self, index, **overrides):
+        data = {
+            "email": f"import{index}@gmail.com",
+            "roles": "user",
+            "first_name": "Imported",
+            "last_name": f"User {index}",
+            "username": f"import_{index}",
+        }
+        data.update(overrides)
+        return data
+
+    def test_provision_users(self, admin_client):
+        users = [self.user(index) for index in range(20)]
+        users[0]['password'] = 'first-password'
+        # Lookup of taken usernames and emails, and the insert in its savepoint.
+        with assert_query_budget(4):
+            response = admin_client.post(self.url, {'users': users}, format='json')
+        assert response.status_code == 200
+        assert response.json() == {'created': 20, 'errors': []}
+        assert User.objects.get(username='import_0').check_password('first-password')
+        assert not User.objects.get(username='import_1').has_usable_password()
+
+    def test_provision_reports_conflicts(self, admin_client):
+        User.objects.create_user(username='import_0', email='taken@gmail.com', password='test123')
+        users = [
+            self.user(0),
+            self.user(1, email='taken@gmail.com'),
+            self.user(2),
+            self.user(3, email='import2@gmail.com'),
+            self.user(4, username='not a username'),
+        ]
+        response = admin_client.post(self.url, {'users': users}, format='json')
+        assert response.status_code == 200
+        json_data = response.json()
+        assert json_data['created'] == 1
+        assert [error['index'] for error in json_data['errors']] == [0, 1, 3, 4]
+        assert User.objects.filter(username='import_2').exists()
+
+    def test_provision_requires_admin(self, api_client):
+        response = api_client.post(self.url, {'users': [self.user(0)]}, format='json')
+        assert response.status_code == 403
@@ -0,0 +1,106 @@
+import sqlite3
+import time
+from types import SimpleNamespace
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authapp.models import User
+from server import routers
+from server.routers import ReplicaRouter, reading_from
+from snippetapp import counts
+from snippetapp.models import RowCount, Snippet
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """
+    A second SQLite file standing in for a replica: a copy of the primary
+    taken before the test writes anything, so it lags behind every write.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+    target = sqlite3.connect(path)
+    source.backup(target)
+    source.close()
+    target.close()
+    connections.settings['replica_test'] = {**connections.settings['default'], 'NAME': path}
+    with override_settings(DATABASE_REPLICAS=['replica_test']):
+        yield 'replica_test'
+    connections['replica_test'].close()
+    del connections.settings['replica_test']
+    del connections['replica_test']
+
+
+@pytest.mark.django_db
+class TestReplicas:
+    """
+    Test cases for routing snippet reads to replicas.
+    """
+
+    url = reverse("snippet-list")
+    data = {"tag": {"title": "Replica tag"}, "content": "Written to the primary."}
+
+    def client_for(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@email.com', password='test123')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def contents(self, client):
+        response = client.get(self.url)
+        assert response.status_code == 200
+        return [item['content'] for item in response.json()['data']]
+
+    def test_reads_go_to_replica(self, replica):
+        writer = self.client_for('replica_writer')
+        reader = self.client_for('replica_reader')
+        assert writer.post(self.url, self.data, format='json').status_code == 201
+        # The stand-in never catches up, so other users keep reading the old state.
+        assert 'Written to the primary.' not in self.contents(reader)
+
+    def test_writer_reads_own_writes(self, replica):
+        writer = self.client_for('replica_writer')
+        assert writer.post(self.url, self.data, format='json').status_code == 201
+        assert 'Written to the primary.' in self.contents(writer)
+
+    def test_pin_expires(self, replica, monkeypatch):
+        writer = self.client_for('replica_writer')
+        assert writer.post(self.url, self.data, format='json').status_code == 201
+        later = time.time() + settings.DATABASE_REPLICA_LAG
+        monkeypatch.setattr(routers, 'time', SimpleNamespace(time=lambda: later))
+        assert 'Written to the primary.' not in self.contents(writer)
+
+    def test_counts_seeded_from_primary(self, replica):
+        writer = self.client_for('replica_writer')
+        assert writer.post(self.url, self.data, format='json').status_code == 201
+        owner = User.objects.get(username='replica_writer')
+        RowCount.objects.all().delete()
+        with reading_from(replica):
+            # The replica has neither the snippet nor a count for its owner.
+            assert counts.count_rows(Snippet.objects.filter(owner=owner), owner=owner.id) == 1
+
+    def test_replica_reads_not_cached_after_write(self, replica):
+        writer = self.client_for('replica_writer')
+        reader = self.client_for('replica_reader')
+        assert writer.post(self.url, self.data, format='json').status_code == 201
+        self.contents(reader)
+        with override_settings(DATABASE_REPLICAS=[]):
+            assert 'Written to the primary.' in self.contents(reader)
+
+    def test_without_replicas(self, api_client):
+        api_client.post(self.url, self.data, format='json')
+        assert 'Written to the primary.' in self.contents(api_client)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        assert router.db_for_read(User) == 'default'
+        with reading_from('replica_0'):
+            assert router.db_for_read(User) == 'replica_0'
+            assert router.db_for_write(User) == 'default'
+        assert router.db_for_read(User) == 'default'
+        assert not router.allow_migrate('replica_0', 'snippetapp')
@@ -0,0 +1,75 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import pytest
+from server.tests.conftest import api_schema, django_db_setup  # noqa
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import reverse
+from server import startup
+from server.lazy_urls import LazyView
+
+BENCHMARK_STARTUPS = int(os.environ.get('BENCHMARK_STARTUPS', 5))
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     django.utils.functional
+import time:       300 |        400 |   django.contrib.admin.sites
+import time:        50 |         50 |   rest_framework.compat
+import time:      1000 |       1450 | snippetapp.caching
+import time:       200 |        200 | pkg_resources
+"""
+
+
+class TestImportTime:
+    """
+    Test cases for aggregating import times per app.
+    """
+
+    def test_parse(self):
+        assert startup.parse_importtime(REPORT)[:2] == [('django.utils.functional', 100), ('django.contrib.admin.sites', 300)]
+
+    def test_by_app(self):
+        apps = {'django', 'django.contrib.admin', 'rest_framework', 'snippetapp'}
+        assert startup.by_app(startup.parse_importtime(REPORT), apps) == [
+            ('snippetapp', 1000, 1),
+            ('django.contrib.admin', 300, 1),
+            ('pkg_resources', 200, 1),
+            ('django', 100, 1),
+            ('rest_framework', 50, 1),
+        ]
+
+
+def test_docs_and_admin_not_loaded_at_startup():
+    script = (
+        "import json, sys\n"
+        "from server.wsgi import application\n"
+        "from django.urls import resolve\n"
+        "resolve('/app/snippet')\n"
+        "print(json.dumps([name in sys.modules for name in ('drf_yasg', 'authapp.admin', 'server.admin_urls')]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=settings.BASE_DIR, env={**os.environ, 'API_DOCS': 'false'},
+        capture_output=True, text=True, check=True,
+    )
+    assert json.loads(result.stdout) == [False, False, False]
+
+
+def test_admin_urls():
+    assert reverse('admin:index') == '/admin/'
+    assert reverse('admin:authapp_user_changelist') == '/admin/authapp/user/'
+
+
+def test_lazy_docs_view(api_schema):
+    view = LazyView('server.docs.swagger_ui')
+    response = view(RequestFactory().get('/docs/', {'format': 'openapi'}))
+    assert response.status_code == 200
+    assert json.loads(response.content)['info']['title'] == 'Snippet API'
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('target', ['wsgi', 'asgi'])
+def test_startup_time(target):
+    times = startup.startup_times(target, runs=BENCHMARK_STARTUPS)
+    print(f'server.{target}: median {statistics.median(times) * 1000:.0f}ms over {len(times)} starts')
@@ -13,42 +13,31 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.conf import settings
 from django.urls import path, include, re_path
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from authapp.viewsets import TokenView
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
+from server.instrumentation import metrics_view
+from server.lazy_urls import LazyView, lazy_include
 
 handler500 = 'rest_framework.exceptions.server_error'
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Snippet API",
-        default_version="v1",
-        description="API endpoints available in snippet App.",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    lazy_include('admin/', 'server.admin_urls', namespace='admin'),
     path('app/', include('snippetapp.urls')),
     path('token/', TokenView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/', include('authapp.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
-if settings.DEBUG:
+if settings.API_DOCS:
     urlpatterns.append(
         re_path(
             r"^docs/$",
-            schema_view.with_ui("swagger", cache_timeout=0),
+            LazyView('server.docs.swagger_ui'),
             name="schema-swagger-ui",
         ),
     )
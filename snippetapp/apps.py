@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class SnippetappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'snippetapp'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_save, post_delete
+        from snippetapp import caching, counts
+        from snippetapp.models import Snippet, Tag
+        counts.register(Snippet, ('tag', 'owner'))
+        post_save.connect(caching.invalidate_snippet, sender=Snippet)
+        post_delete.connect(caching.invalidate_snippet, sender=Snippet)
+        post_save.connect(caching.invalidate_tag, sender=Tag)
+        post_delete.connect(caching.invalidate_tag, sender=Tag)
+        post_save.connect(caching.invalidate_owner, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,83 @@
+from itertools import chain
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from snippetapp import caching, counts
+from snippetapp.models import Snippet, Tag
+
+
+def bulk_delete(queryset):
+    """
+    Delete every snippet of `queryset` with a single DELETE statement,
+    keeping the maintained counts and response cache in step. No cascades
+    are collected and no per-row signals are sent.
+    """
+    using = queryset.db
+    with transaction.atomic(using=using, savepoint=False):
+        deltas = counts.queryset_deltas(queryset)
+        deleted = queryset._raw_delete(using)
+        counts.adjust(queryset.model, deltas)
+        caching.invalidate(_scopes(
+            (value, None) if field == 'tag_id' else (None, value)
+            for field, value in filter(None, deltas)
+        ))
+    return deleted
+
+
+def resolve_tags(titles):
+    """
+    Map each distinct tag title to its id with one lookup, creating the
+    missing tags with a single bulk insert.
+    """
+    titles = set(titles)
+    tag_ids = dict(Tag.objects.filter(title__in=titles).values_list('title', 'id'))
+    missing = titles.difference(tag_ids)
+    if missing:
+        # Titles created concurrently are skipped and picked up by the re-read.
+        Tag.objects.bulk_create([Tag(title=title) for title in missing], ignore_conflicts=True)
+        tag_ids.update(Tag.objects.filter(title__in=missing).values_list('title', 'id'))
+    return tag_ids
+
+
+def bulk_save_snippets(creates, updates, owner):
+    """
+    Insert `creates` (validated snippet data) and apply `updates` (pairs of
+    snippet instance and validated data) for `owner` in one transaction,
+    writing in chunks of SNIPPET_BULK_BATCH_SIZE rows.
+    """
+    batch_size = settings.SNIPPET_BULK_BATCH_SIZE
+    with transaction.atomic(savepoint=False):
+        tag_ids = resolve_tags(
+            data['tag']['title'] for data in chain(creates, (data for _, data in updates))
+        )
+        snippets = [
+            Snippet(tag_id=tag_ids[data['tag']['title']], content=data['content'], owner=owner)
+            for data in creates
+        ]
+        Snippet.objects.bulk_create(snippets, batch_size=batch_size)
+        rows = {(snippet.tag_id, owner.id) for snippet in snippets}
+        deltas = counts.deltas_for(Snippet, [(snippet.tag_id, owner.id) for snippet in snippets])
+
+        timestamp = timezone.now()
+        for instance, data in updates:
+            previous = (instance.tag_id, instance.owner_id)
+            instance.tag_id = tag_ids[data['tag']['title']]
+            instance.content = data['content']
+            instance.owner = owner
+            instance.timestamp = timestamp
+            deltas.update(counts.deltas_for(Snippet, [(instance.tag_id, instance.owner_id)]))
+            deltas.subtract(counts.deltas_for(Snippet, [previous]))
+            rows.update([previous, (instance.tag_id, instance.owner_id)])
+        Snippet.objects.bulk_update(
+            [instance for instance, _ in updates],
+            ['tag', 'content', 'owner', 'timestamp'],
+            batch_size=batch_size,
+        )
+        counts.adjust(Snippet, deltas)
+        caching.invalidate(_scopes(rows))
+    return snippets
+
+
+def _scopes(rows):
+    # Response cache scopes of snippets given as (tag_id, owner_id) pairs.
+    return set().union(caching.snippet_scopes(), *(caching.snippet_scopes(*row) for row in rows))
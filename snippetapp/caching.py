@@ -0,0 +1,166 @@
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from server.routers import read_alias
+from snippetapp import counts
+
+RESPONSE_CACHE = 'responses'
+
+# Scope of every snippet list that is not narrowed to one tag or owner.
+ALL_SNIPPETS = 'snippets'
+# Scope of the tag list.
+ALL_TAGS = 'tags'
+# Scopes of the lists narrowed to one owner, which embed the titles of any
+# tag, and of those narrowed to one tag, which embed any owner's username.
+TAG_TITLES = 'tag-titles'
+USERNAMES = 'usernames'
+
+
+def tag_scope(tag_id):
+    return f'tag:{tag_id}'
+
+
+def owner_scope(owner_id):
+    return f'owner:{owner_id}'
+
+
+def snippet_scopes(tag_id=None, owner_id=None):
+    """
+    Scopes whose cached responses include a snippet of `tag_id` and `owner_id`.
+    """
+    scopes = {ALL_SNIPPETS}
+    if tag_id is not None:
+        scopes.add(tag_scope(tag_id))
+    if owner_id is not None:
+        scopes.add(owner_scope(owner_id))
+    return scopes
+
+
+def get_versions(scopes):
+    """
+    Current version of each scope. A version is the time (in ns) the scope
+    was last invalidated, so a version lost to eviction never comes back.
+    """
+    cache = caches[RESPONSE_CACHE]
+    keys = [f'version:{scope}' for scope in sorted(scopes)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(scopes):
+    """
+    Evict the cached responses of `scopes`. The versions move now, for
+    readers inside this transaction, and again on commit, so a response
+    rendered from pre-commit data is never kept.
+    """
+    if not scopes:
+        return
+    scopes = set(scopes)
+
+    def bump():
+        now = time.time_ns()
+        caches[RESPONSE_CACHE].set_many({f'version:{scope}': now for scope in scopes}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def cached_response(method):
+    """
+    Cache the data of a 200 response from a viewset handler, keyed on the
+    full URL (endpoint, filters and cursor) and the versions of the scopes
+    returned by `view.get_cache_scopes`. Responses carry an ETag and, when
+    `view.get_last_modified` gives one, a Last-Modified header; matching
+    conditional requests get a 304 without touching the database. Without
+    RESPONSE_CACHE_ENABLED, see `validated_response`.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        versions = get_versions(self.get_cache_scopes(request, *args, **kwargs))
+        key = hashlib.md5(f'{request.build_absolute_uri()}|{versions}'.encode()).hexdigest()
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return validated_response(method, self, request, key, *args, **kwargs)
+        etag = quote_etag(key)
+        entry = caches[RESPONSE_CACHE].get(f'response:{key}')
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=entry['last_modified'] if entry else None,
+        )
+        if not_modified is not None:
+            return not_modified
+        if entry is None:
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if read_alias() is not None and time.time_ns() - max(versions) < settings.DATABASE_REPLICA_LAG * 1e9:
+                # The replica may not have the writes behind the latest invalidation yet.
+                return response
+            last_modified = self.get_last_modified(request, *args, **kwargs)
+            if last_modified is not None:
+                # Deletes leave no timestamp behind; the latest invalidation stands in.
+                last_modified = int(max(last_modified.timestamp(), max(versions) / 1e9))
+            entry = {'data': response.data, 'last_modified': last_modified}
+            caches[RESPONSE_CACHE].set(f'response:{key}', entry, settings.RESPONSE_CACHE_TIMEOUT)
+        response = Response(entry['data'])
+        response['ETag'] = etag
+        if entry['last_modified'] is not None:
+            response['Last-Modified'] = http_date(entry['last_modified'])
+        return response
+    return wrapper
+
+
+def validated_response(method, view, request, key, *args, **kwargs):
+    """
+    Run `method` uncached. When the view gives `get_list_state` (the latest
+    timestamp and a cheap summary of the list), the response carries a weak
+    ETag over `key` and that state, and a matching conditional request gets
+    a 304 before anything is serialized.
+    """
+    if not hasattr(view, 'get_list_state'):
+        return method(view, request, *args, **kwargs)
+    last_modified, state = view.get_list_state(request, *args, **kwargs)
+    etag = 'W/' + quote_etag(hashlib.md5(f'{key}|{last_modified}|{state}'.encode()).hexdigest())
+    last_modified = int(last_modified.timestamp()) if last_modified is not None else None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    response = method(view, request, *args, **kwargs)
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def invalidate_snippet(sender, instance, **kwargs):
+    scopes = snippet_scopes(instance.tag_id, instance.owner_id)
+    # The tag and owner an update moved the snippet away from, as read for
+    # the maintained counts (registered on ('tag', 'owner')).
+    previous = counts.previous_values(instance)
+    if previous is not None:
+        scopes |= snippet_scopes(*previous)
+    invalidate(scopes)
+
+
+def invalidate_tag(sender, instance, created=False, **kwargs):
+    scopes = {ALL_TAGS}
+    if not created:
+        # Snippet responses embed the tag title.
+        scopes |= {ALL_SNIPPETS, TAG_TITLES, tag_scope(instance.id)}
+    invalidate(scopes)
+
+
+def invalidate_owner(sender, instance, created=False, update_fields=None, **kwargs):
+    # Snippet responses embed the owner's username; logins only touch last_login.
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    invalidate({ALL_SNIPPETS, USERNAMES, owner_scope(instance.id)})
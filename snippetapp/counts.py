@@ -0,0 +1,215 @@
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
+from django.db.models import Count, F
+from django.db.models.signals import pre_save, post_save, post_delete
+from snippetapp.models import RowCount
+
+# Registered model -> attnames of the dimensions counted per value.
+_dimensions = dict()
+
+
+def register(model, dimensions=()):
+    """
+    Maintain the row count of `model`, and of each value of `dimensions`
+    (field names), from model signals.
+    """
+    _dimensions[model] = tuple(model._meta.get_field(name).attname for name in dimensions)
+    uid = f'counts:{model._meta.label_lower}'
+    pre_save.connect(_remember, sender=model, dispatch_uid=uid)
+    post_save.connect(_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(_deleted, sender=model, dispatch_uid=uid)
+
+
+def scope_for(model, field=None, value=None):
+    scope = model._meta.label_lower
+    if field is not None:
+        scope = f'{scope}:{field}={value}'
+    return scope
+
+
+def count_rows(queryset, **filters):
+    """
+    Return the size of `queryset`, served from the maintained counts when it
+    is the registered model filtered by at most one counted dimension
+    (`filters`, e.g. `tag=<pk>`). Anything else falls back to `COUNT(*)`.
+    """
+    model = queryset.model
+    if model not in _dimensions or len(filters) > 1:
+        return queryset.count()
+    if not filters:
+        if settings.APPROXIMATE_COUNTS:
+            estimate = approximate_count(model)
+            if estimate is not None:
+                return estimate
+        return _read(scope_for(model), queryset)
+    (name, value), = filters.items()
+    try:
+        field = model._meta.get_field(name).attname
+    except FieldDoesNotExist:
+        field = None
+    if field not in _dimensions[model]:
+        return queryset.count()
+    return _read(scope_for(model, field, value), queryset)
+
+
+def approximate_count(model):
+    """
+    Planner estimate of the table size, where the database keeps one.
+    """
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def adjust(model, deltas):
+    """
+    Apply `deltas`, a mapping of `(attname, value)` (or `None` for the whole
+    table) to the change in row count. Scopes seen for the first time are
+    seeded from the database, which already reflects the change.
+    """
+    unseen = []
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        field, value = key if key is not None else (None, None)
+        if not RowCount.objects.filter(scope=scope_for(model, field, value)).update(count=F('count') + delta):
+            unseen.append(key)
+    _seed(model, unseen)
+
+
+def _seed(model, keys):
+    """
+    Create the counts of `keys` (as in `adjust`) from the table, with one
+    grouped query per field rather than one per value.
+    """
+    if not keys:
+        return
+    # The counter keeps whatever it starts from: count on the primary.
+    queryset = model._base_manager.using(router.db_for_write(model)).order_by()
+    values = defaultdict(set)
+    rows = []
+    for key in keys:
+        if key is None:
+            rows.append(RowCount(scope=scope_for(model), count=queryset.count()))
+        else:
+            values[key[0]].add(key[1])
+    for field, field_values in values.items():
+        counted = dict(
+            queryset.filter(**{f'{field}__in': field_values}).values_list(field).annotate(rows=Count('pk'))
+        )
+        if None in field_values:
+            counted[None] = queryset.filter(**{f'{field}__isnull': True}).count()
+        rows += [RowCount(scope=scope_for(model, field, value), count=counted.get(value, 0)) for value in field_values]
+    # A concurrent writer may seed a scope first; its count already includes ours.
+    RowCount.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def deltas_for(model, values, sign=1):
+    """
+    Build `adjust` deltas for rows given as tuples of dimension values, in
+    registration order.
+    """
+    deltas = Counter()
+    for row in values:
+        deltas[None] += sign
+        for field, value in zip(_dimensions[model], row):
+            deltas[(field, value)] += sign
+    return deltas
+
+
+def queryset_deltas(queryset, sign=-1):
+    """
+    Build `adjust` deltas for every row of `queryset` with one grouped query,
+    e.g. just before a bulk delete.
+    """
+    model = queryset.model
+    fields = _dimensions[model]
+    deltas = Counter()
+    for row in queryset.order_by().values(*fields).annotate(rows=Count('pk')):
+        deltas[None] += sign * row['rows']
+        for field in fields:
+            deltas[(field, row[field])] += sign * row['rows']
+    return deltas
+
+
+def rebuild(model):
+    """
+    Recompute every maintained count of `model` from the table.
+    """
+    prefix = scope_for(model)
+    RowCount.objects.filter(scope=prefix).delete()
+    RowCount.objects.filter(scope__startswith=f'{prefix}:').delete()
+    queryset = model._base_manager.order_by()
+    rows = [RowCount(scope=prefix, count=queryset.count())]
+    for field in _dimensions[model]:
+        for row in queryset.values(field).annotate(rows=Count('pk')):
+            rows.append(RowCount(scope=scope_for(model, field, row[field]), count=row['rows']))
+    RowCount.objects.bulk_create(rows)
+    return len(rows)
+
+
+def registered_models():
+    return tuple(_dimensions)
+
+
+def _read(scope, queryset):
+    count = RowCount.objects.filter(scope=scope).values_list('count', flat=True).first()
+    if count is None:
+        # Seed from the primary: a lagging replica's count would stay in the counter.
+        primary = queryset.using(router.db_for_write(queryset.model))
+        row, _ = RowCount.objects.get_or_create(scope=scope, defaults={'count': primary.count()})
+        count = row.count
+    return count
+
+
+def _values(instance):
+    # Read through __dict__ so deferred fields never trigger a query.
+    return tuple(instance.__dict__.get(field) for field in _dimensions[type(instance)])
+
+
+def previous_values(instance):
+    """
+    The dimension values (in registration order) stored for `instance`
+    before the save in progress, or None when the save cannot change them.
+    """
+    return getattr(instance, '_counted_values', None)
+
+
+def _remember(sender, instance, using=None, update_fields=None, **kwargs):
+    # Only updates move rows between counts, so only they read the stored
+    # values; instances loaded for reading are never hooked.
+    instance._counted_values = None
+    if instance._state.adding or instance.pk is None:
+        return
+    fields = _dimensions[sender]
+    if update_fields is not None and not {sender._meta.get_field(name).attname for name in update_fields} & set(fields):
+        return
+    instance._counted_values = (
+        sender._base_manager.using(using).filter(pk=instance.pk).values_list(*fields).first()
+    )
+
+
+def _saved(sender, instance, created, raw=False, **kwargs):
+    current = _values(instance)
+    if created:
+        adjust(sender, deltas_for(sender, [current]))
+    else:
+        previous = previous_values(instance) or current
+        deltas = Counter()
+        for field, old, new in zip(_dimensions[sender], previous, current):
+            if old != new and None not in (old, new):
+                deltas[(field, old)] -= 1
+                deltas[(field, new)] += 1
+        adjust(sender, deltas)
+
+
+def _deleted(sender, instance, **kwargs):
+    adjust(sender, deltas_for(sender, [_values(instance)], sign=-1))
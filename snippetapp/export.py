@@ -0,0 +1,35 @@
+from snippetapp.renderers import dumps
+from snippetapp.serializers import SnippetRowSerializer
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_rows(queryset, chunk_size):
+    """
+    Iterate snippets of `queryset` as dicts in ascending id order, reading
+    `chunk_size` rows from the database at a time.
+    """
+    rows = SnippetRowSerializer.rows(queryset.order_by('id'), named=False)
+    return map(SnippetRowSerializer.to_representation, rows.iterator(chunk_size=chunk_size))
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield dumps(row) + b'\n'
+
+
+def stream_json(rows):
+    separator = b'['
+    for row in rows:
+        yield separator + dumps(row)
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
+
+
+STREAMS = {
+    'json': stream_json,
+    'ndjson': stream_ndjson,
+}
@@ -0,0 +1,57 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class SnippetFilterBackend(BaseFilterBackend):
+    """
+    Filter snippets by `owner` (user id), `tag` (tag id) and `updated_since`
+    (ISO 8601 timestamp). Each filter is served by one of the Snippet
+    indexes: (owner, -id), (tag, -id) and (timestamp).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filters = self.get_filters(request)
+        if 'owner' in filters:
+            queryset = queryset.filter(owner_id=filters['owner'])
+        if 'tag' in filters:
+            queryset = queryset.filter(tag_id=filters['tag'])
+        if 'updated_since' in filters:
+            queryset = queryset.filter(timestamp__gte=filters['updated_since'])
+        return queryset
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Cursor ordering: `updated_since` pages walk the timestamp index,
+        everything else the default `-id`.
+        """
+        if 'updated_since' in request.query_params:
+            return ('-timestamp', '-id')
+        return ('-id',)
+
+    @staticmethod
+    def get_filters(request):
+        """
+        Return the validated filters present in the query string.
+        """
+        filters = dict()
+        errors = dict()
+        for name in ('owner', 'tag'):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            if not (value.isascii() and value.isdigit()):
+                errors[name] = "Expected an id."
+                continue
+            filters[name] = int(value)
+        updated_since = request.query_params.get('updated_since')
+        if updated_since is not None:
+            try:
+                filters['updated_since'] = parse_datetime(updated_since)
+            except ValueError:
+                filters['updated_since'] = None
+            if filters['updated_since'] is None:
+                errors['updated_since'] = "Expected an ISO 8601 timestamp."
+        if errors:
+            raise ValidationError(errors)
+        return filters
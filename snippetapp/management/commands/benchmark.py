@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from server import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users, tags and snippets in a transaction that is rolled back, measure the latency, "
+        "throughput, queries and peak memory of the API endpoints and compare them with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tags', type=int, default=100)
+        parser.add_argument('--snippets', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint.")
+        parser.add_argument('--endpoint', action='append', choices=list(benchmark.ENDPOINTS), dest='endpoints')
+        parser.add_argument('--response-cache', action='store_true', help="Serve reads from the response cache.")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--baseline', help="Fail on regressions against the results in this JSON file.")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown, as a fraction.")
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmark.run(
+                users=options['users'], tags=options['tags'], snippets=options['snippets'],
+                requests=options['requests'], endpoints=options['endpoints'],
+                response_cache=options['response_cache'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for name, metrics in results['endpoints'].items():
+            self.stdout.write(
+                f"{name}: p50 {metrics['p50']}ms, p95 {metrics['p95']}ms, p99 {metrics['p99']}ms, "
+                f"{metrics['requests_per_second']} req/s, {metrics['queries']} queries, "
+                f"{metrics['peak_memory_kb']} KiB peak, {metrics['errors']} errors"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                regressions = benchmark.compare(results, json.load(baseline), options['tolerance'])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+            self.stdout.write("No regressions against the baseline.")
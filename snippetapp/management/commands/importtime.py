@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from server import startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the WSGI or ASGI application in a fresh interpreter under `-X importtime` and report the "
+        "import time per app (INSTALLED_APPS, else top-level package)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=('wsgi', 'asgi'), default='wsgi')
+        parser.add_argument('--path', default='/app/snippet', help="URL resolved after startup.")
+        parser.add_argument('--top', type=int, default=20, help="Apps to list.")
+
+    def handle(self, *args, **options):
+        elapsed, report = startup.run_startup(options['target'], options['path'], importtime=True)
+        modules = startup.parse_importtime(report)
+        self.stdout.write(f"server.{options['target']}: {elapsed * 1000:.0f}ms to start, {len(modules)} modules")
+        for app, own, count in startup.by_app(modules)[:options['top']]:
+            self.stdout.write(f"{own / 1000:8.1f}ms  {count:4d} modules  {app}")
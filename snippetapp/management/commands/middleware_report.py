@@ -0,0 +1,65 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from authapp.models import User
+from server.instrumentation import registry
+from server.middleware_profiles import profile_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Time each middleware of the profile serving the given paths, and compare the cost with the full "
+        "profile. Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths', help="Default: /app/snippet and /admin/login/.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per path and profile.")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/app/snippet', '/admin/login/']
+        timing = override_settings(
+            INSTRUMENTATION_MIDDLEWARE_TIMING=True, INSTRUMENTATION_SAMPLE_RATE=0,
+            QUERY_AUDIT='off', RESPONSE_CACHE_ENABLED=False,
+        )
+        with timing, transaction.atomic():
+            user = User.objects.create_user(username='middleware_report', password=None)
+            authorization = f'Bearer {RefreshToken.for_user(user).access_token}'
+            for path in paths:
+                profile = profile_for(path)
+                self.report(path, profile, self.measure(path, options['requests'], authorization))
+                if profile != 'full':
+                    with override_settings(MIDDLEWARE_PROFILE_PATHS=()):
+                        self.report(path, 'full', self.measure(path, options['requests'], authorization))
+            transaction.set_rollback(True)
+
+    def measure(self, path, requests, authorization):
+        """
+        Mean time per request, and the mean own time of each middleware.
+        """
+        client = Client(HTTP_AUTHORIZATION=authorization)
+        client.get(path)
+        registry.clear()
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        elapsed = (time.perf_counter() - start) / requests
+        costs = {
+            dict(labels)['middleware']: histogram.sum / histogram.count
+            for (name, labels), histogram in registry.histograms.items()
+            if name == 'middleware_duration_seconds'
+        }
+        registry.clear()
+        return elapsed, costs
+
+    def report(self, path, profile, measurement):
+        elapsed, costs = measurement
+        self.stdout.write(
+            f"{path} ({profile} profile): {elapsed * 1000:.3f}ms per request, "
+            f"{sum(costs.values()) * 1000:.3f}ms in middleware"
+        )
+        for middleware, cost in costs.items():
+            self.stdout.write(f"  {middleware}: {cost * 1000:.3f}ms")
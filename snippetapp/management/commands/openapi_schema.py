@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from server import docs
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI document served by /docs/ to API_SCHEMA_PATH. Run it at build time so workers "
+        "serve the saved document; they only generate it again when the routes change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Default: API_SCHEMA_PATH.")
+        parser.add_argument(
+            '--check', action='store_true', help="Fail if the saved document is missing or out of date, instead.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.API_SCHEMA_PATH
+        if options['check']:
+            schema = docs.read_schema(path)
+            if schema is None or schema.urlconf != docs.urlconf_fingerprint():
+                raise CommandError(f"{path} is missing or out of date.")
+            self.stdout.write(f"{path} is up to date.")
+            return
+        schema = docs.write_schema(path)
+        self.stdout.write(f"Wrote {len(schema.body)} bytes to {path} (ETag {schema.etag}).")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from snippetapp import counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the maintained row counts from the tables."
+
+    def handle(self, *args, **options):
+        for model in counts.registered_models():
+            with transaction.atomic():
+                scopes = counts.rebuild(model)
+            self.stdout.write(f"{model._meta.label}: rebuilt {scopes} counts.")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+from snippetapp import search
+from snippetapp.models import Snippet
+
+
+class Command(BaseCommand):
+    help = "Recreate the snippet search index and its triggers from the snippet table."
+
+    def handle(self, *args, **options):
+        connection = connections[router.db_for_write(Snippet)]
+        if not search.is_indexed(connection):
+            self.stdout.write(f"{connection.vendor}: search falls back to substring matching, no index to build.")
+            return
+        with transaction.atomic(using=connection.alias):
+            search.uninstall(connection)
+            search.install(connection)
+        self.stdout.write(f"{search.SEARCH_TABLE}: rebuilt.")
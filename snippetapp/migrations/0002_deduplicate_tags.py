@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def deduplicate_tags(apps, schema_editor):
+    """
+    Point snippets of duplicated tag titles at the oldest tag and drop the
+    rest, so the unique index on Tag.title can be created.
+    """
+    Tag = apps.get_model('snippetapp', 'Tag')
+    Snippet = apps.get_model('snippetapp', 'Snippet')
+    duplicates = (
+        Tag.objects.order_by().values('title')
+        .annotate(keep=Min('id'), tags=Count('id'))
+        .filter(tags__gt=1)
+    )
+    for duplicate in duplicates:
+        tag_ids = list(Tag.objects.filter(title=duplicate['title']).values_list('id', flat=True))
+        merged = [tag_id for tag_id in tag_ids if tag_id != duplicate['keep']]
+        Snippet.objects.filter(tag_id__in=merged).update(tag_id=duplicate['keep'])
+        Tag.objects.filter(id__in=merged).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippetapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_tags, migrations.RunPython.noop),
+    ]
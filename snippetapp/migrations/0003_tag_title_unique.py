@@ -0,0 +1,18 @@
+# Generated by Django 3.2.12 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippetapp', '0002_deduplicate_tags'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='title',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.12 on 2026-10-18 18:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('snippetapp', '0003_tag_title_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='snippet',
+            name='owner',
+            field=models.ForeignKey(db_column='owner', db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='snippet',
+            name='tag',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='tag', to='snippetapp.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['owner', '-id'], name='snippet_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['tag', '-id'], name='snippet_tag_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['timestamp'], name='snippet_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# The FTS5 index and triggers as of this migration; snippetapp.search keeps
+# the current definition for `rebuild_search_index`.
+CREATE = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS snippetapp_snippet_search USING fts5(
+        content, content='snippetapp_snippet', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS snippetapp_snippet_search_insert AFTER INSERT ON snippetapp_snippet BEGIN
+        INSERT INTO snippetapp_snippet_search(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS snippetapp_snippet_search_delete AFTER DELETE ON snippetapp_snippet BEGIN
+        INSERT INTO snippetapp_snippet_search(snippetapp_snippet_search, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS snippetapp_snippet_search_update AFTER UPDATE OF content ON snippetapp_snippet BEGIN
+        INSERT INTO snippetapp_snippet_search(snippetapp_snippet_search, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO snippetapp_snippet_search(rowid, content) VALUES (new.id, new.content);
+    END""",
+    "INSERT INTO snippetapp_snippet_search(snippetapp_snippet_search) VALUES ('rebuild')",
+)
+
+DROP = (
+    "DROP TRIGGER IF EXISTS snippetapp_snippet_search_insert",
+    "DROP TRIGGER IF EXISTS snippetapp_snippet_search_delete",
+    "DROP TRIGGER IF EXISTS snippetapp_snippet_search_update",
+    "DROP TABLE IF EXISTS snippetapp_snippet_search",
+)
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        # Other databases search without an index.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippetapp', '0004_snippet_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(execute(CREATE), execute(DROP)),
+    ]
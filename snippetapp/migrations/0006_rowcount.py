@@ -0,0 +1,21 @@
+# Generated by Django 3.2.12 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippetapp', '0005_snippet_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=255, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.db import models
 
 # Create your models here.
 class Tag(models.Model):
-    title = models.CharField(max_length=255, null=False)
+    title = models.CharField(max_length=255, null=False, unique=True)
 
     class Meta:
         ordering = ("-id",)
@@ -13,10 +13,28 @@ class Tag(models.Model):
 
 
 class Snippet(models.Model):
-    tag = models.ForeignKey(Tag, related_name="tag", on_delete=models.DO_NOTHING)
+    # The composite indexes below lead with tag and owner, so the FKs need no index of their own.
+    tag = models.ForeignKey(Tag, related_name="tag", on_delete=models.DO_NOTHING, db_index=False)
     content = models.TextField(max_length=1000, null=False)
     timestamp = models.DateTimeField(auto_now=True)
-    owner = models.ForeignKey('authapp.User', db_column='owner', on_delete=models.CASCADE)
+    owner = models.ForeignKey('authapp.User', db_column='owner', on_delete=models.CASCADE, db_index=False)
 
     class Meta:
         ordering = ("-id",)
+        indexes = [
+            models.Index(fields=['owner', '-id'], name='snippet_owner_id_idx'),
+            models.Index(fields=['tag', '-id'], name='snippet_tag_id_idx'),
+            models.Index(fields=['timestamp'], name='snippet_timestamp_idx'),
+        ]
+
+
+class RowCount(models.Model):
+    """
+    Maintained row count for a model (scope `<app_label>.<model>`) or for one
+    value of a counted dimension (scope `<app_label>.<model>:<field>=<value>`).
+    """
+    scope = models.CharField(max_length=255, unique=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.scope}: {self.count}'
@@ -0,0 +1,57 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PaginatedDataMixin:
+    """
+    Page responses shaped as `next`, `previous` and `data`.
+    """
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        res = dict()
+        res['next'] = self.get_next_link()
+        res['previous'] = self.get_previous_link()
+        res['data'] = data
+        return res
+
+
+class SnippetCursorPagination(PaginatedDataMixin, CursorPagination):
+    """
+    Keyset pagination over the models' default `-id` ordering. Cursors are
+    opaque, pages stay stable under concurrent inserts and each page costs
+    the same regardless of depth.
+    """
+    ordering = '-id'
+    page_size = settings.PAGINATION_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+
+class SnippetSearchPagination(PaginatedDataMixin, LimitOffsetPagination):
+    """
+    Limit/offset pagination for ranked search results, which have no key to
+    seek on. Each page reads one extra row to tell whether another follows,
+    so the matches are never counted.
+    """
+    default_limit = settings.PAGINATION_PAGE_SIZE
+    max_limit = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(data):
+    """
+    Encode `data` to the bytes JSONRenderer produces for it, with orjson
+    when it is installed.
+    """
+    if orjson is None:
+        ret = _encoder.encode(data).encode()
+    else:
+        ret = orjson.dumps(data, default=_encoder.default, option=orjson.OPT_UTC_Z)
+    # Escape the JavaScript line terminators as JSONRenderer does.
+    return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Compact JSON renderer for read-heavy endpoints; output matches
+    JSONRenderer's compact form.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,115 @@
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from snippetapp.models import Snippet
+
+SEARCH_ORDERS = ('rank', 'recent')
+
+# FTS5 index over Snippet.content. It is an external-content table: it
+# stores only the index, reads content back from the snippet table and is
+# kept in sync by triggers, so bulk writes and raw deletes are covered too.
+SEARCH_TABLE = 'snippetapp_snippet_search'
+
+_CREATE = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        content, content='snippetapp_snippet', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON snippetapp_snippet BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON snippetapp_snippet BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF content ON snippetapp_snippet BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO {SEARCH_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+)
+
+_DROP = (
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+)
+
+
+def is_indexed(connection):
+    """
+    Whether `connection` keeps the FTS5 index (SQLite only).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def install(connection):
+    """
+    Create the index and its triggers, and index the existing snippets.
+    SQLite rebuilds a table to alter it and drops its triggers on the way,
+    so this runs again after any migration that alters Snippet.
+    """
+    if not is_indexed(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in _CREATE:
+            cursor.execute(statement)
+
+
+def uninstall(connection):
+    if not is_indexed(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in _DROP:
+            cursor.execute(statement)
+
+
+def parse_query(query):
+    """
+    Split `query` into search terms. A term ending in `*` matches as a
+    prefix; every term must match.
+    """
+    terms = []
+    for token in query.split():
+        prefix = token.endswith('*')
+        token = token.rstrip('*')
+        if token:
+            terms.append((token, prefix))
+    return terms
+
+
+def match_expression(terms):
+    """
+    FTS5 MATCH expression of `terms`, each quoted so user input is never
+    read as query syntax.
+    """
+    return ' '.join(
+        '"{}"{}'.format(token.replace('"', '""'), '*' if prefix else '')
+        for token, prefix in terms
+    )
+
+
+def search_snippets(queryset, terms, order='rank'):
+    """
+    Narrow a Snippet `queryset` to the snippets matching `terms`, ordered by
+    `order`: 'rank' (bm25, best match first) or 'recent' (newest first).
+    Ranking scores every match, while 'recent' reads the index in order and
+    stays cheap for terms matching most snippets. Databases without the
+    index fall back to a substring scan ordered by `-id`.
+    """
+    connection = connections[router.db_for_read(Snippet)]
+    if not is_indexed(connection):
+        condition = Q()
+        for token, _ in terms:
+            condition &= Q(content__icontains=token)
+        return queryset.filter(condition).order_by('-id')
+    queryset = queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = snippetapp_snippet.id', f'{SEARCH_TABLE} MATCH %s'],
+        params=[match_expression(terms)],
+    )
+    # Ordering on the index's own columns lets FTS5 return rows in order
+    # instead of SQLite sorting every match.
+    if order == 'recent':
+        return queryset.order_by(RawSQL(f'{SEARCH_TABLE}.rowid', ()).desc())
+    return queryset.order_by(RawSQL(f'{SEARCH_TABLE}.rank', ()).asc())
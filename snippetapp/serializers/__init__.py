@@ -2,4 +2,11 @@ from .snippets import (
     TagSerializer,
     SnippetSerializer,
     OverviewSerializer,
+    SnippetBatchItemSerializer,
+    SnippetBatchSerializer,
+    BulkDeleteSerializer,
+)
+from .rows import (
+    RowSerializer,
+    SnippetRowSerializer,
 )
@@ -0,0 +1,38 @@
+class RowSerializer:
+    """
+    Read-only serializer over `values_list` rows. Subclasses declare
+    `fields` as (output key, lookup) pairs; rows map to dicts keyed in the
+    order of `fields`.
+    """
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = tuple(lookup for _, lookup in cls.fields)
+        keys = tuple(key for key, _ in cls.fields)
+        cls.to_representation = staticmethod(lambda row: dict(zip(keys, row)))
+
+    @classmethod
+    def rows(cls, queryset, named=True):
+        """
+        `queryset` reduced to the serialized columns. Named rows expose the
+        lookups as attributes, which cursor pagination needs.
+        """
+        return queryset.values_list(*cls.lookups, named=named)
+
+    @classmethod
+    def serialize(cls, rows):
+        return list(map(cls.to_representation, rows))
+
+
+class SnippetRowSerializer(RowSerializer):
+    """
+    SnippetSerializer's read output, without building model instances.
+    """
+    fields = (
+        ('id', 'id'),
+        ('tag', 'tag__title'),
+        ('content', 'content'),
+        ('timestamp', 'timestamp'),
+        ('owner', 'owner__username'),
+    )
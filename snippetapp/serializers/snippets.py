@@ -1,4 +1,13 @@
-from rest_framework.serializers import ModelSerializer, HyperlinkedModelSerializer, ReadOnlyField
+from django.conf import settings
+from rest_framework.serializers import (
+    ModelSerializer,
+    HyperlinkedModelSerializer,
+    ReadOnlyField,
+    Serializer,
+    ListField,
+    DictField,
+    IntegerField,
+)
 from snippetapp.models import (
     Tag,
     Snippet,
@@ -10,6 +19,10 @@ class TagSerializer(ModelSerializer):
     class Meta:
         model = Tag
         fields = ["id", 'title']
+        # Nested snippet writes reuse existing titles through get_or_create.
+        extra_kwargs = {
+            'title': {'validators': []},
+        }
 
 
 class SnippetSerializer(ModelSerializer):
@@ -37,24 +50,14 @@ class SnippetSerializer(ModelSerializer):
 
     def create(self, validated_data):
         title = validated_data.pop('tag')
-        tag_title = Tag.objects.filter(title=title['title'])
-        if not tag_title.exists():
-            tag_title = Tag.objects.create(**title)
-        else:
-            tag_title = tag_title.get(title=title['title'])
+        tag_title, _ = Tag.objects.get_or_create(title=title['title'])
         snippet_data = Snippet.objects.create(tag=tag_title, **validated_data)
         return snippet_data
 
     def update(self, instance, validated_data):
         if 'tag' in validated_data:
             tag_data = validated_data.get('tag')
-            tag = instance.tag
-            tag_title = Tag.objects.filter(title=tag_data['title'])
-            if not tag_title.exists():
-                new_tag = Tag.objects.create(title=tag_data['title'])
-                instance.tag = new_tag
-            else:
-                instance.tag = Tag.objects.get(title=tag_data['title'])
+            instance.tag, _ = Tag.objects.get_or_create(title=tag_data['title'])
         instance.content = validated_data.get('content', instance.content)
         instance.timestamp = validated_data.get('timestamp', instance.timestamp)
         instance.owner = validated_data.get('owner', instance.owner)
@@ -74,3 +77,27 @@ class OverviewSerializer(HyperlinkedModelSerializer):
             "owner",
             "tag"
         ]
+
+
+class SnippetBatchItemSerializer(SnippetSerializer):
+    """
+    One entry of a bulk write: a snippet to create, or to update when `id`
+    is given.
+    """
+    id = IntegerField(required=False, min_value=1)
+
+
+class SnippetBatchSerializer(Serializer):
+    snippets = ListField(
+        child=DictField(),
+        allow_empty=False,
+        max_length=settings.SNIPPET_BULK_MAX_ITEMS,
+    )
+
+
+class BulkDeleteSerializer(Serializer):
+    ids = ListField(
+        child=IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.SNIPPET_BULK_MAX_ITEMS,
+    )
@@ -0,0 +1,132 @@
+"""
+Read latency of the snippet endpoints under WSGI and ASGI, one JSON line
+per run with p50/p95/p99 in ms. Run by test_async_views.py in a process of
+its own, on a scratch SQLite database:
+
+    python -m snippetapp.tests.asgi_load_benchmark <database file> <rows> <requests>
+
+The handlers are driven in-process, without an HTTP server: WSGI with a
+thread per concurrent request, as a threaded worker runs it, and ASGI with
+that many requests in flight on one event loop.
+"""
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
+os.environ['DATABASE_NAME'] = sys.argv[1]
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '60')
+# Measure the database path, not the response cache.
+os.environ['RESPONSE_CACHE'] = 'false'
+
+import django  # noqa: E402
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+from authapp.models import User  # noqa: E402
+from snippetapp.models import Snippet, Tag  # noqa: E402
+
+ROWS = int(sys.argv[2])
+REQUESTS = int(sys.argv[3])
+
+
+def seed():
+    call_command('migrate', verbosity=0)
+    owner = User.objects.create_user(username='benchmark_reader', password='test123')
+    tags = [Tag.objects.create(title=f'Benchmark tag {index}') for index in range(10)]
+    Snippet.objects.bulk_create(
+        (Snippet(tag=tags[index % 10], owner=owner, content=f'Benchmark snippet {index}.') for index in range(ROWS)),
+        batch_size=5000,
+    )
+    call_command('rebuild_counts', stdout=io.StringIO())
+    return owner, tags, list(Snippet.objects.values_list('id', flat=True)[:100])
+
+
+def paths(prefix, tags, ids):
+    """
+    The request mix: snippet pages, single snippets, tag pages and the
+    overview, in equal parts.
+    """
+    name = f'{prefix}snippet-list'
+    mix = [
+        reverse(name),
+        *(reverse(f'{prefix}snippet-detail', args=(id,)) for id in ids[:10]),
+        *(reverse(f'{prefix}tag-detail', args=(tag.id,)) for tag in tags[:3]),
+        reverse(f'{prefix}overview-list'),
+    ]
+    return [mix[index % len(mix)] for index in range(REQUESTS)]
+
+
+def summary(server, view, concurrency, latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'server': server,
+        'view': view,
+        'concurrency': concurrency,
+        'p50': round(quantiles[49] * 1000, 2),
+        'p95': round(quantiles[94] * 1000, 2),
+        'p99': round(quantiles[98] * 1000, 2),
+        'requests_per_second': round(len(latencies) / elapsed),
+        'errors': errors,
+    }
+
+
+def run_wsgi(urls, concurrency, authorization):
+    client = Client(HTTP_AUTHORIZATION=authorization)
+
+    def get(url):
+        start = time.perf_counter()
+        status = client.get(url).status_code
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(get, urls))
+        pool.map(lambda _: connections.close_all(), range(concurrency))
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in results], sum(status != 200 for _, status in results), elapsed
+
+
+def run_asgi(urls, concurrency, authorization):
+    async def main():
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def get(url):
+            async with slots:
+                start = time.perf_counter()
+                response = await client.get(url, AUTHORIZATION=authorization)
+                return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(get(url) for url in urls))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    return [latency for latency, _ in results], sum(status != 200 for _, status in results), elapsed
+
+
+if __name__ == '__main__':
+    owner, tags, ids = seed()
+    authorization = f'Bearer {RefreshToken.for_user(owner).access_token}'
+    runs = (
+        ('wsgi', 'sync', run_wsgi, ''),
+        ('asgi', 'sync', run_asgi, ''),
+        ('asgi', 'async', run_asgi, 'async-'),
+    )
+    for concurrency in (1, 8, 32):
+        for server, view, run, prefix in runs:
+            urls = paths(prefix, tags, ids)
+            # Warm up connections and caches before timing.
+            run(urls[:concurrency * 2], concurrency, authorization)
+            print(json.dumps(summary(server, view, concurrency, *run(urls, concurrency, authorization))))
@@ -0,0 +1 @@
+from server.tests.conftest import query_audit  # noqa
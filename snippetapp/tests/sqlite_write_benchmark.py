@@ -0,0 +1,72 @@
+"""
+Concurrent snippet writes against a scratch SQLite database, one JSON line
+per run. Run by test_write_queue.py in a process of its own, so the writers
+get real connections and commits:
+
+    python -m snippetapp.tests.sqlite_write_benchmark <database file> <writes>
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
+os.environ['DATABASE_NAME'] = sys.argv[1]
+
+import django  # noqa: E402
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from authapp.models import User  # noqa: E402
+from snippetapp.models import Snippet, Tag  # noqa: E402
+from snippetapp.write_queue import write  # noqa: E402
+
+WRITES = int(sys.argv[2])
+
+
+def create_snippet(owner, index):
+    # The write path of SnippetSerializer.create: tag lookup, then insert.
+    tag, _ = Tag.objects.get_or_create(title=f'Benchmark tag {index % 10}')
+    return Snippet.objects.create(tag=tag, owner=owner, content=f'Benchmark snippet {index}.')
+
+
+def run(writers, queued, owner):
+    barrier = threading.Barrier(writers + 1)
+    errors = []
+
+    def writer(offset):
+        barrier.wait()
+        for index in range(offset, WRITES, writers):
+            try:
+                write(lambda: create_snippet(owner, index))
+            except Exception as error:
+                errors.append(repr(error))
+        connections.close_all()
+
+    threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(writers)]
+    with override_settings(SQLITE_WRITE_QUEUE=queued):
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return {
+        'writers': writers,
+        'queued': queued,
+        'writes_per_second': round((WRITES - len(errors)) / elapsed),
+        'errors': len(errors),
+        'error': errors[0] if errors else None,
+    }
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    owner = User.objects.create_user(username='benchmark_writer', password='test123')
+    for writers in (1, 4, 16):
+        for queued in (False, True):
+            print(json.dumps({'profile': os.environ.get('SQLITE_PROFILE', 'default'), **run(writers, queued, owner)}))
@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from asgiref.sync import async_to_sync
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.db import connections
+from django.test import AsyncClient
+from django.urls import reverse
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+from snippetapp.viewsets import async_views
+
+BENCHMARK_ROWS = os.environ.get('ASYNC_BENCHMARK_ROWS', '10000')
+BENCHMARK_REQUESTS = os.environ.get('ASYNC_BENCHMARK_REQUESTS', '800')
+
+
+@pytest.fixture
+def async_get(api_client, monkeypatch):
+    """
+    GET through AsyncClient with the api_client's token. The view thread
+    shares the test's connection, so it reads inside the test transaction.
+    """
+    shared = connections['default']
+    shared.inc_thread_sharing()
+    executor = ThreadPoolExecutor(1, initializer=connections.__setitem__, initargs=('default', shared))
+    monkeypatch.setattr(async_views, 'executor', executor)
+    # The test transaction keeps the connection out of autocommit.
+    monkeypatch.setattr(async_views, 'close_old_connections', lambda: None)
+    # AsyncClient takes headers as ASGI header names.
+    authorization = api_client._credentials['HTTP_AUTHORIZATION']
+
+    @async_to_sync
+    async def get(url, authenticated=True):
+        headers = {'AUTHORIZATION': authorization} if authenticated else {}
+        return await AsyncClient().get(url, **headers)
+
+    yield get
+    executor.shutdown()
+    shared.dec_thread_sharing()
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """
+    Test cases for the async read endpoints.
+    """
+
+    @pytest.fixture
+    def snippets(self, api_client):
+        tag = Tag.objects.create(title='Async tag')
+        owner = User.objects.get(username='user_one')
+        return [Snippet.objects.create(tag=tag, owner=owner, content=f'Async snippet {index}') for index in range(3)]
+
+    @pytest.mark.parametrize('name, detail', [
+        ('snippet-list', False),
+        ('snippet-detail', True),
+        ('tag-list', False),
+        ('tag-detail', True),
+        ('overview-list', False),
+    ])
+    def test_matches_sync_endpoint(self, api_client, async_get, snippets, name, detail):
+        args = ((snippets[0].tag_id if name.startswith('tag') else snippets[0].id),) if detail else ()
+        expected = api_client.get(reverse(name, args=args))
+        response = async_get(reverse(f'async-{name}', args=args))
+        assert response.status_code == expected.status_code == 200
+        assert response.json() == expected.json()
+
+    def test_links_stay_async(self, async_get, snippets):
+        response = async_get(f"{reverse('async-snippet-list')}?page_size=2")
+        assert response.json()['next'].split('?')[0].endswith(reverse('async-snippet-list'))
+
+    def test_unauthenticated(self, async_get):
+        response = async_get(reverse('async-snippet-list'), authenticated=False)
+        assert response.status_code == 401
+
+    def test_missing_snippet(self, async_get):
+        assert async_get(reverse('async-snippet-detail', args=(0,))).status_code == 404
+
+
+@pytest.mark.benchmark
+def test_async_latency(tmp_path):
+    result = subprocess.run(
+        [sys.executable, '-m', 'snippetapp.tests.asgi_load_benchmark', str(tmp_path / 'db.sqlite3'), BENCHMARK_ROWS, BENCHMARK_REQUESTS],
+        capture_output=True, text=True, check=True,
+    )
+    runs = [json.loads(line) for line in result.stdout.splitlines()]
+    for run in runs:
+        print(run)
+    assert all(run['errors'] == 0 for run in runs)
@@ -0,0 +1,193 @@
+import json
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+
+
+@pytest.mark.django_db
+class TestCaching:
+    """
+    Test cases for response caching and conditional requests.
+    """
+
+    url = reverse("snippet-list")
+
+    @pytest.fixture
+    def snippets(self):
+        owners = [
+            User.objects.create_user(username='user_two', email='test1@email.com', password='test123'),
+            User.objects.create_user(username='user_three', email='test3@email.com', password='test123'),
+        ]
+        tag = Tag.objects.create(title='Cached tag')
+        return [
+            Snippet.objects.create(tag=tag, content=f'Snippet {index}.', owner=owners[index])
+            for index in range(2)
+        ]
+
+    def get(self, client, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, **headers)
+        snippet_queries = [query for query in context.captured_queries if 'snippetapp_' in query['sql']]
+        return response, snippet_queries
+
+    def test_repeated_list_is_served_from_cache(self, api_client, snippets):
+        first, queries = self.get(api_client, self.url)
+        assert queries
+        second, queries = self.get(api_client, self.url)
+        assert queries == []
+        assert second.status_code == 200
+        assert json.loads(second.content) == json.loads(first.content)
+        assert second['ETag'] == first['ETag']
+        assert 'Last-Modified' in second
+
+    def test_if_none_match_returns_not_modified(self, api_client, snippets):
+        first, _ = self.get(api_client, reverse("overview-list"))
+        response, queries = self.get(api_client, reverse("overview-list"), HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        assert response.content == b''
+        assert queries == []
+
+    def test_if_modified_since_returns_not_modified(self, api_client, snippets):
+        first, _ = self.get(api_client, self.url)
+        response, _ = self.get(api_client, self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        assert response.status_code == 304
+
+    def test_writes_evict_only_affected_owners(self, api_client, snippets):
+        first_owner = self.url + f"?owner={snippets[0].owner_id}"
+        second_owner = self.url + f"?owner={snippets[1].owner_id}"
+        first, _ = self.get(api_client, first_owner)
+        self.get(api_client, second_owner)
+
+        Snippet.objects.create(tag=snippets[0].tag, content='New snippet.', owner=snippets[0].owner)
+
+        response, queries = self.get(api_client, second_owner)
+        assert queries == []
+        response, queries = self.get(api_client, first_owner, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert queries
+        assert json.loads(response.content)['data'][0]['content'] == 'New snippet.'
+
+    def test_moved_snippet_evicts_previous_tag(self, api_client, snippets):
+        url = self.url + f"?tag={snippets[0].tag_id}"
+        first, _ = self.get(api_client, url)
+        moved = Snippet.objects.get(id=snippets[0].id)
+        moved.tag = Tag.objects.create(title='Other tag')
+        moved.save()
+        response, queries = self.get(api_client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert [item['id'] for item in json.loads(response.content)['data']] == [snippets[1].id]
+
+    def test_loaded_snippets_are_not_hooked(self):
+        assert not post_init.has_listeners(Snippet)
+
+    def test_tag_detail_is_evicted_on_snippet_writes(self, api_client, snippets):
+        url = reverse("tag-detail", args=[snippets[0].tag_id])
+        self.get(api_client, url)
+        response = api_client.patch(self.url + f"/{snippets[0].id}", {"content": "Patched."}, format='json')
+        assert response.status_code == 200
+        response, queries = self.get(api_client, url)
+        assert queries
+        contents = [item['content'] for item in json.loads(response.content)['data']]
+        assert 'Patched.' in contents
+
+    def test_tag_rename_evicts_owner_lists(self, api_client, snippets):
+        url = self.url + f"?owner={snippets[0].owner_id}"
+        self.get(api_client, url)
+        tag = snippets[0].tag
+        tag.title = 'Renamed tag'
+        tag.save()
+        response, queries = self.get(api_client, url)
+        assert queries
+        assert json.loads(response.content)['data'][0]['tag'] == 'Renamed tag'
+
+    def test_username_change_evicts_tag_lists(self, api_client, snippets):
+        urls = [self.url + f"?tag={snippets[0].tag_id}", reverse("tag-detail", args=[snippets[0].tag_id])]
+        for url in urls:
+            self.get(api_client, url)
+        owner = snippets[0].owner
+        owner.username = 'renamed_user'
+        owner.save()
+        for url in urls:
+            response, queries = self.get(api_client, url)
+            assert queries
+            assert 'renamed_user' in [item['owner'] for item in json.loads(response.content)['data']]
+
+    def test_bulk_delete_evicts_lists(self, api_client, snippets):
+        self.get(api_client, self.url)
+        ids = [snippet.id for snippet in snippets]
+        api_client.post(self.url + "/bulk-delete", {"ids": ids}, format='json')
+        response, _ = self.get(api_client, self.url)
+        assert json.loads(response.content)['data'] == []
+
+    def test_cache_can_be_disabled(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        self.get(api_client, self.url)
+        response, queries = self.get(api_client, self.url)
+        assert queries
+        assert response['ETag'].startswith('W/"')
+
+    def test_uncached_list_returns_not_modified_without_serializing(self, api_client, snippets, settings, monkeypatch):
+        settings.RESPONSE_CACHE_ENABLED = False
+        url = reverse("overview-list")
+        first, _ = self.get(api_client, url)
+
+        def serialize(*args, **kwargs):
+            raise AssertionError("An unchanged list is not serialized.")
+        monkeypatch.setattr('snippetapp.viewsets.snippets.OverviewViewSet.get_serializer', serialize)
+        response, queries = self.get(api_client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        assert len(queries) <= 2
+
+    def test_uncached_etag_follows_writes_missed_by_invalidation(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        first, _ = self.get(api_client, self.url)
+        # An update that sends no signals, as a write from another process.
+        Snippet.objects.filter(id=snippets[0].id).update(content='Updated.', timestamp=timezone.now())
+        response, _ = self.get(api_client, self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert 'Updated.' in [item['content'] for item in json.loads(response.content)['data']]
+        assert response['ETag'] != first['ETag']
+
+    def test_uncached_etag_follows_raw_deletes(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        first, _ = self.get(api_client, self.url)
+        # The older snippet: the latest timestamp stays the same.
+        Snippet.objects.filter(id=snippets[0].id)._raw_delete('default')
+        response, _ = self.get(api_client, self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert [item['id'] for item in json.loads(response.content)['data']] == [snippets[1].id]
+
+    def test_uncached_etag_follows_rows_moved_out_of_a_list(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        url = f'{self.url}?tag={snippets[0].tag_id}'
+        first, _ = self.get(api_client, url)
+        Snippet.objects.filter(id=snippets[0].id).update(tag=Tag.objects.create(title='Other tag'))
+        response, _ = self.get(api_client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert [item['id'] for item in json.loads(response.content)['data']] == [snippets[1].id]
+
+    def test_uncached_state_reads_one_page(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        url = self.url + '?page_size=1'
+        first, _ = self.get(api_client, url)
+        response, queries = self.get(api_client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        # The page and the row telling whether another follows; nothing is counted.
+        assert len(queries) == 1
+        assert 'LIMIT 2' in queries[0]['sql']
+        assert 'COUNT(' not in queries[0]['sql'].upper()
+
+    def test_uncached_search_returns_not_modified(self, api_client, snippets, settings):
+        settings.RESPONSE_CACHE_ENABLED = False
+        url = reverse("snippet-search") + '?q=snippet'
+        first, _ = self.get(api_client, url)
+        assert first.status_code == 200
+        response, _ = self.get(api_client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        assert self.get(api_client, reverse("snippet-search"))[0].status_code == 400
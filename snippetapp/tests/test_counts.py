@@ -0,0 +1,79 @@
+import pytest
+from server.tests.conftest import django_db_setup  # noqa
+from django.core.management import call_command
+from authapp.models import User
+from snippetapp import counts
+from snippetapp.models import RowCount, Snippet, Tag
+
+
+@pytest.mark.django_db
+class TestCounts:
+    """
+    Test cases for the maintained snippet counts.
+    """
+
+    @pytest.fixture
+    def owners(self):
+        return [
+            User.objects.create_user(username='user_two', email='test1@email.com', password='test123'),
+            User.objects.create_user(username='user_three', email='test3@email.com', password='test123'),
+        ]
+
+    @pytest.fixture
+    def tags(self):
+        return [Tag.objects.create(title='First tag'), Tag.objects.create(title='Second tag')]
+
+    def assert_counts_match(self, owners, tags):
+        assert counts.count_rows(Snippet.objects.all()) == Snippet.objects.count()
+        for owner in owners:
+            queryset = Snippet.objects.filter(owner=owner)
+            assert counts.count_rows(queryset, owner=owner.id) == queryset.count()
+        for tag in tags:
+            queryset = Snippet.objects.filter(tag=tag)
+            assert counts.count_rows(queryset, tag=tag.id) == queryset.count()
+
+    def test_counts_follow_writes(self, owners, tags):
+        snippets = [
+            Snippet.objects.create(tag=tags[index % 2], content=f'Snippet {index}.', owner=owners[index % 2])
+            for index in range(5)
+        ]
+        self.assert_counts_match(owners, tags)
+
+        moved = Snippet.objects.get(id=snippets[0].id)
+        moved.tag = tags[1]
+        moved.owner = owners[1]
+        moved.save()
+        self.assert_counts_match(owners, tags)
+
+        snippets[1].delete()
+        self.assert_counts_match(owners, tags)
+
+    def test_updates_read_previous_values_once(self, owners, tags, django_assert_num_queries):
+        snippet = Snippet.objects.create(tag=tags[0], content='Snippet.', owner=owners[0])
+        counts.count_rows(Snippet.objects.filter(tag=tags[1]), tag=tags[1].id)
+        snippet.content = 'Edited.'
+        with django_assert_num_queries(1):
+            snippet.save(update_fields=['content'])
+        snippet.tag = tags[1]
+        # The stored values, the update and the two count adjustments.
+        with django_assert_num_queries(4):
+            snippet.save(update_fields=['tag'])
+        self.assert_counts_match(owners, tags)
+
+    def test_counts_read_without_count_query(self, owners, tags, django_assert_num_queries):
+        Snippet.objects.create(tag=tags[0], content='Snippet.', owner=owners[0])
+        with django_assert_num_queries(1) as context:
+            counts.count_rows(Snippet.objects.filter(tag=tags[0]), tag=tags[0].id)
+        assert 'COUNT(' not in context.captured_queries[0]['sql'].upper()
+
+    def test_unknown_filter_falls_back(self, owners, tags):
+        Snippet.objects.create(tag=tags[0], content='Snippet.', owner=owners[0])
+        queryset = Snippet.objects.filter(content='Snippet.')
+        assert counts.count_rows(queryset, content='Snippet.') == 1
+
+    def test_rebuild_counts(self, owners, tags):
+        for index in range(3):
+            Snippet.objects.create(tag=tags[0], content=f'Snippet {index}.', owner=owners[0])
+        RowCount.objects.update(count=0)
+        call_command('rebuild_counts')
+        self.assert_counts_match(owners, tags)
@@ -0,0 +1,67 @@
+import json
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.urls import reverse
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+
+
+@pytest.mark.django_db
+class TestExport:
+    """
+    Test cases for the streaming snippet export.
+    """
+
+    url = reverse("overview-export")
+
+    @pytest.fixture
+    def snippets(self):
+        user = User.objects.create_user(username='user_two', email='test1@email.com', password='test123')
+        tags = [Tag.objects.create(title='First tag'), Tag.objects.create(title='Second tag')]
+        return [
+            Snippet.objects.create(tag=tags[index % 2], content=f'Snippet {index}.', owner=user)
+            for index in range(5)
+        ]
+
+    def export(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.streaming
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_json_export(self, api_client, snippets):
+        response, body = self.export(api_client, self.url)
+        assert response['Content-Type'] == 'application/json'
+        json_data = json.loads(body)
+        assert [item['id'] for item in json_data] == [snippet.id for snippet in snippets]
+        assert json_data[0]['tag'] == 'First tag'
+        assert json_data[0]['owner'] == 'user_two'
+        assert json_data[0]['content'] == 'Snippet 0.'
+
+    def test_export_matches_snippet_detail(self, api_client, snippets):
+        _, body = self.export(api_client, self.url)
+        detail = api_client.get(reverse("snippet-detail", args=[snippets[0].id]))
+        assert json.loads(body)[0] == json.loads(detail.content)
+
+    def test_ndjson_export(self, api_client, snippets):
+        response, body = self.export(api_client, self.url + "?output=ndjson")
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = body.splitlines()
+        assert [json.loads(line)['id'] for line in lines] == [snippet.id for snippet in snippets]
+
+    def test_resuming_export(self, api_client, snippets):
+        _, body = self.export(api_client, self.url + f"?output=ndjson&after_id={snippets[2].id}")
+        assert [json.loads(line)['id'] for line in body.splitlines()] == [snippets[3].id, snippets[4].id]
+
+    def test_filtered_export(self, api_client, snippets):
+        _, body = self.export(api_client, self.url + f"?tag={snippets[1].tag_id}")
+        assert [item['id'] for item in json.loads(body)] == [snippets[1].id, snippets[3].id]
+
+    def test_empty_export(self, api_client):
+        _, body = self.export(api_client, self.url)
+        assert json.loads(body) == []
+
+    def test_invalid_export_parameters(self, api_client):
+        assert api_client.get(self.url + "?output=csv").status_code == 400
+        assert api_client.get(self.url + "?after_id=last").status_code == 400
+        assert api_client.get(self.url, {'after_id': '²'}).status_code == 400
@@ -0,0 +1,82 @@
+import os
+import time
+import pytest
+from django.core.cache import caches
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+from snippetapp.renderers import dumps
+from snippetapp.serializers import SnippetSerializer, SnippetRowSerializer
+from snippetapp.viewsets.snippets import SnippetViewSet
+
+BENCHMARK_ROWS = [int(rows) for rows in os.environ.get('BENCHMARK_ROWS', '10000,100000').split(',')]
+
+
+@pytest.mark.django_db
+class TestFastSerializer:
+    """
+    Test cases for the values_list read path of snippets.
+    """
+
+    url = reverse("snippet-list")
+
+    @pytest.fixture
+    def snippets(self):
+        user = User.objects.create_user(username='üser_two', email='test1@email.com', password='test123')
+        tag = Tag.objects.create(title='Tag   ✓')
+        contents = ['Plain snippet.', 'Ünïcødé "quoted" \\ snippet', 'Line break\n\ttab', '😀 <b>&</b>', 'Separators \u2028 and \u2029']
+        return [Snippet.objects.create(tag=tag, content=content, owner=user) for content in contents]
+
+    def expected(self, snippets):
+        queryset = Snippet.objects.filter(id__in=[snippet.id for snippet in snippets]).order_by('-id')
+        return SnippetSerializer(queryset, many=True).data
+
+    def test_rows_match_serializer(self, snippets):
+        queryset = Snippet.objects.order_by('-id')
+        rows = SnippetRowSerializer.serialize(SnippetRowSerializer.rows(queryset))
+        assert dumps(rows) == JSONRenderer().render(self.expected(snippets))
+
+    def test_list_matches_serializer(self, api_client, snippets):
+        response = api_client.get(self.url)
+        assert response.status_code == 200
+        expected = JSONRenderer().render({'next': None, 'previous': None, 'data': self.expected(snippets)})
+        assert response.content == expected
+
+    def test_list_falls_back_to_serializer(self, api_client, snippets, monkeypatch):
+        fast = api_client.get(self.url).content
+        monkeypatch.setattr(SnippetViewSet, 'row_serializer_class', None)
+        caches['responses'].clear()
+        assert api_client.get(self.url).content == fast
+
+    def test_tag_detail_matches_serializer(self, api_client, snippets):
+        response = api_client.get(reverse("tag-detail", args=(snippets[0].tag_id,)))
+        assert response.status_code == 200
+        expected = JSONRenderer().render({'next': None, 'previous': None, 'data': self.expected(snippets)})
+        assert response.content == expected
+
+    def test_timestamp_microseconds(self, snippets):
+        row, = SnippetRowSerializer.serialize(SnippetRowSerializer.rows(Snippet.objects.filter(id=snippets[0].id)))
+        assert dumps(row) == JSONRenderer().render(SnippetSerializer(snippets[0]).data)
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize('rows', BENCHMARK_ROWS)
+    def test_throughput(self, snippets, rows):
+        user, tag = snippets[0].owner, snippets[0].tag
+        Snippet.objects.bulk_create(
+            [Snippet(tag=tag, content=f'Benchmark snippet {index}.', owner=user) for index in range(rows)],
+            batch_size=2000,
+        )
+        queryset = Snippet.objects.order_by('-id')
+
+        start = time.perf_counter()
+        JSONRenderer().render(SnippetSerializer(queryset.select_related('tag', 'owner'), many=True).data)
+        regular = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dumps(SnippetRowSerializer.serialize(SnippetRowSerializer.rows(queryset)))
+        fast = time.perf_counter() - start
+
+        print(f'{rows} rows: serializer {rows / regular:.0f} rows/s, fast path {rows / fast:.0f} rows/s')
+        assert fast < regular
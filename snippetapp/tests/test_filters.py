@@ -0,0 +1,85 @@
+import json
+import pytest
+from datetime import timedelta
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+from snippetapp.viewsets import SnippetViewSet, OverviewViewSet
+
+
+@pytest.mark.django_db
+class TestFilters:
+    """
+    Test cases for the owner, tag and updated_since snippet filters.
+    """
+
+    url = reverse("snippet-list")
+
+    @pytest.fixture
+    def snippets(self):
+        owners = [
+            User.objects.create_user(username='user_two', email='test1@email.com', password='test123'),
+            User.objects.create_user(username='user_three', email='test3@email.com', password='test123'),
+        ]
+        tags = [Tag.objects.create(title='First tag'), Tag.objects.create(title='Second tag')]
+        snippets = [
+            Snippet.objects.create(tag=tags[index % 2], content=f'Snippet {index}.', owner=owners[index // 2])
+            for index in range(4)
+        ]
+        Snippet.objects.filter(id=snippets[0].id).update(timestamp=timezone.now() - timedelta(days=2))
+        return snippets
+
+    def get_ids(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        json_data = json.loads(response.content.decode('utf-8'))
+        return [item['id'] for item in json_data['data']]
+
+    def test_filtering_by_owner(self, api_client, snippets):
+        ids = self.get_ids(api_client, self.url + f"?owner={snippets[0].owner_id}")
+        assert ids == [snippets[1].id, snippets[0].id]
+
+    def test_filtering_by_tag(self, api_client, snippets):
+        ids = self.get_ids(api_client, self.url + f"?tag={snippets[1].tag_id}")
+        assert ids == [snippets[3].id, snippets[1].id]
+
+    def test_filtering_by_updated_since(self, api_client, snippets):
+        since = (timezone.now() - timedelta(days=1)).isoformat().replace('+00:00', 'Z')
+        ids = self.get_ids(api_client, self.url + f"?updated_since={since}&page_size=2")
+        assert len(ids) == 2
+        assert snippets[0].id not in ids
+
+    def test_overview_count_follows_filters(self, api_client, snippets):
+        response = api_client.get(reverse("overview-list") + f"?tag={snippets[0].tag_id}")
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert json_data['count'] == 2
+        assert len(json_data['data']) == 2
+
+    def test_invalid_filters(self, api_client, snippets):
+        response = api_client.get(self.url + "?owner=me&updated_since=yesterday")
+        assert response.status_code == 400
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert set(json_data) == {'owner', 'updated_since'}
+
+    def test_non_ascii_digits_are_invalid(self, api_client, snippets):
+        response = api_client.get(self.url, {'tag': '²'})
+        assert response.status_code == 400
+        assert set(response.json()) == {'tag'}
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason="Asserts on SQLite query plans.")
+    @pytest.mark.parametrize('viewset', [SnippetViewSet, OverviewViewSet])
+    @pytest.mark.parametrize('query', ['owner=1', 'tag=1', 'updated_since=2022-01-01T00:00:00Z'])
+    def test_filters_use_an_index(self, viewset, query):
+        request = Request(APIRequestFactory().get(self.url + f"?{query}"))
+        view = viewset(request=request, action='list', format_kwarg=None, kwargs={})
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        queryset = queryset.order_by(*paginator.get_ordering(request, queryset, view))[:paginator.page_size]
+        plan = queryset.explain()
+        assert 'SEARCH snippetapp_snippet USING INDEX' in plan
+        assert 'SCAN snippetapp_snippet' not in plan
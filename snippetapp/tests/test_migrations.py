@@ -0,0 +1,16 @@
+from django.db.migrations.loader import MigrationLoader
+
+
+class TestMigrations:
+    """
+    Test cases for the shipped migrations.
+    """
+
+    def test_initial_matches_generated_schema(self):
+        # Databases set up with `makemigrations` already record 0001_initial
+        # and only run the later migrations, so models added since go there.
+        state = MigrationLoader(None, ignore_no_migrations=True).project_state(('snippetapp', '0001_initial'))
+        assert {name for app, name in state.models if app == 'snippetapp'} == {'tag', 'snippet'}
+        assert 'rowcount' in {
+            name for app, name in MigrationLoader(None).project_state().models if app == 'snippetapp'
+        }
@@ -0,0 +1,74 @@
+import json
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.urls import reverse
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+from snippetapp.pagination import SnippetCursorPagination
+
+
+@pytest.mark.django_db
+class TestPagination:
+    """
+    Test cases for cursor pagination on the snippet endpoints.
+    """
+
+    @pytest.fixture
+    def snippets(self):
+        user = User.objects.create_user(
+            username='user_two',
+            email='test1@email.com',
+            password='test123'
+        )
+        tag = Tag.objects.create(title="Paginated tag")
+        return [
+            Snippet.objects.create(tag=tag, content=f'Snippet {index}.', owner=user)
+            for index in range(5)
+        ]
+
+    def fetch_all(self, client, url):
+        ids, pages = [], 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            json_data = json.loads(response.content.decode('utf-8'))
+            ids.extend(item.get('id', item.get('url')) for item in json_data['data'])
+            url = json_data['next']
+            pages += 1
+        return ids, pages
+
+    def test_walking_snippet_pages(self, api_client, snippets):
+        ids, pages = self.fetch_all(api_client, reverse("snippet-list") + "?page_size=2")
+        assert ids == sorted((snippet.id for snippet in snippets), reverse=True)
+        assert pages == 3
+
+    def test_walking_tag_snippet_pages(self, api_client, snippets):
+        url = reverse("tag-detail", args=[snippets[0].tag_id]) + "?page_size=2"
+        ids, pages = self.fetch_all(api_client, url)
+        assert ids == sorted((snippet.id for snippet in snippets), reverse=True)
+        assert pages == 3
+
+    def test_overview_page(self, api_client, snippets):
+        response = api_client.get(reverse("overview-list") + "?page_size=2")
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert json_data['count'] == Snippet.objects.count()
+        assert len(json_data['data']) == 2
+        assert json_data['previous'] is None
+        assert json_data['next'] is not None
+
+    def test_cursor_is_stable_under_inserts(self, api_client, snippets):
+        url = reverse("snippet-list") + "?page_size=2"
+        first_page = json.loads(api_client.get(url).content.decode('utf-8'))
+        Snippet.objects.create(tag=snippets[0].tag, content='Newer snippet.', owner=snippets[0].owner)
+        second_page = json.loads(api_client.get(first_page['next']).content.decode('utf-8'))
+        assert [item['id'] for item in second_page['data']] == [snippets[2].id, snippets[1].id]
+
+    def test_page_size_upper_bound(self, api_client, snippets, monkeypatch):
+        monkeypatch.setattr(SnippetCursorPagination, 'max_page_size', 3)
+        response = api_client.get(reverse("snippet-list") + "?page_size=1000")
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert len(json_data['data']) == 3
+
+    def test_invalid_cursor(self, api_client, snippets):
+        response = api_client.get(reverse("snippet-list") + "?cursor=not-a-cursor")
+        assert response.status_code == 404
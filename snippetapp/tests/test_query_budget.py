@@ -0,0 +1,45 @@
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from server.tests.helpers import assert_list_budget
+from django.urls import reverse
+from authapp.models import User
+from snippetapp.models import Snippet, Tag
+
+# Authentication user lookup, the list query, the count (overview) or tag
+# lookup (tag detail) and the Last-Modified aggregate on a cache miss.
+QUERY_BUDGET = 4
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """
+    Test cases asserting list endpoints run a fixed number of queries.
+    """
+
+    @pytest.fixture
+    def seed(self):
+        user = User.objects.create_user(
+            username='user_budget',
+            email='budget@email.com',
+            password='test123'
+        )
+        tag = Tag.objects.create(title='Budget tag')
+
+        def create_snippets(count):
+            for index in range(count):
+                Snippet.objects.create(tag=tag, content=f'Budget snippet {index}.', owner=user)
+        create_snippets.tag = tag
+        return create_snippets
+
+    def test_snippet_list_budget(self, api_client, seed):
+        assert_list_budget(api_client, reverse("snippet-list"), seed, QUERY_BUDGET)
+
+    def test_overview_list_budget(self, api_client, seed):
+        assert_list_budget(api_client, reverse("overview-list"), seed, QUERY_BUDGET)
+
+    def test_tag_list_budget(self, api_client, seed):
+        assert_list_budget(api_client, reverse("tag-list"), seed, QUERY_BUDGET)
+
+    def test_tag_detail_budget(self, api_client, seed):
+        url = reverse("tag-detail", args=[seed.tag.id])
+        assert_list_budget(api_client, url, seed, QUERY_BUDGET)
@@ -0,0 +1,125 @@
+import os
+import time
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.urls import reverse
+from authapp.models import User
+from snippetapp.bulk import bulk_delete
+from snippetapp.models import Snippet, Tag
+from snippetapp.search import match_expression, parse_query, search_snippets
+
+SEARCH_BENCHMARK_ROWS = int(os.environ.get('SEARCH_BENCHMARK_ROWS', '1000000'))
+
+
+@pytest.mark.django_db
+class TestSearch:
+    """
+    Test cases for the snippet search endpoint.
+    """
+
+    url = reverse("snippet-search")
+
+    @pytest.fixture
+    def snippets(self):
+        users = [
+            User.objects.create_user(username='user_two', email='test1@email.com', password='test123'),
+            User.objects.create_user(username='user_three', email='test2@email.com', password='test123'),
+        ]
+        tags = [Tag.objects.create(title='Python'), Tag.objects.create(title='Rust')]
+        contents = [
+            'Read a file line by line.',
+            'Reverse a list in place.',
+            'Read a file, then read it again; read it once more.',
+            'Parse a date string.',
+        ]
+        return [
+            Snippet.objects.create(tag=tags[index % 2], content=content, owner=users[index // 2])
+            for index, content in enumerate(contents)
+        ]
+
+    def search(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_search_ranks_matches(self, api_client, snippets):
+        json_data = self.search(api_client, q='read')
+        assert [item['id'] for item in json_data['data']] == [snippets[2].id, snippets[0].id]
+        assert json_data['next'] is None
+
+    def test_search_requires_every_term(self, api_client, snippets):
+        json_data = self.search(api_client, q='read line')
+        assert [item['id'] for item in json_data['data']] == [snippets[0].id]
+
+    def test_search_prefix(self, api_client, snippets):
+        json_data = self.search(api_client, q='rev*')
+        assert [item['id'] for item in json_data['data']] == [snippets[1].id]
+        assert self.search(api_client, q='rev')['data'] == []
+
+    def test_search_filters(self, api_client, snippets):
+        json_data = self.search(api_client, q='read', tag=snippets[0].tag_id, owner=snippets[0].owner_id)
+        assert [item['id'] for item in json_data['data']] == [snippets[0].id]
+        assert json_data['data'][0]['tag'] == 'Python'
+
+    def test_search_pagination(self, api_client, snippets):
+        json_data = self.search(api_client, q='a', limit=1)
+        assert len(json_data['data']) == 1
+        assert json_data['previous'] is None
+        seen = [item['id'] for item in json_data['data']]
+        while json_data['next']:
+            response = api_client.get(json_data['next'])
+            json_data = response.json()
+            seen += [item['id'] for item in json_data['data']]
+        assert sorted(seen) == sorted(snippet.id for snippet in snippets)
+
+    def test_search_follows_writes(self, api_client, snippets):
+        snippets[3].content = 'Format a date string.'
+        snippets[3].save()
+        assert self.search(api_client, q='parse')['data'] == []
+        assert [item['id'] for item in self.search(api_client, q='format')['data']] == [snippets[3].id]
+        bulk_delete(Snippet.objects.filter(id=snippets[3].id))
+        assert self.search(api_client, q='format')['data'] == []
+
+    def test_search_quotes_syntax(self, api_client, snippets):
+        assert self.search(api_client, q='read OR "NEAR(')['data'] == []
+
+    def test_search_requires_query(self, api_client, snippets):
+        response = api_client.get(self.url, {'q': ' * '})
+        assert response.status_code == 400
+        assert 'q' in response.json()
+
+    def test_parse_query(self):
+        terms = parse_query('say "hi"  pre* *')
+        assert terms == [('say', False), ('"hi"', False), ('pre', True)]
+        assert match_expression(terms) == '"say" """hi""" "pre"*'
+
+    def test_search_recent(self, api_client, snippets):
+        json_data = self.search(api_client, q='read', order='recent')
+        assert [item['id'] for item in json_data['data']] == [snippets[2].id, snippets[0].id]
+        response = api_client.get(self.url, {'q': 'read', 'order': 'oldest'})
+        assert response.status_code == 400
+
+    @pytest.mark.benchmark
+    def test_search_latency(self, snippets):
+        user, tag = snippets[0].owner, snippets[0].tag
+        words = ('alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel')
+        for start in range(0, SEARCH_BENCHMARK_ROWS, 10000):
+            Snippet.objects.bulk_create([
+                Snippet(tag=tag, owner=user, content=f'{words[index % 8]} {words[index % 7]}{index % 1000} note{index}')
+                for index in range(start, min(start + 10000, SEARCH_BENCHMARK_ROWS))
+            ])
+        # Selective terms ranked, and terms matching an eighth of the table newest first.
+        queries = [
+            ('bravo104', 'rank'), ('note4242*', 'rank'), ('charlie5 golf', 'rank'),
+            ('hotel', 'recent'), ('delta', 'recent'),
+        ]
+        timings = []
+        for query, order in queries:
+            queryset = search_snippets(Snippet.objects.filter(owner=user), parse_query(query), order)
+            start = time.perf_counter()
+            list(queryset.values_list('id', 'tag__title', 'content', 'timestamp', 'owner__username')[:100])
+            timings.append(time.perf_counter() - start)
+        print(f'{SEARCH_BENCHMARK_ROWS} rows: ' + ', '.join(
+            f'{query} ({order}) {timing * 1000:.1f}ms' for (query, order), timing in zip(queries, timings)
+        ))
+        assert max(timings) < 0.01
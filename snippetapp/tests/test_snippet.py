@@ -84,9 +84,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_two'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_two'
 
 
     @pytest.mark.skipif(
@@ -135,9 +135,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_two'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_two'
         data = {
             "tag": {
                 "title": "Test updated tag"
@@ -177,9 +177,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_two'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_two'
         data = {
             "content": "Test snippet updation."
         }
@@ -213,9 +213,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_two'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_two'
         data = {
             "tag": {
                 "title": "Test updated tag"
@@ -255,9 +255,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_three'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_three'
 
         data = {
             "content": "Test snippet patching."
@@ -295,9 +295,9 @@ class TestSnippets:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['tag'] == 'Test created tag'
-        assert json_data[0]['content'] == 'Test snippet creation.'
-        assert json_data[0]['owner'] == 'user_three'
+        assert json_data['data'][0]['tag'] == 'Test created tag'
+        assert json_data['data'][0]['content'] == 'Test snippet creation.'
+        assert json_data['data'][0]['owner'] == 'user_three'
 
         data = {
             "content": "Test snippet patching."
@@ -336,7 +336,7 @@ class TestSnippets:
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
         snippet_count = Snippet.objects.count()
-        assert len(json_data) == snippet_count
+        assert len(json_data['data']) == snippet_count
 
         # get the details of the snippet to be deleted
         detail_response = api_client.get(self.url + f"/{getattr(new_snippet, 'id')}")
@@ -348,10 +348,8 @@ class TestSnippets:
         assert json_data['owner'] == 'user_three'
 
         delete_response = api_client.delete(self.url+f"/{getattr(new_snippet, 'id')}")
-        assert delete_response.status_code == 200
-        list_of_items = delete_response.content.decode('utf-8')
-        json_data = json.loads(list_of_items)
-        assert len(json_data) == snippet_count - 1
+        assert delete_response.status_code == 204
+        assert delete_response.content == b''
 
         # get the details for the deleted snippets
         detail_response = api_client.get(self.url + f"/{getattr(new_snippet, 'id')}")
@@ -438,3 +436,143 @@ class TestSnippets:
         assert delete_json_data['detail'] == "Authorization header must contain two space-delimited values"
         assert delete_json_data['code'] == "bad_authorization_header"
 
+
+    @pytest.mark.skipif(
+        "TestSnippets.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_deleting_snippet_with_delta(self, api_client):
+        user = User.objects.create_user(
+            username='user_three',
+            email='test3@email.com',
+            password='test123'
+        )
+        new_tag = Tag.objects.create(title="Test created tag")
+        snippets = [
+            Snippet.objects.create(tag=new_tag, content=f'Test snippet {index}.', owner=user)
+            for index in range(3)
+        ]
+
+        delete_response = api_client.delete(self.url + f"/{getattr(snippets[0], 'id')}?delta=id")
+        assert delete_response.status_code == 200
+        json_data = json.loads(delete_response.content.decode('utf-8'))
+        assert json_data == {'deleted': [snippets[0].id]}
+
+        delete_response = api_client.delete(self.url + f"/{getattr(snippets[1], 'id')}?delta=page&page_size=1")
+        assert delete_response.status_code == 200
+        json_data = json.loads(delete_response.content.decode('utf-8'))
+        assert json_data['deleted'] == [snippets[1].id]
+        assert [item['id'] for item in json_data['data']] == [snippets[2].id]
+
+        delete_response = api_client.delete(self.url + f"/{getattr(snippets[2], 'id')}?delta=all")
+        assert delete_response.status_code == 400
+        assert Snippet.objects.filter(id=snippets[2].id).exists()
+
+    @pytest.mark.skipif(
+        "TestSnippets.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_bulk_deleting_snippets(self, api_client, django_assert_max_num_queries):
+        user = User.objects.create_user(
+            username='user_three',
+            email='test3@email.com',
+            password='test123'
+        )
+        new_tag = Tag.objects.create(title="Test created tag")
+        snippets = [
+            Snippet.objects.create(tag=new_tag, content=f'Test snippet {index}.', owner=user)
+            for index in range(20)
+        ]
+        ids = [snippet.id for snippet in snippets[:15]]
+
+        # authentication, grouped count, delete and one update per counted scope
+        with django_assert_max_num_queries(8):
+            response = api_client.post(self.url + "/bulk-delete", {"ids": ids}, format='json')
+        assert response.status_code == 200
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert json_data['deleted'] == 15
+        assert not Snippet.objects.filter(id__in=ids).exists()
+
+        overview_response = api_client.get(reverse("overview-list"))
+        json_data = json.loads(overview_response.content.decode('utf-8'))
+        assert json_data['count'] == Snippet.objects.count()
+
+        response = api_client.post(self.url + "/bulk-delete", {"ids": []}, format='json')
+        assert response.status_code == 400
+
+    @pytest.mark.skipif(
+        "TestSnippets.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_bulk_saving_snippets(self, api_client, django_assert_max_num_queries):
+        user = User.objects.create_user(
+            username='user_three',
+            email='test3@email.com',
+            password='test123'
+        )
+        existing_tag = Tag.objects.create(title="Test created tag")
+        existing_snippet = Snippet.objects.create(tag=existing_tag, content='Test snippet.', owner=user)
+        snippets = [
+            {"tag": {"title": f"Bulk tag {index % 5}"}, "content": f"Bulk snippet {index}."}
+            for index in range(20)
+        ]
+        response = api_client.post(self.url + "/bulk", {"snippets": snippets}, format='json')
+        assert response.status_code == 200
+
+        snippets = snippets * 10
+        snippets.append({"tag": {"title": "Test created tag"}, "content": "Bulk snippet on existing tag."})
+        snippets.append({"id": existing_snippet.id, "tag": {"title": "Bulk tag 0"}, "content": "Bulk update."})
+        snippets.append({"content": "Missing tag."})
+        snippets.append({"id": 10 ** 9, "tag": {"title": "Bulk tag 0"}, "content": "Unknown snippet."})
+        snippets.append({"id": str(existing_snippet.id), "tag": {"title": "Bulk tag 1"}, "content": "Updated twice."})
+
+        # the query count depends on the distinct tags and owners, not on the number of snippets
+        with django_assert_max_num_queries(16):
+            response = api_client.post(self.url + "/bulk", {"snippets": snippets}, format='json')
+        assert response.status_code == 200
+        json_data = json.loads(response.content.decode('utf-8'))
+        assert json_data['created'] == 201
+        assert json_data['updated'] == 1
+        assert [error['index'] for error in json_data['errors']] == [202, 203, 204]
+        assert json_data['errors'][0]['errors'] == {'tag': ['This field is required.']}
+        assert json_data['errors'][1]['errors'] == {'id': ['Not found.']}
+        # An id sent as a string is the same snippet.
+        assert json_data['errors'][2]['errors'] == {'id': ['Duplicate id.']}
+
+        assert Tag.objects.filter(title__startswith="Bulk tag").count() == 5
+        assert Snippet.objects.filter(tag__title="Bulk tag 0").count() == 45
+        existing_snippet.refresh_from_db()
+        assert existing_snippet.content == 'Bulk update.'
+        assert existing_snippet.owner.username == 'user_one'
+
+        overview_response = api_client.get(reverse("overview-list"))
+        json_data = json.loads(overview_response.content.decode('utf-8'))
+        assert json_data['count'] == Snippet.objects.count()
+
+        update = {"id": str(existing_snippet.id), "tag": {"title": "Bulk tag 1"}, "content": "Updated by string id."}
+        response = api_client.post(self.url + "/bulk", {"snippets": [update]}, format='json')
+        assert response.status_code == 200
+        assert json.loads(response.content.decode('utf-8'))['updated'] == 1
+        existing_snippet.refresh_from_db()
+        assert existing_snippet.content == 'Updated by string id.'
+
+        response = api_client.post(self.url + "/bulk", {"snippets": [{"content": "Missing tag."}]}, format='json')
+        assert response.status_code == 400
+
+    @pytest.mark.skipif(
+        "TestSnippets.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_create_snippet_with_existing_tag(self, api_client):
+        existing_tag = Tag.objects.create(title="Snippet test tag")
+        data = {
+            "tag": {
+                "title": "Snippet test tag"
+            },
+            "content": "This is content for the snippet test tag."
+        }
+
+        response = api_client.post(self.url, data, format='json')
+        assert response.status_code == 201
+        assert Tag.objects.filter(title="Snippet test tag").count() == 1
+        assert Snippet.objects.get(content=data['content']).tag_id == existing_tag.id
@@ -1,7 +1,8 @@
 import json
 import pytest
 from server.tests.conftest import api_client, django_db_setup  # noqa
-from django.db import DatabaseError, ProgrammingError
+from django.db import DatabaseError, IntegrityError, ProgrammingError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from snippetapp.models import Tag
@@ -55,7 +56,7 @@ class TestTags:
         assert response.status_code == 200
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
-        assert json_data[0]['title'] == 'Test created tag'
+        assert json_data['data'][0]['title'] == 'Test created tag'
 
     @pytest.mark.skipif(
         "TestTags.skip_all",
@@ -88,3 +89,29 @@ class TestTags:
         res = response.content.decode('utf-8')
         json_data = json.loads(res)
         assert json_data['detail'] == 'Method "DELETE" not allowed.'
+
+    @pytest.mark.skipif(
+        "TestTags.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_tag_title_is_unique(self):
+        Tag.objects.create(title="Test created tag")
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                Tag.objects.create(title="Test created tag")
+
+    @pytest.mark.skipif(
+        "TestTags.skip_all",
+        reason="Model declaration error.",
+    )
+    def test_fetching_tag_snippets_by_id(self, api_client):
+        new_tag = Tag.objects.create(title="Test created tag")
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(self.url + f"/{getattr(new_tag, 'id')}")
+        assert response.status_code == 200
+        snippet_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT "snippetapp_snippet"."id"')
+        ]
+        assert len(snippet_queries) == 1
+        assert f'WHERE "snippetapp_snippet"."tag_id" = {new_tag.id}' in snippet_queries[0]
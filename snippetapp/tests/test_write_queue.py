@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from server.tests.conftest import api_client, django_db_setup  # noqa
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from snippetapp import write_queue as write_queue_module
+from snippetapp.counts import count_rows
+from snippetapp.models import Snippet, Tag
+from snippetapp.write_queue import WriteQueue
+
+BENCHMARK_WRITES = os.environ.get('BENCHMARK_WRITES', '1600')
+
+
+class SharedConnectionWriteQueue(WriteQueue):
+    """
+    Writer thread on the test's connection, so its writes land in the test
+    transaction. Batches are recorded.
+    """
+
+    def __init__(self, shared):
+        super().__init__()
+        self.shared = shared
+        self.batches = []
+
+    def run(self):
+        connections['default'] = self.shared
+        super().run()
+
+    def run_batch(self, batch):
+        self.batches.append(len(batch))
+        super().run_batch(batch)
+
+    def recycle_connection(self):
+        # The test transaction keeps the connection out of autocommit.
+        pass
+
+
+@pytest.fixture
+def write_queue(monkeypatch):
+    shared = connections['default']
+    shared.inc_thread_sharing()
+    write_queue = SharedConnectionWriteQueue(shared)
+    monkeypatch.setattr(write_queue_module, 'write_queue', write_queue)
+    with override_settings(SQLITE_WRITE_QUEUE=True):
+        yield write_queue
+    write_queue.stop()
+    shared.dec_thread_sharing()
+
+
+@pytest.mark.django_db
+class TestWriteQueue:
+    """
+    Test cases for the single-writer queue.
+    """
+
+    def test_concurrent_writes_grouped(self, write_queue):
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait()
+
+        threads = [threading.Thread(target=write_queue.submit, args=(blocker,))]
+        threads[0].start()
+        started.wait()
+        for index in range(5):
+            threads.append(threading.Thread(
+                target=write_queue.submit, args=(lambda index=index: Tag.objects.create(title=f'Queued {index}'),),
+            ))
+            threads[-1].start()
+        while write_queue.jobs.qsize() < 5:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert write_queue.batches == [1, 5]
+        assert Tag.objects.filter(title__startswith='Queued').count() == 5
+
+    def test_failed_job_isolated(self, write_queue):
+        def fail():
+            Tag.objects.create(title='Rolled back')
+            raise ValueError('Job failed.')
+
+        assert write_queue.submit(lambda: Tag.objects.create(title='Kept')).title == 'Kept'
+        with pytest.raises(ValueError):
+            write_queue.submit(fail)
+        assert Tag.objects.filter(title='Kept').exists()
+        assert not Tag.objects.filter(title='Rolled back').exists()
+
+    def test_snippet_writes_queued(self, api_client, write_queue):
+        url = reverse("snippet-list")
+        data = {"tag": {"title": "Queue tag"}, "content": "Written by the queue."}
+        response = api_client.post(url, data, format='json')
+        assert response.status_code == 201
+        snippet = Snippet.objects.get(id=response.json()['id'])
+        assert count_rows(Snippet.objects.filter(tag=snippet.tag), tag=snippet.tag_id) == 1
+        assert api_client.delete(reverse("snippet-detail", args=(snippet.id,))).status_code == 204
+        assert write_queue.batches == [1, 1]
+        assert not Snippet.objects.filter(id=snippet.id).exists()
+
+
+@pytest.mark.django_db
+class TestPragmas:
+
+    @override_settings(SQLITE_PRAGMAS=settings.SQLITE_PROFILES['performance'])
+    def test_pragmas_applied(self):
+        new_connection = connections.create_connection('default')
+        try:
+            with new_connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                assert cursor.fetchone() == ('wal',)
+                cursor.execute('PRAGMA busy_timeout')
+                assert cursor.fetchone() == (5000,)
+        finally:
+            new_connection.close()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('profile', ['default', 'performance'])
+def test_write_throughput(tmp_path, profile):
+    result = subprocess.run(
+        [sys.executable, '-m', 'snippetapp.tests.sqlite_write_benchmark', str(tmp_path / 'db.sqlite3'), BENCHMARK_WRITES],
+        env={**os.environ, 'SQLITE_PROFILE': profile}, capture_output=True, text=True, check=True,
+    )
+    runs = [json.loads(line) for line in result.stdout.splitlines()]
+    for run in runs:
+        print(run)
+    queued = {run['writers']: run for run in runs if run['queued']}
+    direct = {run['writers']: run for run in runs if not run['queued']}
+    assert all(run['errors'] == 0 for run in queued.values())
+    assert queued[16]['writes_per_second'] > direct[16]['writes_per_second']
@@ -4,6 +4,7 @@ from snippetapp.viewsets import (
     SnippetViewSet,
     OverviewViewSet,
 )
+from snippetapp.viewsets import async_views
 from django.urls import path, include
 
 
@@ -14,5 +15,11 @@ router.register("overview", OverviewViewSet, 'overview')
 
 
 urlpatterns = [
+    # Read endpoints for ASGI deployments, answering like their sync twins.
+    path('async/snippet', async_views.snippet_list, name='async-snippet-list'),
+    path('async/snippet/<int:pk>', async_views.snippet_detail, name='async-snippet-detail'),
+    path('async/tag', async_views.tag_list, name='async-tag-list'),
+    path('async/tag/<int:pk>', async_views.tag_detail, name='async-tag-detail'),
+    path('async/overview', async_views.overview_list, name='async-overview-list'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,41 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from snippetapp.viewsets.snippets import TagViewSet, SnippetViewSet, OverviewViewSet
+
+# Threads the async views run viewsets on. Under ASGI Django runs every sync
+# view on one shared thread; these run side by side, and a request waiting
+# for a thread holds no thread.
+executor = ThreadPoolExecutor(settings.ASYNC_VIEW_THREADS, thread_name_prefix='async-views')
+
+
+def offloaded(view):
+    """
+    Async view running the sync `view` on `executor`. The response is
+    rendered there too, and the thread's database connection is released as
+    at the end of a sync request.
+    """
+    def handle(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(handle, request, *args, **kwargs))
+    return async_view
+
+
+snippet_list = offloaded(SnippetViewSet.as_view({'get': 'list'}))
+snippet_detail = offloaded(SnippetViewSet.as_view({'get': 'retrieve'}))
+tag_list = offloaded(TagViewSet.as_view({'get': 'list'}))
+tag_detail = offloaded(TagViewSet.as_view({'get': 'retrieve'}))
+overview_list = offloaded(OverviewViewSet.as_view({'get': 'list'}))
@@ -0,0 +1,18 @@
+from snippetapp.renderers import FastJSONRenderer
+
+
+class FastReadMixin:
+    """
+    Serve reads through `row_serializer_class`, which renders `values_list`
+    rows instead of model instances, and FastJSONRenderer. Viewsets set
+    `row_serializer_class = None` to read through their regular serializer.
+    """
+    row_serializer_class = None
+    renderer_classes = (FastJSONRenderer,)
+
+    def list_rows(self, queryset):
+        """
+        Paginated response of `queryset` serialized from rows.
+        """
+        page = self.paginate_queryset(self.row_serializer_class.rows(queryset))
+        return self.get_paginated_response(self.row_serializer_class.serialize(page))
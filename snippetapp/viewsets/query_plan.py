@@ -0,0 +1,25 @@
+def plan_queryset(queryset, select_related=(), only=()):
+    """
+    Apply a viewset's declared relation needs to a queryset so the serializer
+    can read every field it emits without issuing per-row queries.
+    """
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if only:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class QueryPlanMixin:
+    """
+    Viewsets declare the relations their serializer walks (`select_related_fields`)
+    and the columns it reads (`only_fields`); `get_queryset` applies both.
+    """
+    select_related_fields = ()
+    only_fields = ()
+
+    def get_queryset(self):
+        return self.plan(super().get_queryset())
+
+    def plan(self, queryset):
+        return plan_queryset(queryset, self.select_related_fields, self.only_fields)
@@ -0,0 +1,24 @@
+from rest_framework.permissions import SAFE_METHODS
+from server.routers import choose_replica, pin_primary, restore_reads, route_reads
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a read replica (DATABASE_REPLICAS). A successful
+    write pins its user to the primary for DATABASE_REPLICA_LAG seconds, so
+    users always read their own writes.
+    """
+    read_routing = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.read_routing = route_reads(choose_replica(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.read_routing is not None:
+            restore_reads(self.read_routing)
+            self.read_routing = None
+        elif request.method not in SAFE_METHODS and request.user.is_authenticated and response.status_code < 400:
+            pin_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
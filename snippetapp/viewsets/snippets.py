@@ -7,57 +7,288 @@ from snippetapp.serializers import (
     TagSerializer,
     SnippetSerializer,
     OverviewSerializer,
+    SnippetBatchItemSerializer,
+    SnippetBatchSerializer,
+    BulkDeleteSerializer,
+    SnippetRowSerializer,
 )
+from snippetapp.viewsets.query_plan import QueryPlanMixin, plan_queryset
+from snippetapp.viewsets.fast_read import FastReadMixin
+from snippetapp.viewsets.replicas import ReplicaReadMixin
+from snippetapp.pagination import SnippetCursorPagination, SnippetSearchPagination
+from snippetapp.filters import SnippetFilterBackend
+from snippetapp.caching import (
+    ALL_SNIPPETS,
+    ALL_TAGS,
+    TAG_TITLES,
+    USERNAMES,
+    cached_response,
+    owner_scope,
+    tag_scope,
+)
+from snippetapp.counts import count_rows
+from snippetapp.bulk import bulk_delete, bulk_save_snippets
+from snippetapp.write_queue import write
+from snippetapp.export import CONTENT_TYPES, STREAMS, export_rows
+from snippetapp.search import SEARCH_ORDERS, parse_query, search_snippets
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db.models import Max
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
 from rest_framework.permissions import IsAuthenticated
 
+# Relations and columns read by SnippetSerializer.to_representation.
+SNIPPET_SELECT_RELATED = ('tag', 'owner')
+SNIPPET_ONLY = ('id', 'content', 'timestamp', 'tag__title', 'owner__username')
+
+
+class SnippetListCacheMixin:
+    """
+    Cache scopes, Last-Modified and list state for snippet lists filtered by
+    SnippetFilterBackend.
+    """
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        filters = SnippetFilterBackend.get_filters(request)
+        if 'owner' in filters:
+            return {owner_scope(filters['owner']), TAG_TITLES}
+        if 'tag' in filters:
+            return {tag_scope(filters['tag']), USERNAMES}
+        return {ALL_SNIPPETS}
+
+    def get_last_modified(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(Snippet.objects.all())
+        return queryset.aggregate(Max('timestamp'))['timestamp__max']
+
+    def get_list_queryset(self, request):
+        return self.filter_queryset(Snippet.objects.all())
 
-class TagViewSet(ModelViewSet):
+    def get_list_state(self, request, *args, **kwargs):
+        """
+        The latest timestamp of the page the request returns, and the ids,
+        timestamps and links of that page. They are read as (id, timestamp)
+        pairs through the paginator, so the query walks the index for at most
+        a page and a row whatever the size of the list. Rows added, deleted
+        or moved on the page change them, even when the writes bypassed the
+        model signals; edits that keep the timestamp do not.
+        """
+        paginator = self.paginator
+        rows = paginator.paginate_queryset(self.get_list_queryset(request).values('id', 'timestamp'), request, view=self)
+        page = [(row['id'], row['timestamp']) for row in rows]
+        last_modified = max((timestamp for _, timestamp in page), default=None)
+        return last_modified, (page, paginator.get_next_link(), paginator.get_previous_link())
+
+
+class TagViewSet(ReplicaReadMixin, FastReadMixin, QueryPlanMixin, ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    row_serializer_class = SnippetRowSerializer
     http_method_names = ('get',)
     permission_classes = (IsAuthenticated,)
+    pagination_class = SnippetCursorPagination
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        if self.action == 'retrieve':
+            return {tag_scope(kwargs['pk']), USERNAMES}
+        return {ALL_TAGS}
+
+    def get_last_modified(self, request, *args, **kwargs):
+        if self.action == 'retrieve':
+            snippets = Snippet.objects.filter(tag_id=kwargs['pk'])
+            return snippets.aggregate(Max('timestamp'))['timestamp__max']
+        return None
+
+    @cached_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
+    @cached_response
     def retrieve(self, request, *args, **kwargs):
-        print(self.request.user)
         instance = self.get_object()
-        snippets = Snippet.objects.filter(tag__title=instance)
-        serializer = SnippetSerializer(snippets, many=True)
-        return Response(serializer.data)
+        if self.row_serializer_class is not None:
+            return self.list_rows(Snippet.objects.filter(tag_id=instance.id))
+        snippets = plan_queryset(
+            Snippet.objects.filter(tag_id=instance.id),
+            SNIPPET_SELECT_RELATED,
+            SNIPPET_ONLY,
+        )
+        page = self.paginate_queryset(snippets)
+        serializer = SnippetSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class SnippetViewSet(ModelViewSet):
+class SnippetViewSet(
+    ReplicaReadMixin, SnippetListCacheMixin, FastReadMixin, QueryPlanMixin, ModelViewSet,
+):
     queryset = Snippet.objects.all()
     serializer_class = SnippetSerializer
+    row_serializer_class = SnippetRowSerializer
     http_method_names = ('get', 'post', 'put', 'patch', 'delete')
     permission_classes = (IsAuthenticated,)
+    pagination_class = SnippetCursorPagination
+    filter_backends = (SnippetFilterBackend,)
+    select_related_fields = SNIPPET_SELECT_RELATED
+    only_fields = SNIPPET_ONLY
+
+    @cached_response
+    def list(self, request, *args, **kwargs):
+        if self.row_serializer_class is not None:
+            return self.list_rows(self.filter_queryset(Snippet.objects.all()))
+        return super().list(request, *args, **kwargs)
+
+    def get_list_queryset(self, request):
+        if self.action != 'search':
+            return super().get_list_queryset(request)
+        terms = parse_query(request.query_params.get('q', ''))
+        if not terms:
+            raise ValidationError({"q": "Expected a search query."})
+        order = request.query_params.get('order', 'rank')
+        if order not in SEARCH_ORDERS:
+            raise ValidationError({"order": "Expected 'rank' or 'recent'."})
+        return search_snippets(self.filter_queryset(Snippet.objects.all()), terms, order)
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        write(lambda: serializer.save(owner=self.request.user))
 
     def perform_update(self, serializer):
-        serializer.save(owner=self.request.user)
+        write(lambda: serializer.save(owner=self.request.user))
+
+    def perform_destroy(self, instance):
+        write(instance.delete)
 
     def destroy(self, request, *args, **kwargs):
+        """
+        Delete one snippet. Responds 204 unless `?delta=id` (the deleted id)
+        or `?delta=page` (the deleted id plus one cursor page) is requested.
+        """
+        delta = request.query_params.get('delta')
+        if delta not in (None, 'id', 'page'):
+            raise ValidationError({"delta": "Expected 'id' or 'page'."})
         instance = self.get_object()
+        deleted_id = instance.id
         self.perform_destroy(instance)
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=HTTP_200_OK)
+        if delta is None:
+            return Response(status=HTTP_204_NO_CONTENT)
+        res = dict()
+        res['deleted'] = [deleted_id]
+        if delta == 'page':
+            page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+            serializer = self.get_serializer(page, many=True)
+            res.update(self.paginator.get_paginated_data(serializer.data))
+        return Response(res, status=HTTP_200_OK)
 
+    @action(detail=False, pagination_class=SnippetSearchPagination)
+    @cached_response
+    def search(self, request, *args, **kwargs):
+        """
+        Snippets whose content matches every term of `q`, best match first,
+        or newest first with `?order=recent`. A term ending in `*` matches as
+        a prefix. Accepts the list filters and `?limit=` / `?offset=`.
+        """
+        queryset = self.get_list_queryset(request)
+        if self.row_serializer_class is not None:
+            return self.list_rows(queryset)
+        page = self.paginate_queryset(self.plan(queryset))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-class OverviewViewSet(ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create snippets, or update them when an entry carries an `id`, in one
+        transaction. Invalid entries are reported by index and skipped.
+        """
+        serializer = SnippetBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        valid, errors = [], []
+        for index, item in enumerate(serializer.validated_data['snippets']):
+            item_serializer = SnippetBatchItemSerializer(data=item)
+            if item_serializer.is_valid():
+                valid.append((index, item_serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': item_serializer.errors})
+        # Validated ids are ints, whether they were sent as numbers or strings.
+        instances = Snippet.objects.only('id', 'tag_id', 'owner_id').in_bulk(
+            [data['id'] for _, data in valid if 'id' in data]
+        )
+        creates, updates, seen = [], [], set()
+        for index, data in valid:
+            snippet_id = data.pop('id', None)
+            if snippet_id is None:
+                creates.append(data)
+            elif snippet_id in seen:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate id.']}})
+            elif snippet_id not in instances:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+            else:
+                seen.add(snippet_id)
+                updates.append((instances[snippet_id], data))
+        if creates or updates:
+            write(lambda: bulk_save_snippets(creates, updates, request.user))
+        errors.sort(key=lambda error: error['index'])
+        res = dict()
+        res['created'] = len(creates)
+        res['updated'] = len(updates)
+        res['errors'] = errors
+        return Response(res, status=HTTP_200_OK if creates or updates else HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request, *args, **kwargs):
+        """
+        Delete the snippets listed in `ids` in one transaction and statement.
+        """
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        deleted = write(lambda: bulk_delete(Snippet.objects.filter(id__in=ids)))
+        return Response({'deleted': deleted}, status=HTTP_200_OK)
+
+
+class OverviewViewSet(ReplicaReadMixin, SnippetListCacheMixin, QueryPlanMixin, ModelViewSet):
     queryset = Snippet.objects.all()
     serializer_class = OverviewSerializer
     http_method_names = ('get',)
     permission_classes = (IsAuthenticated,)
+    pagination_class = SnippetCursorPagination
+    filter_backends = (SnippetFilterBackend,)
+    # The hyperlinked `tag` field only needs `tag_id`, so no join on tag.
+    select_related_fields = ('owner',)
+    only_fields = ('id', 'content', 'timestamp', 'tag_id', 'owner__username')
+
+    def get_list_state(self, request, *args, **kwargs):
+        # The response also carries the maintained count of the list.
+        last_modified, state = super().get_list_state(request, *args, **kwargs)
+        count = count_rows(self.get_list_queryset(request), **SnippetFilterBackend.get_filters(request))
+        return last_modified, (state, count)
 
+    @cached_response
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
         res = dict()
-        res['count'] = len(queryset)
-        res['data'] = data
+        res['count'] = count_rows(queryset, **SnippetFilterBackend.get_filters(request))
+        res.update(self.paginator.get_paginated_data(serializer.data))
         return Response(res)
+
+    @action(detail=False)
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every snippet matching the filters in ascending id order, as a
+        JSON array or, with `?output=ndjson`, newline-delimited JSON. Pass the
+        last id received as `after_id` to resume an interrupted export.
+        """
+        output = request.query_params.get('output', 'json')
+        if output not in STREAMS:
+            raise ValidationError({"output": "Expected 'json' or 'ndjson'."})
+        after_id = request.query_params.get('after_id', '0')
+        if not (after_id.isascii() and after_id.isdigit()):
+            raise ValidationError({"after_id": "Expected an id."})
+        queryset = self.filter_queryset(Snippet.objects.filter(id__gt=int(after_id)))
+        # The rows are read after the view returns: keep this request's database.
+        queryset = queryset.using(queryset.db)
+        rows = export_rows(queryset, settings.EXPORT_CHUNK_SIZE)
+        return StreamingHttpResponse(STREAMS[output](rows), content_type=CONTENT_TYPES[output])
@@ -0,0 +1,109 @@
+import queue
+import threading
+from concurrent.futures import Future
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+class WriteQueue:
+    """
+    A single writer thread running the write jobs of concurrent requests.
+    Jobs waiting when the writer is free run together in one transaction,
+    each in its own savepoint, so SQLite commits (and syncs) once per group
+    and requests no longer contend for its write lock.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, job):
+        """
+        Run `job` in the writer thread, returning its result or raising its
+        exception once its group has committed.
+        """
+        future = Future()
+        self.jobs.put((job, future))
+        self.start()
+        return future.result()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='write-queue', daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        self.jobs.put(None)
+        self.thread.join()
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return
+            self.run_batch(batch)
+            self.recycle_connection()
+
+    def recycle_connection(self):
+        # Honour CONN_MAX_AGE and drop broken connections, as requests do.
+        connections[self.using].close_if_unusable_or_obsolete()
+
+    def next_batch(self):
+        """
+        The next job and those queued behind it, up to SQLITE_WRITE_QUEUE_BATCH,
+        waiting up to SQLITE_WRITE_QUEUE_WAIT seconds for each further job.
+        None stops the writer.
+        """
+        item = self.jobs.get()
+        if item is None:
+            return None
+        batch = [item]
+        wait = settings.SQLITE_WRITE_QUEUE_WAIT
+        while len(batch) < settings.SQLITE_WRITE_QUEUE_BATCH:
+            try:
+                item = self.jobs.get(timeout=wait) if wait else self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.jobs.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def run_batch(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic(using=self.using):
+                for job, future in batch:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            outcomes.append((future, job(), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+        except Exception as error:
+            # The group failed to commit: every job of it failed.
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+write_queue = WriteQueue()
+
+
+def write(job):
+    """
+    Run the write `job` atomically: through the write queue with
+    SQLITE_WRITE_QUEUE, or in a transaction of the calling thread.
+    """
+    if settings.SQLITE_WRITE_QUEUE:
+        return write_queue.submit(job)
+    with transaction.atomic():
+        return job()